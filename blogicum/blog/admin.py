@@ -1,66 +1,60 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ORDER_VAR, ChangeList
 from django.utils.translation import gettext_lazy as _
 
-from .models import Category, Location, Post
-
-
-DEFAULT_CITIES = [
-    "Москва",
-    "Санкт-Петербург",
-    "Омск",
-    "Саратов",
-    "Казань",
-    "Новосибирск",
-    "Екатеринбург",
-    "Самара",
-    "Нижний Новгород",
-    "Ростов-на-Дону",
-    "Краснодар",
-    "Уфа",
-]
-
-DEFAULT_CATEGORIES = [
-    "Путешествия",
-    "Туризм",
-    "Развлечения",
-    "Еда",
-    "Спорт",
-    "Технологии",
-    "Учёба",
-    "Музыка",
-]
+from .models import (
+    AuthorStats, Category, ImageJob, Location, MediaBlob, Post,
+)
+from .search import search_posts
+from .seeding import (
+    DEFAULT_CATEGORIES,
+    DEFAULT_CITIES,
+    seed_categories,
+    seed_locations,
+)
+from .utils import recount_comment_counts
 
 
 @admin.action(description=_("Создать стандартные города"))
 def create_default_locations(modeladmin, request, queryset):
-    created_count = 0
-    for city in DEFAULT_CITIES:
-        obj, created = Location.objects.get_or_create(
-            name=city,
-            defaults={"is_published": True},
-        )
-        if created:
-            created_count += 1
+    created_count = seed_locations(DEFAULT_CITIES)
     modeladmin.message_user(request, f"Города добавлены: {created_count}")
 
 
 @admin.action(description=_("Создать стандартные категории"))
 def create_default_categories(modeladmin, request, queryset):
-    created_count = 0
-    for title in DEFAULT_CATEGORIES:
-        # slug у тебя создаётся автоматически из title в админке,
-        # но get_or_create через админку slug сам не заполнит.
-        # Поэтому создаём без slug, только если модель позволяет пустой slug.
-        # Если slug обязателен — напиши, я дам версию с генерацией slug.
-        obj, created = Category.objects.get_or_create(
-            title=title,
-            defaults={"is_published": True},
-        )
-        if created:
-            created_count += 1
+    created_count = seed_categories(DEFAULT_CATEGORIES)
     modeladmin.message_user(request, f"Категории добавлены: {created_count}")
 
 
+@admin.action(description=_("Пересчитать счётчики комментариев"))
+def recount_comments(modeladmin, request, queryset):
+    _, fixed_count = recount_comment_counts(queryset=queryset)
+    modeladmin.message_user(request, f"Счётчики исправлены: {fixed_count}")
+
+
+@admin.action(description=_("Повторить обработку"))
+def retry_image_jobs(modeladmin, request, queryset):
+    retried_count = queryset.exclude(status=ImageJob.RUNNING).update(
+        status=ImageJob.PENDING, attempts=0, error="", next_attempt_at=None
+    )
+    modeladmin.message_user(request, f"Задачи в очереди: {retried_count}")
+
+
+class PostChangeList(ChangeList):
+    """Найденные по индексу посты — по релевантности, если нет сортировки."""
+
+    def get_ordering(self, request, queryset):
+        # ChangeList сортирует уже найденное и иначе потерял бы порядок
+        # search_posts; без индекса search_rank нет — обычный порядок
+        if (
+            "search_rank" in queryset.query.extra_select
+            and ORDER_VAR not in self.params
+        ):
+            return ["-search_rank", "-pub_date", "-pk"]
+        return super().get_ordering(request, queryset)
+
+
 @admin.register(Post)
 class PostAdmin(admin.ModelAdmin):
     list_display = (
@@ -70,9 +64,20 @@ class PostAdmin(admin.ModelAdmin):
         "is_published",
         "category",
         "location",
+        "comment_count",
     )
     list_filter = ("is_published", "category", "location")
     search_fields = ("title", "text")
+    actions = [recount_comments]
+
+    def get_search_results(self, request, queryset, search_term):
+        """Искать по полнотекстовому индексу, а не перебором icontains."""
+        if not search_term:
+            return queryset, False
+        return search_posts(queryset, search_term), False
+
+    def get_changelist(self, request, **kwargs):
+        return PostChangeList
 
 
 @admin.register(Category)
@@ -90,3 +95,55 @@ class LocationAdmin(admin.ModelAdmin):
     list_filter = ("is_published",)
     search_fields = ("name",)
     actions = [create_default_locations]
+
+
+@admin.register(ImageJob)
+class ImageJobAdmin(admin.ModelAdmin):
+    list_display = (
+        "image_name",
+        "post",
+        "status",
+        "attempts",
+        "created_at",
+        "started_at",
+        "finished_at",
+    )
+    list_filter = ("status",)
+    search_fields = ("image_name", "post__title")
+    list_select_related = ("post",)
+    readonly_fields = (
+        "post",
+        "image_name",
+        "status",
+        "attempts",
+        "error",
+        "created_at",
+        "started_at",
+        "finished_at",
+        "next_attempt_at",
+    )
+    actions = [retry_image_jobs]
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(MediaBlob)
+class MediaBlobAdmin(admin.ModelAdmin):
+    list_display = ("name", "size", "ref_count", "created_at", "updated_at")
+    search_fields = ("name",)
+    readonly_fields = ("name", "size", "ref_count", "created_at", "updated_at")
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(AuthorStats)
+class AuthorStatsAdmin(admin.ModelAdmin):
+    list_display = ("user", "posts", "published_posts", "comments_received")
+    search_fields = ("user__username",)
+    readonly_fields = ("user", "posts", "published_posts", "comments_received")
+    list_select_related = ("user",)
+
+    def has_add_permission(self, request):
+        return False
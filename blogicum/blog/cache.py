@@ -0,0 +1,329 @@
+import hashlib
+import math
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from core.routers import reads_from_replica, use_primary_for_reads
+from core.stats import BufferedCounters
+
+from .models import Post
+
+CARD_CACHE_TIMEOUT = 60 * 60 * 24
+CARD_KEY = 'blog:card:{post_id}:{version}:{refs_version}:{flags}'
+POST_VERSION_KEY = 'blog:post-version:{post_id}'
+REFS_VERSION_KEY = 'blog:refs-version'
+PAGE_CACHE_TIMEOUT = 60 * 60
+PAGE_KEY = 'blog:page:v2:{feed_version}:{path}:{page}:{cursor}'
+FEED_VERSION_KEY = 'blog:feed-version'
+NEXT_PUBLICATION_KEY = 'blog:next-publication'
+STATS_KEY = 'blog:card-stats:{name}'
+STATS_NAMES = ('hits', 'misses')
+
+
+def _new_version():
+    # случайный токен, а не счётчик: если ключ версии вытеснят из кэша,
+    # старые фрагменты с прежней версией уже не совпадут;
+    # в начале — время смены в мс (для Last-Modified)
+    return f'{int(time.time() * 1000):x}.{uuid.uuid4().hex[:8]}'
+
+
+def _version_time(version):
+    """Момент смены версии (unix-время) или None, если метки нет."""
+    stamp, dot, _ = str(version).partition('.')
+    try:
+        return int(stamp, 16) / 1000 if dot else None
+    except ValueError:
+        return None
+
+
+def _replica_may_lag(versions):
+    """
+    Читает ли запрос с реплики, которая может ещё не видеть смену версий.
+
+    Реплика отстаёт не больше REPLICA_PIN_SECONDS (на этом держится
+    и закрепление после записи): данные, прочитанные с неё сразу после
+    смены версии, могут оказаться старыми, а в кэш под новой версией
+    они попали бы до следующей смены.
+    """
+    if not reads_from_replica():
+        return False
+    moments = [_version_time(version) for version in versions]
+    lag_bound = time.time() - settings.REPLICA_PIN_SECONDS
+    return any(
+        moment is not None and moment > lag_bound for moment in moments
+    )
+
+
+def read_primary_if_replica_may_lag(versions):
+    """Перевести чтения запроса на основную базу, если реплика отстаёт."""
+    if _replica_may_lag(versions):
+        use_primary_for_reads()
+
+
+def _get_versions(keys):
+    """Вернуть версии по ключам, заводя новые для отсутствующих."""
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _new_version(), timeout=None)
+            versions[key] = cache.get(key)
+    return versions
+
+
+def _bump(key):
+    cache.set(key, _new_version(), timeout=None)
+    # повторно после коммита: иначе параллельный запрос успеет закэшировать
+    # фрагмент по ещё не закоммиченным данным под новой версией
+    transaction.on_commit(
+        lambda: cache.set(key, _new_version(), timeout=None)
+    )
+
+
+def bump_post_version(post_id):
+    """Сбросить кэшированные карточки одного поста."""
+    _bump(POST_VERSION_KEY.format(post_id=post_id))
+
+
+def bump_refs_version():
+    """Сбросить все карточки: изменились категории, локации или авторы."""
+    _bump(REFS_VERSION_KEY)
+
+
+def get_refs_version():
+    """Текущая версия справочников: категорий, локаций и авторов."""
+    return _get_versions([REFS_VERSION_KEY])[REFS_VERSION_KEY]
+
+
+def bump_feed_version():
+    """Сбросить закэшированные страницы ленты и категорий."""
+    _bump(FEED_VERSION_KEY)
+
+
+_card_stats = BufferedCounters(STATS_KEY, STATS_NAMES)
+
+
+def get_card_cache_stats():
+    """Счётчики попаданий и промахов кэша карточек (общие для процессов)."""
+    return _card_stats.get()
+
+
+def reset_card_cache_stats():
+    _card_stats.reset()
+
+
+def get_card_cache_key(post, versions=None):
+    """
+    Ключ фрагмента карточки поста.
+
+    Кроме версий учитываются флаги, от которых зависит разметка:
+    публикация поста, категории и локации.
+    """
+    post_key = POST_VERSION_KEY.format(post_id=post.pk)
+    if versions is None:
+        versions = _get_versions([post_key, REFS_VERSION_KEY])
+    category, location = post.category, post.location
+    flags = ''.join(str(int(bool(flag))) for flag in (
+        post.is_published,
+        category is not None and category.is_published,
+        location is not None and location.is_published,
+    ))
+    return CARD_KEY.format(
+        post_id=post.pk,
+        version=versions[post_key],
+        refs_version=versions[REFS_VERSION_KEY],
+        flags=flags,
+    )
+
+
+def get_or_render_card(post, render):
+    """
+    Вернуть HTML карточки из кэша или отрендерить и сохранить его.
+
+    Пост, только что прочитанный с отстающей реплики, в кэш не идёт.
+    """
+    versions = _get_versions([
+        POST_VERSION_KEY.format(post_id=post.pk), REFS_VERSION_KEY,
+    ])
+    key = get_card_cache_key(post, versions)
+    html = cache.get(key)
+    if html is not None:
+        _card_stats.add('hits')
+        return html
+    _card_stats.add('misses')
+    html = render()
+    if not _replica_may_lag(versions.values()):
+        cache.set(key, html, CARD_CACHE_TIMEOUT)
+    return html
+
+
+def get_next_publication_time(now=None):
+    """Ближайшая будущая дата публикации среди опубликованных постов."""
+    return (
+        Post.objects.filter(
+            is_published=True, pub_date__gt=now or timezone.now()
+        )
+        .order_by('pub_date')
+        .values_list('pub_date', flat=True)
+        .first()
+    )
+
+
+def refresh_next_publication(now=None):
+    """Пересчитать и запомнить момент ближайшей отложенной публикации."""
+    next_publication = get_next_publication_time(now)
+    cache.set(
+        NEXT_PUBLICATION_KEY, {'at': next_publication}, PAGE_CACHE_TIMEOUT
+    )
+    return next_publication
+
+
+def get_next_publication(now=None):
+    """Момент ближайшей отложенной публикации (из кэша, без запроса к БД)."""
+    tracked = cache.get(NEXT_PUBLICATION_KEY)
+    if tracked is None:
+        return refresh_next_publication(now)
+    return tracked['at']
+
+
+def forget_next_publication():
+    """Сбросить запомненный момент: пост добавлен, изменён или удалён."""
+    cache.delete(NEXT_PUBLICATION_KEY)
+    transaction.on_commit(lambda: cache.delete(NEXT_PUBLICATION_KEY))
+
+
+def check_scheduled_publications(now=None):
+    """
+    Сменить версию ленты, если наступил момент отложенной публикации.
+
+    Пока момент не наступил, запросы ленты не зависят от времени:
+    закэшированные по версии страницы остаются верными.
+    Возвращает True, если версия ленты была сменена.
+    """
+    now = now or timezone.now()
+    next_publication = get_next_publication(now)
+    if next_publication is None or next_publication > now:
+        return False
+    bump_feed_version()
+    refresh_next_publication(now)
+    return True
+
+
+def get_feed_version():
+    """Текущая версия ленты с учётом наступивших отложенных публикаций."""
+    check_scheduled_publications()
+    return _get_versions([FEED_VERSION_KEY])[FEED_VERSION_KEY]
+
+
+def get_post_versions(post_id):
+    """Версии, от которых зависит страница поста: сам пост и справочники."""
+    post_key = POST_VERSION_KEY.format(post_id=post_id)
+    versions = _get_versions([post_key, REFS_VERSION_KEY])
+    return [versions[post_key], versions[REFS_VERSION_KEY]]
+
+
+class ConditionalGetMixin:
+    """
+    ETag и Last-Modified для страниц чтения, 304 без рендера и запросов.
+
+    Валидатор строится из версий кэша, которые меняют сигналы
+    (get_validator_versions), и класса зрителя: аноним или конкретный
+    пользователь, так как разметка зависит от него. Last-Modified —
+    самый поздний момент смены этих версий.
+    """
+
+    def get_validator_versions(self):
+        return [get_feed_version()]
+
+    def get_validators(self, versions):
+        user = self.request.user
+        viewer = f'u{user.pk}' if user.is_authenticated else 'a'
+        digest = hashlib.sha1(
+            ':'.join([viewer, *versions]).encode()
+        ).hexdigest()[:20]
+        moments = [_version_time(version) for version in versions]
+        last_modified = None
+        if None not in moments:
+            # с точностью до секунды, в большую сторону
+            last_modified = math.ceil(max(moments))
+        # слабый ETag: разметка совпадает по смыслу, а не побайтно
+        # (маскированный CSRF-токен разный в каждом ответе)
+        return f'W/"{digest}"', last_modified
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        versions = self.get_validator_versions()
+        etag, last_modified = self.get_validators(versions)
+        # страница с этим валидатором осядет в кэше браузера
+        read_primary_if_replica_may_lag(versions)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        # браузер хранит страницу, но каждый раз сверяет валидатор;
+        # False у patch_cache_control дал бы директиву «private=False»
+        if request.user.is_authenticated:
+            patch_cache_control(response, no_cache=True, private=True)
+        else:
+            patch_cache_control(response, no_cache=True)
+        return response
+
+
+class AnonymousPageCacheMixin:
+    """
+    Кэширует HTML страниц ListView для анонимных GET-запросов.
+
+    Ключ включает версию ленты (меняется сигналами и при наступлении
+    отложенных публикаций), путь и номер
+    страницы или курсор; остальные GET-параметры на ключ не влияют.
+    """
+
+    def get_page_cache_key(self):
+        request = self.request
+        return PAGE_KEY.format(
+            feed_version=get_feed_version(),
+            path=request.path,
+            page=request.GET.get(self.page_kwarg, ''),
+            cursor=request.GET.get('cursor', ''),
+        )
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD') or (
+            request.user.is_authenticated
+        ):
+            return super().dispatch(request, *args, **kwargs)
+        key = self.get_page_cache_key()
+        cached = cache.get(key)
+        if cached is not None:
+            content, headers = cached
+            response = HttpResponse(content)
+            for name, value in headers:
+                response[name] = value
+            return response
+        read_primary_if_replica_may_lag([get_feed_version()])
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200 and hasattr(response, 'render'):
+            # заголовки страницы (Content-Type, Vary и др.) — вместе
+            # с разметкой; cookies хранятся отдельно и в кэш не попадают
+            response.add_post_render_callback(
+                lambda rendered: cache.set(
+                    key,
+                    (rendered.content, list(rendered.items())),
+                    PAGE_CACHE_TIMEOUT,
+                )
+            )
+        return response
@@ -0,0 +1,95 @@
+import re
+
+from django.core.checks import Error, Tags, register
+from django.db import DatabaseError, connections, transaction
+from django.db.migrations.executor import MigrationExecutor
+
+from .models import Comment, Post
+from .utils import get_published_posts
+
+FULL_SCAN_PATTERNS = {
+    'sqlite': r'\bSCAN (?:TABLE )?{table}\b(?!.*\bUSING\b)',
+    'postgresql': r'\bSeq Scan on {table}\b',
+}
+
+
+def get_feed_queries():
+    """Запросы ленты, которые обязаны идти по индексам."""
+    return {
+        'index': get_published_posts().order_by('-pub_date')[:10],
+        'category_posts': (
+            get_published_posts().filter(category_id=0)
+            .order_by('-pub_date')[:10]
+        ),
+        'profile': Post.objects.filter(author_id=0).order_by('-pub_date')[:10],
+        'post_comments': Comment.objects.filter(post_id=0).order_by(
+            'created_at'
+        ),
+    }
+
+
+def find_full_scans(plan, vendor, tables):
+    """Вернуть таблицы, которые план читает полным перебором."""
+    # «SCAN t USING INDEX i» в SQLite — обход индекса, а не таблицы
+    return [
+        table for table in tables
+        if re.search(
+            FULL_SCAN_PATTERNS[vendor].format(table=table), plan, re.MULTILINE
+        )
+    ]
+
+
+def has_unapplied_migrations(connection):
+    executor = MigrationExecutor(connection)
+    return bool(
+        executor.migration_plan(executor.loader.graph.leaf_nodes())
+    )
+
+
+def explain(queryset, connection):
+    if queryset.query.is_empty():
+        # none(): запрос к БД не уходит, объяснять нечего
+        return ''
+    if connection.vendor == 'postgresql':
+        # на маленьких таблицах планировщик и так выбирает Seq Scan,
+        # поэтому проверяем, что индекс вообще пригоден для запроса
+        with transaction.atomic(using=connection.alias):
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            return queryset.using(connection.alias).explain()
+    return queryset.using(connection.alias).explain()
+
+
+@register(Tags.database)
+def check_feed_query_plans(app_configs=None, databases=None, **kwargs):
+    """
+    Проверить EXPLAIN запросов ленты (manage.py check --database default).
+
+    Проверка пропускается, пока не применены все миграции,
+    чтобы не мешать самому migrate добавить индексы.
+    """
+    errors = []
+    tables = (Post._meta.db_table, Comment._meta.db_table)
+    for alias in databases or ():
+        connection = connections[alias]
+        if connection.vendor not in FULL_SCAN_PATTERNS:
+            continue
+        try:
+            if has_unapplied_migrations(connection):
+                continue
+            plans = {
+                name: explain(queryset, connection)
+                for name, queryset in get_feed_queries().items()
+            }
+        except DatabaseError:
+            continue
+        for name, plan in plans.items():
+            for table in find_full_scans(plan, connection.vendor, tables):
+                errors.append(Error(
+                    f'Запрос ленты «{name}» читает таблицу {table} '
+                    f'полным перебором (база {alias}).',
+                    hint=f'План запроса:\n{plan}',
+                    obj=name,
+                    id='blog.E001',
+                ))
+    return errors
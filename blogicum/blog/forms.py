@@ -2,6 +2,7 @@ from django import forms
 from django.contrib.auth import get_user_model
 
 from .models import Comment, Post
+from .uploads import check_image_dimensions, check_image_size
 
 
 User = get_user_model()
@@ -12,6 +13,19 @@ class PostForm(forms.ModelForm):
         model = Post
         fields = ('title', 'text', 'pub_date', 'location', 'category', 'image')
 
+    def clean_image(self):
+        image = self.cleaned_data.get('image')
+        # то же, что проверяет обработчик загрузки, — для прочих путей
+        decoded = getattr(image, 'image', None)
+        if decoded is not None:
+            error = (
+                check_image_size(image.size)
+                or check_image_dimensions(*decoded.size)
+            )
+            if error:
+                raise forms.ValidationError(error)
+        return image
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
@@ -0,0 +1,248 @@
+import hashlib
+import posixpath
+from datetime import timedelta
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import Count
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .models import MediaBlob, Post
+from .storage import acquire_blob, blob_digest, file_digest, release_blob
+
+ORIGINALS_DIR = 'posts_images'
+VARIANTS_DIR = 'posts_images/variants'
+# имя варианта: наибольшая ширина, формат файла
+VARIANTS = {
+    'card': (640, 'JPEG'),
+    'card_webp': (640, 'WEBP'),
+    'detail': (1280, 'JPEG'),
+    'detail_webp': (1280, 'WEBP'),
+}
+EXTENSIONS = {'JPEG': 'jpg', 'WEBP': 'webp'}
+SAVE_OPTIONS = {
+    'JPEG': {'quality': 82, 'optimize': True, 'progressive': True},
+    'WEBP': {'quality': 80, 'method': 4},
+}
+BLOB_GC_BATCH_SIZE = 500
+# блоб без ссылок не удаляется сразу: пост с ним может ещё сохраняться
+BLOB_GC_GRACE = timedelta(hours=1)
+# форматы, в которых оригинал пересохраняется без EXIF
+STRIPPED_FORMATS = {
+    'JPEG': {'quality': 92, 'optimize': True},
+    'PNG': {'optimize': True},
+    'WEBP': {'quality': 90},
+}
+
+
+def render_variant(image, width, image_format):
+    """Уменьшить изображение до ширины width и пережать в image_format."""
+    variant = image.copy()
+    if variant.width > width:
+        height = max(1, round(variant.height * width / variant.width))
+        variant = variant.resize((width, height), Image.Resampling.LANCZOS)
+    if image_format == 'JPEG' and variant.mode != 'RGB':
+        variant = variant.convert('RGB')
+    buffer = BytesIO()
+    variant.save(buffer, image_format, **SAVE_OPTIONS[image_format])
+    return buffer.getvalue(), variant.width
+
+
+def build_variants(image, digest, storage=default_storage):
+    """
+    Сохранить уменьшенные копии уже декодированного изображения.
+
+    Имена файлов строятся по хэшу содержимого оригинала, поэтому
+    одинаковые загрузки переиспользуют уже готовые варианты.
+    Возвращает {вариант: [путь, ширина]}.
+    """
+    variants = {}
+    for name, (width, image_format) in VARIANTS.items():
+        path = f'{VARIANTS_DIR}/{digest}_{name}.{EXTENSIONS[image_format]}'
+        data, actual_width = render_variant(image, width, image_format)
+        if not storage.exists(path):
+            path = storage.save(path, ContentFile(data))
+        variants[name] = [path, actual_width]
+    return variants
+
+
+def strip_metadata(image, image_format):
+    """
+    Пересохранить оригинал без EXIF (с уже применённым поворотом).
+
+    Возвращает содержимое нового файла или None, если формат
+    не пересохраняется без потерь кадров (GIF).
+    """
+    if image_format not in STRIPPED_FORMATS:
+        return None
+    if image_format == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    buffer = BytesIO()
+    image.save(buffer, image_format, **STRIPPED_FORMATS[image_format])
+    return buffer.getvalue()
+
+
+def process_post_image(post):
+    """
+    Обработать изображение поста: декодировать, повернуть по EXIF,
+    удалить метаданные из оригинала и построить уменьшенные копии.
+
+    Вызывается воркером очереди (blog.jobs), а не в запросе.
+    Очищенный оригинал — новый блоб, ссылка переходит на него, а
+    прежний файл удалит gc_media_blobs. Если пока шла обработка,
+    изображение поста сменили, результат не записывается.
+    Возвращает True, если пост обновлён.
+    """
+    source = post.image.name
+    storage = post.image.storage
+    with storage.open(source, 'rb') as image_file:
+        content = image_file.read()
+    with Image.open(BytesIO(content)) as original:
+        image_format = original.format
+        has_exif = bool(original.getexif())
+        image = ImageOps.exif_transpose(original)
+        image.load()
+    # метаданные (в т.ч. геометки) не переносятся ни в оригинал, ни в копии
+    image.info.pop('exif', None)
+    stripped = strip_metadata(image, image_format) if has_exif else None
+    if stripped is not None:
+        content = stripped
+        stripped = storage.save(
+            f'{ORIGINALS_DIR}/{posixpath.basename(source)}',
+            ContentFile(stripped),
+        )
+    # копии названы по хэшу итогового оригинала, как и сам блоб
+    digest = hashlib.sha256(content).hexdigest()
+    variants = build_variants(image, digest[:16])
+    variants['source'] = stripped or source
+    updated = Post.objects.filter(pk=post.pk, image=source).update(
+        image=variants['source'], image_variants=variants
+    )
+    if not updated:
+        return False
+    if stripped:
+        acquire_blob(stripped)
+        release_blob(source)
+        post.image.name = stripped
+    post.image_variants = variants
+    return True
+
+
+def delete_variants(digest, storage=default_storage):
+    """Удалить уменьшенные копии оригинала с хэшем digest."""
+    for name, (_, image_format) in VARIANTS.items():
+        storage.delete(
+            f'{VARIANTS_DIR}/{digest[:16]}_{name}.{EXTENSIONS[image_format]}'
+        )
+
+
+def collect_unreferenced_blobs(
+        batch_size=BLOB_GC_BATCH_SIZE, grace=BLOB_GC_GRACE, dry_run=False
+):
+    """
+    Удалить блобы без ссылок, не менявшиеся дольше grace, вместе с копиями.
+
+    Блобы выбираются пачками по batch_size; перед удалением ссылки
+    сверяются с таблицей постов, расхождения счётчика исправляются.
+    Возвращает число удалённых (при dry_run — найденных) блобов.
+    """
+    storage = Post._meta.get_field('image').storage
+    cutoff = timezone.now() - grace
+    removed = 0
+    last_pk = 0
+    while True:
+        batch = list(
+            MediaBlob.objects.filter(
+                ref_count=0, updated_at__lt=cutoff, pk__gt=last_pk
+            ).order_by('pk')[:batch_size]
+        )
+        if not batch:
+            break
+        last_pk = batch[-1].pk
+        referenced = dict(
+            Post.objects.filter(image__in=[blob.name for blob in batch])
+            .order_by()
+            .values('image')
+            .annotate(total=Count('pk'))
+            .values_list('image', 'total')
+        )
+        for name, total in referenced.items():
+            MediaBlob.objects.filter(name=name).update(ref_count=total)
+        for blob in batch:
+            if blob.name in referenced:
+                continue
+            if dry_run:
+                removed += 1
+                continue
+            # ссылка могла появиться после выборки пачки
+            deleted, _ = MediaBlob.objects.filter(
+                pk=blob.pk, ref_count=0
+            ).delete()
+            if not deleted:
+                continue
+            digest = blob_digest(blob.name)
+            if digest is None and storage.exists(blob.name):
+                with storage.open(blob.name, 'rb') as blob_file:
+                    digest = file_digest(blob_file)
+            storage.delete(blob.name)
+            if digest is not None:
+                delete_variants(digest)
+            removed += 1
+    return removed
+
+
+def register_untracked_files(directory=ORIGINALS_DIR):
+    """
+    Учесть в MediaBlob файлы изображений, о которых таблица не знает
+    (загруженные до хранилища по хэшу). Возвращает их число.
+    """
+    storage = Post._meta.get_field('image').storage
+    registered = 0
+    directories, files = storage.listdir(directory)
+    for filename in files:
+        name = f'{directory}/{filename}'
+        _, created = MediaBlob.objects.get_or_create(
+            name=name, defaults={'size': storage.size(name)}
+        )
+        registered += created
+    for subdirectory in directories:
+        if f'{directory}/{subdirectory}' != VARIANTS_DIR:
+            registered += register_untracked_files(
+                f'{directory}/{subdirectory}'
+            )
+    return registered
+
+
+def ready_variants(post):
+    """Варианты изображения поста, если они построены для текущего файла."""
+    if not post.image:
+        return {}
+    variants = post.image_variants or {}
+    if variants.get('source') != post.image.name:
+        return {}
+    return variants
+
+
+def variant_url(post, name):
+    """URL варианта изображения поста, а если его нет — оригинала."""
+    variant = ready_variants(post).get(name)
+    if variant is None:
+        return post.image.url if post.image else ''
+    return default_storage.url(variant[0])
+
+
+def variant_srcset(post, kind='', names=('card', 'detail')):
+    """Значение srcset из вариантов одного формата (kind='webp' для WebP)."""
+    variants = ready_variants(post)
+    suffix = f'_{kind}' if kind else ''
+    candidates = {}
+    for name in names:
+        variant = variants.get(f'{name}{suffix}')
+        if variant is not None:
+            path, width = variant
+            candidates.setdefault(width, default_storage.url(path))
+    return ', '.join(
+        f'{url} {width}w' for width, url in sorted(candidates.items())
+    )
@@ -0,0 +1,152 @@
+import logging
+from datetime import timedelta
+
+from django.db.models import F, Q
+from django.utils import timezone
+from PIL import Image
+
+from .cache import bump_feed_version, bump_post_version
+from .images import process_post_image
+from .models import ImageJob
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 3
+# пауза перед повтором после неудачи; удваивается с каждой попыткой
+RETRY_DELAY = timedelta(minutes=1)
+# задача в статусе «обрабатывается» дольше этого считается брошенной
+STALE_AFTER = timedelta(minutes=10)
+# ожидаемые ошибки битых файлов — без трассировки уровня ERROR
+IMAGE_ERRORS = (OSError, ValueError, Image.DecompressionBombError)
+
+
+def enqueue_image_job(post):
+    """
+    Поставить в очередь обработку текущего изображения поста.
+
+    Повторная постановка того же файла, пока задача ждёт
+    или выполняется, ничего не делает.
+    """
+    job = ImageJob.objects.filter(
+        post=post,
+        image_name=post.image.name,
+        status__in=(ImageJob.PENDING, ImageJob.RUNNING),
+    ).first()
+    if job is None:
+        job = ImageJob.objects.create(post=post, image_name=post.image.name)
+    return job
+
+
+def claim_next_job():
+    """
+    Забрать самую старую ожидающую задачу, срок повтора которой настал.
+
+    Захват — условный UPDATE по статусу, поэтому несколько воркеров
+    не возьмут одну задачу ни в SQLite, ни в PostgreSQL. Попытка
+    засчитывается при захвате: если воркер упадёт посреди обработки,
+    requeue_stale_jobs не будет возвращать задачу в очередь вечно.
+    """
+    while True:
+        now = timezone.now()
+        job = (
+            ImageJob.objects.filter(
+                Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=now),
+                status=ImageJob.PENDING,
+            )
+            .order_by('created_at', 'pk')
+            .first()
+        )
+        if job is None:
+            return None
+        claimed = ImageJob.objects.filter(
+            pk=job.pk, status=ImageJob.PENDING
+        ).update(
+            status=ImageJob.RUNNING,
+            started_at=now,
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            job.status = ImageJob.RUNNING
+            job.started_at = now
+            job.attempts += 1
+            return job
+
+
+def retry_delay(attempts):
+    """Пауза перед следующей попыткой после attempts неудачных."""
+    return RETRY_DELAY * 2 ** (attempts - 1)
+
+
+def run_job(job):
+    """
+    Выполнить захваченную задачу и записать её итоговый статус.
+
+    Любая ошибка обработки только помечает задачу: воркер --watch
+    продолжает разбирать очередь, а повтор откладывается на
+    retry_delay, чтобы попытки не шли подряд в одном проходе.
+    """
+    try:
+        post = job.post
+        if post.image and post.image.name == job.image_name:
+            if process_post_image(post):
+                # копии и имя файла записаны update(), без сигналов
+                bump_post_version(post.pk)
+                bump_feed_version()
+    except Exception as error:
+        logger.log(
+            logging.WARNING if isinstance(error, IMAGE_ERRORS)
+            else logging.ERROR,
+            'Не удалось обработать изображение %s (попытка %d)',
+            job.image_name, job.attempts,
+            exc_info=True,
+        )
+        job.error = f'{type(error).__name__}: {error}'
+        if job.attempts >= MAX_ATTEMPTS:
+            job.status = ImageJob.FAILED
+        else:
+            job.status = ImageJob.PENDING
+            job.next_attempt_at = (
+                timezone.now() + retry_delay(job.attempts)
+            )
+    else:
+        job.error = ''
+        job.status = ImageJob.DONE
+    finally:
+        if job.status == ImageJob.RUNNING:
+            # прервано (KeyboardInterrupt и т.п.): вернуть в очередь
+            job.status = ImageJob.PENDING
+        job.finished_at = timezone.now()
+        job.save(update_fields=(
+            'status', 'attempts', 'error', 'finished_at', 'next_attempt_at',
+        ))
+    return job
+
+
+def requeue_stale_jobs(stale_after=STALE_AFTER):
+    """
+    Вернуть в очередь задачи упавших воркеров. Возвращает их число.
+
+    Задачи, исчерпавшие попытки, помечаются как неудачные.
+    """
+    stale = ImageJob.objects.filter(
+        status=ImageJob.RUNNING,
+        started_at__lt=timezone.now() - stale_after,
+    )
+    stale.filter(attempts__gte=MAX_ATTEMPTS).update(
+        status=ImageJob.FAILED,
+        error='Воркер не завершил обработку',
+        finished_at=timezone.now(),
+    )
+    return stale.update(status=ImageJob.PENDING)
+
+
+def process_pending_jobs(limit=None):
+    """Обработать ожидающие задачи (не больше limit). Возвращает их число."""
+    processed = 0
+    while limit is None or processed < limit:
+        job = claim_next_job()
+        if job is None:
+            break
+        run_job(job)
+        processed += 1
+    return processed
@@ -0,0 +1,147 @@
+import random
+import statistics
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, transaction
+from django.utils import timezone
+
+from blog.models import Category, Comment, Post
+from blog.utils import get_published_posts
+
+User = get_user_model()
+
+# профиль SQLite «как было»: журнал отката и полная синхронизация
+ROLLBACK_JOURNAL = {'journal_mode': 'delete', 'synchronous': 'full'}
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузить базу параллельными чтениями ленты и записью '
+        'комментариев и вывести пропускную способность. Данные '
+        'создаются во временном посте и удаляются в конце.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--seconds', type=float, default=5)
+        parser.add_argument(
+            '--write-ratio',
+            type=float,
+            default=0.3,
+            help='Доля операций записи (0..1).',
+        )
+        parser.add_argument(
+            '--compare',
+            action='store_true',
+            help=(
+                'Для SQLite: сначала прогон с журналом отката '
+                '(journal_mode=delete, synchronous=full), '
+                'затем с SQLITE_PRAGMAS.'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        post = self.create_fixture()
+        try:
+            profiles = [('настройки', settings.SQLITE_PRAGMAS)]
+            if options['compare'] and connection.vendor == 'sqlite':
+                profiles.insert(0, (
+                    'журнал отката',
+                    {**settings.SQLITE_PRAGMAS, **ROLLBACK_JOURNAL},
+                ))
+            for title, pragmas in profiles:
+                result = self.run_profile(post, pragmas, options)
+                self.stdout.write(self.format_result(title, result))
+        finally:
+            self.drop_fixture(post)
+
+    def create_fixture(self):
+        suffix = f'{time.time_ns():x}'
+        user = User.objects.create(username=f'bench-{suffix}')
+        category = Category.objects.create(
+            title='Бенчмарк', description='Бенчмарк', slug=f'bench-{suffix}'
+        )
+        return Post.objects.create(
+            title='Бенчмарк', text='Бенчмарк', author=user,
+            category=category, pub_date=timezone.now(),
+        )
+
+    def drop_fixture(self, post):
+        category = post.category
+        post.author.delete()
+        category.delete()
+
+    def run_profile(self, post, pragmas, options):
+        original_pragmas = settings.SQLITE_PRAGMAS
+        settings.SQLITE_PRAGMAS = pragmas
+        # новое соединение получит pragma из обработчика connection_created
+        connection.close()
+        deadline = time.monotonic() + options['seconds']
+        results = []
+        threads = [
+            threading.Thread(
+                target=self.worker,
+                args=(post, deadline, options['write_ratio'], results),
+            )
+            for _ in range(options['threads'])
+        ]
+        try:
+            started = time.monotonic()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.monotonic() - started
+        finally:
+            settings.SQLITE_PRAGMAS = original_pragmas
+            connection.close()
+        return elapsed, results
+
+    def worker(self, post, deadline, write_ratio, results):
+        """Поток со своим соединением: чтения ленты и новые комментарии."""
+        local = {'reads': [], 'writes': [], 'errors': 0}
+        try:
+            while time.monotonic() < deadline:
+                write = random.random() < write_ratio
+                start = time.perf_counter()
+                try:
+                    if write:
+                        with transaction.atomic():
+                            Comment.objects.create(
+                                post=post, author_id=post.author_id,
+                                text='Бенчмарк',
+                            )
+                    else:
+                        list(get_published_posts()[:10])
+                except OperationalError:
+                    local['errors'] += 1
+                    continue
+                duration = time.perf_counter() - start
+                local['writes' if write else 'reads'].append(duration)
+        finally:
+            connection.close()
+            results.append(local)
+
+    def format_result(self, title, result):
+        elapsed, results = result
+        lines = [f'{title}:']
+        for kind in ('reads', 'writes'):
+            durations = [d for local in results for d in local[kind]]
+            if not durations:
+                continue
+            p95 = (
+                statistics.quantiles(durations, n=20)[-1]
+                if len(durations) > 1 else durations[0]
+            )
+            lines.append(
+                f'  {kind}: {len(durations) / elapsed:.0f} оп/с, '
+                f'p50 {statistics.median(durations) * 1000:.1f} мс, '
+                f'p95 {p95 * 1000:.1f} мс'
+            )
+        errors = sum(local['errors'] for local in results)
+        lines.append(f'  ошибок блокировки: {errors}')
+        return '\n'.join(lines)
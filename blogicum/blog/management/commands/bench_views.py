@@ -0,0 +1,304 @@
+import json
+import statistics
+import subprocess
+import time
+import tracemalloc
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.db.models import Count, Q
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.cache import bump_feed_version, bump_post_version
+from blog.models import AuthorStats, Category, Comment, Post
+from blog.utils import get_published_posts
+from core.middleware import RequestStats
+
+RESULTS_DIR = settings.BASE_DIR / 'benchmarks'
+# замеры памяти с tracemalloc медленные — на нескольких запросах
+MEMORY_SAMPLES = 5
+
+
+class Scenario:
+    """Один сценарий: запрос к представлению от анонима или автора."""
+
+    def __init__(self, name, url, user=None, data=None, post=None):
+        self.name = name
+        self.url = url
+        self.user = user
+        self.data = data
+        self.post = post
+
+    def client(self):
+        client = Client()
+        if self.user is not None:
+            client.force_login(self.user)
+        return client
+
+    def request(self, client):
+        if self.data is None:
+            return client.get(self.url)
+        return client.post(self.url, self.data)
+
+
+class Command(BaseCommand):
+    help = (
+        'Прогнать через тестовый клиент ленту, категорию, профиль, пост '
+        'и добавление комментария на текущей базе и вывести p50/p95 '
+        'времени ответа, число запросов к БД и пик памяти на запрос. '
+        'Результаты сохраняются в JSON для сравнения между коммитами. '
+        'Данные для замеров — generate_blog_data.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=50,
+            help='Замеряемых запросов на сценарий.',
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=3,
+            help='Запросов прогрева (без замера) на сценарий.',
+        )
+        parser.add_argument(
+            '--memory-samples',
+            type=int,
+            default=MEMORY_SAMPLES,
+            help='Запросов с замером памяти (tracemalloc) на сценарий; '
+                 '0 — не замерять.',
+        )
+        parser.add_argument(
+            '--cold',
+            action='store_true',
+            help='Очищать кэш перед каждым запросом.',
+        )
+        parser.add_argument(
+            '--output',
+            default=None,
+            help=f'Файл результатов (по умолчанию — в {RESULTS_DIR}).',
+        )
+        parser.add_argument(
+            '--compare',
+            default=None,
+            help='Файл прошлых результатов или latest — последний в '
+                 'каталоге результатов.',
+        )
+
+    def handle(self, *args, **options):
+        previous = self.load_previous(options['compare'])
+        scenarios = self.build_scenarios()
+        results = {}
+        # бюджеты запросов не пишут в лог каждый запрос; тестовый
+        # клиент ходит на testserver
+        with override_settings(
+            REQUEST_BUDGET_MODE='off',
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+        ):
+            for scenario in scenarios:
+                results[scenario.name] = self.run_scenario(
+                    scenario, options
+                )
+        report = {
+            'commit': self.git_commit(),
+            'created_at': timezone.now().isoformat(),
+            'options': {
+                name: options[name] for name in ('requests', 'warmup', 'cold')
+            },
+            'dataset': {
+                'posts': Post.objects.count(),
+                'comments': Comment.objects.count(),
+                'categories': Category.objects.count(),
+            },
+            'scenarios': results,
+        }
+        path = self.save(report, options['output'])
+        self.stdout.write(self.format_report(report, previous))
+        self.stdout.write(f'Результаты: {path}')
+
+    def build_scenarios(self):
+        post = (
+            get_published_posts()
+            .order_by('-comment_count', '-pub_date')
+            .first()
+        )
+        if post is None:
+            raise CommandError(
+                'Нет опубликованных постов: сначала generate_blog_data.'
+            )
+        category = (
+            Category.objects.filter(is_published=True)
+            .annotate(total=Count('posts', filter=Q(posts__is_published=True)))
+            .order_by('-total')
+            .first()
+        )
+        author = (
+            AuthorStats.objects.select_related('user')
+            .order_by('-published_posts')
+            .first()
+        )
+        author = author.user if author else post.author
+        detail = reverse('blog:post_detail', args=[post.pk])
+        return [
+            Scenario('index', reverse('blog:index')),
+            Scenario('index_user', reverse('blog:index'), user=author),
+            Scenario(
+                'category',
+                reverse('blog:category_posts', args=[category.slug]),
+            ),
+            Scenario(
+                'profile', reverse('blog:profile', args=[author.username])
+            ),
+            Scenario('post_detail', detail),
+            Scenario('post_detail_user', detail, user=author),
+            Scenario(
+                'add_comment',
+                reverse('blog:add_comment', args=[post.pk]),
+                user=author,
+                data={'text': 'Комментарий из бенчмарка'},
+                post=post,
+            ),
+        ]
+
+    def run_scenario(self, scenario, options):
+        client = scenario.client()
+        # записи откатываются: набор данных одинаков для всех прогонов
+        with transaction.atomic():
+            for _ in range(options['warmup']):
+                self.check_response(scenario, scenario.request(client))
+            durations, queries = [], []
+            for _ in range(options['requests']):
+                if options['cold']:
+                    cache.clear()
+                stats = RequestStats()
+                with ExitStack() as stack:
+                    for connection in connections.all():
+                        stack.enter_context(
+                            connection.execute_wrapper(stats)
+                        )
+                    start = time.perf_counter()
+                    response = scenario.request(client)
+                    durations.append(time.perf_counter() - start)
+                self.check_response(scenario, response)
+                queries.append(stats.queries)
+            peak = None
+            if options['memory_samples'] > 0:
+                peak = self.measure_memory(scenario, client, options)
+            transaction.set_rollback(True)
+        if scenario.post is not None:
+            # карточки, закэшированные по откаченным данным, устарели
+            bump_post_version(scenario.post.pk)
+            bump_feed_version()
+        return {
+            'p50_ms': round(statistics.median(durations) * 1000, 2),
+            'p95_ms': round(self.p95(durations) * 1000, 2),
+            'queries': round(statistics.mean(queries), 1),
+            'max_queries': max(queries),
+            'peak_kb': None if peak is None else round(peak / 1024, 1),
+        }
+
+    def measure_memory(self, scenario, client, options):
+        """Наибольший пик выделенной Python памяти за запрос."""
+        peak = 0
+        tracemalloc.start()
+        try:
+            for _ in range(options['memory_samples']):
+                if options['cold']:
+                    cache.clear()
+                tracemalloc.reset_peak()
+                before, _ = tracemalloc.get_traced_memory()
+                scenario.request(client)
+                _, request_peak = tracemalloc.get_traced_memory()
+                peak = max(peak, request_peak - before)
+        finally:
+            tracemalloc.stop()
+        return peak
+
+    def check_response(self, scenario, response):
+        if response.status_code not in (200, 302):
+            raise CommandError(
+                f'{scenario.name}: {scenario.url} ответил '
+                f'{response.status_code}'
+            )
+
+    def p95(self, durations):
+        if len(durations) < 2:
+            return durations[0]
+        return statistics.quantiles(durations, n=20)[-1]
+
+    def git_commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                cwd=settings.BASE_DIR, capture_output=True, text=True,
+                check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return 'unknown'
+
+    def save(self, report, output):
+        if output:
+            path = Path(output)
+        else:
+            stamp = timezone.now().strftime('%Y%m%d-%H%M%S')
+            path = RESULTS_DIR / f'{stamp}-{report["commit"]}.json'
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(
+            json.dumps(report, ensure_ascii=False, indent=2),
+            encoding='utf-8',
+        )
+        return path
+
+    def load_previous(self, compare):
+        if not compare:
+            return None
+        if compare == 'latest':
+            runs = sorted(RESULTS_DIR.glob('*.json'))
+            if not runs:
+                return None
+            compare = runs[-1]
+        try:
+            return json.loads(Path(compare).read_text(encoding='utf-8'))
+        except (OSError, ValueError) as error:
+            raise CommandError(f'Не прочитать {compare}: {error}')
+
+    def format_report(self, report, previous=None):
+        dataset = ', '.join(
+            f'{name}: {value}' for name, value in report['dataset'].items()
+        )
+        lines = [f'Коммит {report["commit"]}; {dataset}']
+        if previous:
+            lines.append(f'Сравнение с {previous["commit"]} '
+                         f'от {previous["created_at"]}')
+        lines.append(
+            f'{"сценарий":<18}{"p50, мс":>16}{"p95, мс":>16}'
+            f'{"запросов":>14}{"память, КБ":>18}'
+        )
+        old_scenarios = previous['scenarios'] if previous else {}
+        for name, result in report['scenarios'].items():
+            old = old_scenarios.get(name)
+            lines.append(
+                f'{name:<18}'
+                f'{self.cell(result, old, "p50_ms"):>16}'
+                f'{self.cell(result, old, "p95_ms"):>16}'
+                f'{self.cell(result, old, "queries"):>14}'
+                f'{self.cell(result, old, "peak_kb"):>18}'
+            )
+        return '\n'.join(lines)
+
+    def cell(self, result, old, metric):
+        value = result[metric]
+        if value is None:
+            return '—'
+        if not old or metric not in old or not old[metric]:
+            return f'{value:g}'
+        change = (value - old[metric]) / old[metric] * 100
+        return f'{value:g} {change:+.0f}%'
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from blog.cache import get_card_cache_stats, reset_card_cache_stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Показать счётчики попаданий и промахов кэша карточек постов '
+        '(процессы сервера сбрасывают их в кэш раз в несколько секунд).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Обнулить счётчики после вывода.',
+        )
+
+    def handle(self, *args, **options):
+        stats = get_card_cache_stats()
+        total = stats['hits'] + stats['misses']
+        ratio = stats['hits'] / total if total else 0
+        self.stdout.write(
+            f'hits={stats["hits"]} misses={stats["misses"]} '
+            f'hit_ratio={ratio:.2%}'
+        )
+        if options['reset']:
+            reset_card_cache_stats()
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from blog.transfer import BATCH_SIZE, export_jsonl, open_jsonl
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгрузить категории, локации, пользователей, публикации и '
+        'комментарии в JSON Lines (построчно, без загрузки в память).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help='Файл .jsonl или .jsonl.gz; «-» — вывод в stdout.',
+        )
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        if options['path'] == '-':
+            export_jsonl(self.stdout, batch_size=options['batch_size'])
+            return
+        with open_jsonl(options['path'], 'w') as stream:
+            exported = export_jsonl(
+                stream, batch_size=options['batch_size']
+            )
+        for label, count in exported.items():
+            self.stderr.write(f'{label}: {count}')
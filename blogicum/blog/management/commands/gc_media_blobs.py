@@ -0,0 +1,53 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from blog.images import (
+    BLOB_GC_BATCH_SIZE,
+    BLOB_GC_GRACE,
+    collect_unreferenced_blobs,
+    register_untracked_files,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Удалить файлы изображений постов, на которые не ссылается '
+        'ни один пост, вместе с их уменьшенными копиями.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BLOB_GC_BATCH_SIZE,
+            help='Сколько файлов проверять за один запрос.',
+        )
+        parser.add_argument(
+            '--grace',
+            type=float,
+            default=BLOB_GC_GRACE.total_seconds(),
+            help='Сколько секунд файл без ссылок не трогается.',
+        )
+        parser.add_argument(
+            '--scan',
+            action='store_true',
+            help='Сначала учесть файлы, загруженные до хранилища по хэшу.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только посчитать файлы для удаления.',
+        )
+
+    def handle(self, *args, **options):
+        if options['scan']:
+            registered = register_untracked_files()
+            self.stdout.write(f'Учтено новых файлов: {registered}')
+        removed = collect_unreferenced_blobs(
+            batch_size=options['batch_size'],
+            grace=timedelta(seconds=options['grace']),
+            dry_run=options['dry_run'],
+        )
+        verb = 'К удалению' if options['dry_run'] else 'Удалено'
+        self.stdout.write(f'{verb} файлов: {removed}')
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.synthetic import SyntheticData
+from blog.transfer import BATCH_SIZE, Importer
+
+
+class Command(BaseCommand):
+    help = (
+        'Сгенерировать синтетические данные блога (детерминированно по '
+        '--seed) и загрузить их пачками, как import_blog_data.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--locations', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=1000)
+        parser.add_argument('--comments', type=int, default=5000)
+        parser.add_argument(
+            '--skew',
+            type=float,
+            default=1.1,
+            help=(
+                'Показатель закона Ципфа для комментариев, авторов и '
+                'категорий: 0 — равномерно, больше — неравномернее.'
+            ),
+        )
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        counts = {
+            name: options[name]
+            for name in ('users', 'categories', 'locations', 'posts',
+                         'comments')
+        }
+        if any(value < 0 for value in counts.values()):
+            raise CommandError('Количества не могут быть отрицательными.')
+        if counts['posts'] and not (counts['users'] and counts['categories']):
+            raise CommandError('Для постов нужны пользователи и категории.')
+        if counts['comments'] and not counts['posts']:
+            raise CommandError('Для комментариев нужны посты.')
+        data = SyntheticData(
+            seed=options['seed'], skew=options['skew'], **counts
+        )
+        importer = Importer(
+            batch_size=options['batch_size'], stdout=self.stdout
+        )
+        imported = importer.run(data.records)
+        self.stdout.write(self.style.SUCCESS(
+            f'Добавлено записей: {sum(imported.values())}'
+        ))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from blog.transfer import BATCH_SIZE, import_jsonl
+
+
+class Command(BaseCommand):
+    help = (
+        'Загрузить данные блога из JSON Lines (export_blog_data или '
+        'dumpdata --format jsonl): пачками, с новыми первичными '
+        'ключами. Категории, локации и пользователи, которые уже '
+        'есть в базе (по slug, названию, имени), не дублируются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл .jsonl или .jsonl.gz.')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Сколько записей вставлять за один проход.',
+        )
+
+    def handle(self, *args, **options):
+        imported = import_jsonl(
+            options['path'],
+            batch_size=options['batch_size'],
+            stdout=self.stdout,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Добавлено записей: {sum(imported.values())}'
+        ))
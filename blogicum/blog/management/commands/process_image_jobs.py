@@ -0,0 +1,53 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from blog.jobs import process_pending_jobs, requeue_stale_jobs
+
+
+class Command(BaseCommand):
+    help = (
+        'Обработать очередь изображений постов: поворот по EXIF, '
+        'удаление метаданных и уменьшенные копии. Без --watch '
+        'разбирает очередь один раз (для cron).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--watch',
+            action='store_true',
+            help='Работать постоянно, опрашивая очередь.',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=2,
+            help='Пауза между опросами пустой очереди, в секундах.',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=None,
+            help='Наибольшее число задач за один проход.',
+        )
+        parser.add_argument(
+            '--stale-after',
+            type=float,
+            default=600,
+            help='Через сколько секунд зависшая задача вернётся в очередь.',
+        )
+
+    def handle(self, *args, **options):
+        stale_after = timedelta(seconds=options['stale_after'])
+        while True:
+            requeued = requeue_stale_jobs(stale_after)
+            if requeued:
+                self.stdout.write(f'Возвращено в очередь: {requeued}')
+            processed = process_pending_jobs(options['limit'])
+            if processed:
+                self.stdout.write(f'Обработано изображений: {processed}')
+            if not options['watch']:
+                return
+            if not processed:
+                time.sleep(options['sleep'])
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.cache import check_scheduled_publications, get_next_publication
+
+
+class Command(BaseCommand):
+    help = (
+        'Сменить версию ленты, когда наступает момент отложенной публикации. '
+        'Без --watch выполняет одну проверку (для cron).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--watch',
+            action='store_true',
+            help='Работать постоянно, засыпая до ближайшей публикации.',
+        )
+        parser.add_argument(
+            '--max-sleep',
+            type=float,
+            default=60,
+            help='Наибольшая пауза между проверками, в секундах.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            now = timezone.now()
+            if check_scheduled_publications(now):
+                self.stdout.write(f'{now:%Y-%m-%d %H:%M:%S}: лента обновлена')
+            if not options['watch']:
+                return
+            time.sleep(self.get_sleep_seconds(options['max_sleep']))
+
+    def get_sleep_seconds(self, max_sleep):
+        # момент перечитывается на каждом шаге: новый пост с более ранней
+        # датой публикации сбрасывает его сигналом
+        next_publication = get_next_publication()
+        if next_publication is None:
+            return max_sleep
+        seconds = (next_publication - timezone.now()).total_seconds()
+        return min(max_sleep, max(seconds, 0))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from blog.stats import rebuild_author_stats
+
+
+class Command(BaseCommand):
+    help = 'Пересчитать и исправить статистику авторов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Сколько авторов обрабатывать за один запрос.',
+        )
+
+    def handle(self, *args, **options):
+        checked, fixed = rebuild_author_stats(
+            batch_size=options['batch_size']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Проверено авторов: {checked}, исправлено строк: {fixed}'
+        ))
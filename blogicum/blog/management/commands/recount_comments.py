@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from blog.utils import recount_comment_counts
+
+
+class Command(BaseCommand):
+    help = 'Пересчитать и исправить счётчики комментариев у публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Сколько публикаций обрабатывать за один запрос.',
+        )
+
+    def handle(self, *args, **options):
+        checked, fixed = recount_comment_counts(
+            batch_size=options['batch_size']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Проверено публикаций: {checked}, исправлено счётчиков: {fixed}'
+        ))
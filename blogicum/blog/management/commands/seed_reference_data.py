@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand
+
+from blog.seeding import (
+    DEFAULT_CATEGORIES,
+    DEFAULT_CITIES,
+    SEED_BATCH_SIZE,
+    seed_categories,
+    seed_locations,
+)
+
+
+def read_lines(path):
+    with open(path, encoding='utf-8') as source:
+        return [line for line in source.read().splitlines() if line.strip()]
+
+
+class Command(BaseCommand):
+    help = (
+        'Создать недостающие локации и категории (по умолчанию — стандартные '
+        'списки, либо из файлов: одно название на строку).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--locations',
+            metavar='FILE',
+            help='Файл с названиями локаций.',
+        )
+        parser.add_argument(
+            '--categories',
+            metavar='FILE',
+            help='Файл с названиями категорий.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=SEED_BATCH_SIZE,
+            help='Размер пачки для bulk_create.',
+        )
+
+    def handle(self, *args, **options):
+        locations = (
+            read_lines(options['locations']) if options['locations']
+            else DEFAULT_CITIES
+        )
+        categories = (
+            read_lines(options['categories']) if options['categories']
+            else DEFAULT_CATEGORIES
+        )
+        batch_size = options['batch_size']
+        created_locations = seed_locations(locations, batch_size)
+        created_categories = seed_categories(categories, batch_size)
+        self.stdout.write(self.style.SUCCESS(
+            f'Локации добавлены: {created_locations}, '
+            f'категории добавлены: {created_categories}'
+        ))
@@ -0,0 +1,62 @@
+# Generated by Django 3.2.16 on 2026-10-17 14:20
+
+import blog.storage
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def register_post_images(apps, schema_editor):
+    """Учесть уже загруженные изображения постов со счётчиками ссылок."""
+    Post = apps.get_model('blog', 'Post')
+    MediaBlob = apps.get_model('blog', 'MediaBlob')
+    references = (
+        Post.objects.exclude(image='')
+        .exclude(image__isnull=True)
+        .order_by()
+        .values('image')
+        .annotate(total=Count('pk'))
+    )
+    MediaBlob.objects.bulk_create(
+        (
+            MediaBlob(name=row['image'], ref_count=row['total'])
+            for row in references.iterator()
+        ),
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_imagejob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='Файл')),
+                ('size', models.PositiveBigIntegerField(default=0, verbose_name='Размер, байт')),
+                ('ref_count', models.PositiveIntegerField(default=0, verbose_name='Ссылок')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Добавлено')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Изменено')),
+            ],
+            options={
+                'verbose_name': 'Файл изображения',
+                'verbose_name_plural': 'Файлы изображений',
+                'ordering': ('-created_at',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='mediablob',
+            index=models.Index(condition=models.Q(ref_count=0), fields=['updated_at'], name='mediablob_unreferenced_idx'),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=blog.storage.ContentAddressedStorage(), upload_to='posts_images', verbose_name='Изображение'),
+        ),
+        migrations.RunPython(register_post_images, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,103 @@
+# Generated by Django 3.2.16 on 2026-10-17 15:10
+
+import re
+
+from django.db import migrations
+import snowballstemmer
+
+# схема и разбор текста зафиксированы на момент миграции: дальнейшие
+# изменения blog.search её не меняют (индекс потом перестраивает
+# rebuild_search_index)
+SEARCH_TABLE = 'blog_post_search'
+SEARCH_CONFIG = 'russian'
+BATCH_SIZE = 500
+
+SQLITE_SCHEMA = [
+    "CREATE VIRTUAL TABLE blog_post_search USING fts5("
+    "title, text, tokenize='unicode61 remove_diacritics 0')",
+]
+POSTGRES_SCHEMA = [
+    'CREATE TABLE blog_post_search ('
+    'post_id bigint PRIMARY KEY REFERENCES blog_post (id) '
+    'ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, '
+    'document tsvector NOT NULL)',
+    'CREATE INDEX blog_post_search_document_idx '
+    'ON blog_post_search USING GIN (document)',
+]
+DROP_SCHEMA = ['DROP TABLE IF EXISTS blog_post_search']
+SQLITE_INSERT = (
+    'INSERT INTO blog_post_search (rowid, title, text) VALUES (%s, %s, %s)'
+)
+POSTGRES_INSERT = (
+    'INSERT INTO blog_post_search (post_id, document) VALUES ('
+    "%s, setweight(to_tsvector('russian', %s), 'A') || "
+    "setweight(to_tsvector('russian', %s), 'B'))"
+)
+
+WORD_RE = re.compile(r'\w+')
+CYRILLIC_RE = re.compile('[а-яё]')
+
+
+def search_terms(text, stemmers):
+    """Основы слов: кириллица — русским стеммером, латиница — английским."""
+    words = WORD_RE.findall((text or '').lower())
+    return ' '.join(
+        word if word.isdigit() else stemmers[
+            'russian' if CYRILLIC_RE.search(word) else 'english'
+        ].stemWord(word)
+        for word in words
+    )
+
+
+def create_index(apps, schema_editor):
+    """Создать полнотекстовый индекс и проиндексировать имеющиеся посты."""
+    db = schema_editor.connection
+    if db.vendor not in ('sqlite', 'postgresql'):
+        return
+    schema = SQLITE_SCHEMA if db.vendor == 'sqlite' else POSTGRES_SCHEMA
+    stemmers = {
+        language: snowballstemmer.stemmer(language)
+        for language in ('russian', 'english')
+    }
+    Post = apps.get_model('blog', 'Post')
+    posts = Post.objects.using(db.alias).order_by('pk')
+    with db.cursor() as cursor:
+        for sql in schema:
+            cursor.execute(sql)
+        last_pk = 0
+        while True:
+            batch = list(
+                posts.filter(pk__gt=last_pk)
+                .values_list('pk', 'title', 'text')[:BATCH_SIZE]
+            )
+            if not batch:
+                break
+            if db.vendor == 'sqlite':
+                cursor.executemany(SQLITE_INSERT, [
+                    (pk, search_terms(title, stemmers),
+                     search_terms(text, stemmers))
+                    for pk, title, text in batch
+                ])
+            else:
+                cursor.executemany(POSTGRES_INSERT, batch)
+            last_pk = batch[-1][0]
+
+
+def drop_index(apps, schema_editor):
+    db = schema_editor.connection
+    if db.vendor not in ('sqlite', 'postgresql'):
+        return
+    with db.cursor() as cursor:
+        for sql in DROP_SCHEMA:
+            cursor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_mediablob'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 3.2.16 on 2026-10-17 15:40
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def fill_author_stats(apps, schema_editor):
+    """Посчитать статистику всех имеющихся авторов."""
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    Post = apps.get_model('blog', 'Post')
+    Comment = apps.get_model('blog', 'Comment')
+    AuthorStats = apps.get_model('blog', 'AuthorStats')
+
+    def totals(queryset, field):
+        return dict(
+            queryset.order_by()
+            .values(field)
+            .annotate(total=Count('pk'))
+            .values_list(field, 'total')
+        )
+
+    posts = totals(Post.objects.all(), 'author')
+    published = totals(Post.objects.filter(is_published=True), 'author')
+    received = totals(Comment.objects.all(), 'post__author')
+    AuthorStats.objects.bulk_create(
+        (
+            AuthorStats(
+                user_id=pk,
+                posts=posts.get(pk, 0),
+                published_posts=published.get(pk, 0),
+                comments_received=received.get(pk, 0),
+            )
+            for pk in User.objects.values_list('pk', flat=True).iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('blog', '0009_post_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='author_stats', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('posts', models.PositiveIntegerField(default=0, verbose_name='Публикаций')),
+                ('published_posts', models.PositiveIntegerField(default=0, help_text='Публикации с отметкой «Опубликовано».', verbose_name='Опубликовано')),
+                ('comments_received', models.PositiveIntegerField(default=0, verbose_name='Комментариев к публикациям')),
+            ],
+            options={
+                'verbose_name': 'Статистика автора',
+                'verbose_name_plural': 'Статистика авторов',
+                'ordering': ('-published_posts',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='authorstats',
+            index=models.Index(fields=['-published_posts'], name='authorstats_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='authorstats',
+            index=models.Index(fields=['-comments_received'], name='authorstats_comments_idx'),
+        ),
+        migrations.RunPython(fill_author_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 3.2.16 on 2026-10-17 16:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_authorstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imagejob',
+            name='next_attempt_at',
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name='Следующая попытка'
+            ),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 3.2.16 on 2026-10-17 16:45
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def merge_duplicate_locations(apps, schema_editor):
+    """Оставить по одной локации на название; посты — на оставшуюся."""
+    Location = apps.get_model('blog', 'Location')
+    Post = apps.get_model('blog', 'Post')
+    duplicates = (
+        Location.objects.values('name')
+        .annotate(total=Count('pk'), keep=Min('pk'))
+        .filter(total__gt=1)
+        .order_by()
+    )
+    for duplicate in duplicates:
+        extra = Location.objects.filter(name=duplicate['name']).exclude(
+            pk=duplicate['keep']
+        )
+        Post.objects.filter(location__in=extra).update(
+            location=duplicate['keep']
+        )
+        extra.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_imagejob_next_attempt_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            merge_duplicate_locations, migrations.RunPython.noop
+        ),
+        migrations.AlterField(
+            model_name='location',
+            name='name',
+            field=models.CharField(
+                max_length=256, unique=True, verbose_name='Местоположение'
+            ),
+        ),
+    ]
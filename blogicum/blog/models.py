@@ -2,6 +2,8 @@ from django.conf import settings
 from django.db import models
 from django.urls import reverse
 
+from .storage import post_image_storage
+
 
 class PublishedModel(models.Model):
     is_published = models.BooleanField('Опубликовано', default=True)
@@ -26,7 +28,9 @@ class Category(PublishedModel):
 
 
 class Location(PublishedModel):
-    name = models.CharField(max_length=256, verbose_name='Местоположение')
+    name = models.CharField(
+        max_length=256, unique=True, verbose_name='Местоположение'
+    )
 
     class Meta:
         verbose_name = 'Местоположение'
@@ -65,14 +69,44 @@ class Post(PublishedModel):
     image = models.ImageField(
         'Изображение',
         upload_to='posts_images',
+        storage=post_image_storage,
         blank=True,
         null=True,
     )
+    image_variants = models.JSONField(
+        'Уменьшенные копии изображения',
+        default=dict,
+        blank=True,
+        editable=False,
+    )
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False,
+    )
 
     class Meta:
         verbose_name = 'Публикация'
         verbose_name_plural = 'Публикации'
         ordering = ('-pub_date',)
+        indexes = (
+            # частичные индексы: условие is_published совпадает с фильтром
+            # ленты, а pub_date обслуживает и диапазон, и сортировку
+            models.Index(
+                fields=('-pub_date',),
+                name='post_published_pub_date_idx',
+                condition=models.Q(is_published=True),
+            ),
+            models.Index(
+                fields=('category', '-pub_date'),
+                name='post_category_pub_date_idx',
+                condition=models.Q(is_published=True),
+            ),
+            models.Index(
+                fields=('author', '-pub_date'),
+                name='post_author_pub_date_idx',
+            ),
+        )
 
     def __str__(self) -> str:
         return self.title
@@ -101,6 +135,124 @@ class Comment(models.Model):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('created_at',)
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at'),
+                name='comment_post_created_at_idx',
+            ),
+        )
 
     def __str__(self) -> str:
         return self.text[:30]
+
+
+class ImageJob(models.Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Обрабатывается'),
+        (DONE, 'Готово'),
+        (FAILED, 'Ошибка'),
+    )
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='image_jobs',
+        verbose_name='Публикация',
+    )
+    image_name = models.CharField('Файл изображения', max_length=255)
+    status = models.CharField(
+        'Статус', max_length=16, choices=STATUS_CHOICES, default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    error = models.TextField('Ошибка', blank=True)
+    created_at = models.DateTimeField('Добавлено', auto_now_add=True)
+    started_at = models.DateTimeField('Начато', null=True, blank=True)
+    finished_at = models.DateTimeField('Завершено', null=True, blank=True)
+    next_attempt_at = models.DateTimeField(
+        'Следующая попытка', null=True, blank=True
+    )
+
+    class Meta:
+        verbose_name = 'Обработка изображения'
+        verbose_name_plural = 'Обработка изображений'
+        ordering = ('-created_at',)
+        indexes = (
+            models.Index(
+                fields=('status', 'created_at'),
+                name='imagejob_status_created_idx',
+            ),
+        )
+
+    def __str__(self) -> str:
+        return f'{self.image_name} ({self.get_status_display()})'
+
+
+class MediaBlob(models.Model):
+    name = models.CharField('Файл', max_length=255, unique=True)
+    size = models.PositiveBigIntegerField('Размер, байт', default=0)
+    ref_count = models.PositiveIntegerField('Ссылок', default=0)
+    created_at = models.DateTimeField('Добавлено', auto_now_add=True)
+    updated_at = models.DateTimeField('Изменено', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Файл изображения'
+        verbose_name_plural = 'Файлы изображений'
+        ordering = ('-created_at',)
+        indexes = (
+            models.Index(
+                fields=('updated_at',),
+                name='mediablob_unreferenced_idx',
+                condition=models.Q(ref_count=0),
+            ),
+        )
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class AuthorStats(models.Model):
+    """
+    Счётчики автора, которые сигналы обновляют при записи постов и
+    комментариев: страница профиля и рейтинги читают одну строку по
+    первичному ключу вместо агрегатов по всем таблицам.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='author_stats',
+        verbose_name='Автор',
+    )
+    posts = models.PositiveIntegerField('Публикаций', default=0)
+    published_posts = models.PositiveIntegerField(
+        'Опубликовано',
+        default=0,
+        help_text='Публикации с отметкой «Опубликовано».',
+    )
+    comments_received = models.PositiveIntegerField(
+        'Комментариев к публикациям', default=0
+    )
+
+    class Meta:
+        verbose_name = 'Статистика автора'
+        verbose_name_plural = 'Статистика авторов'
+        ordering = ('-published_posts',)
+        indexes = (
+            models.Index(
+                fields=('-published_posts',),
+                name='authorstats_published_idx',
+            ),
+            models.Index(
+                fields=('-comments_received',),
+                name='authorstats_comments_idx',
+            ),
+        )
+
+    def __str__(self) -> str:
+        return f'Статистика {self.user}'
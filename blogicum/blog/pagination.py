@@ -0,0 +1,144 @@
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+from datetime import datetime
+
+from django.conf import settings
+from django.http import Http404
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def encode_cursor(obj, direction, field='pub_date'):
+    """Упаковать позицию (field, id) в непрозрачный токен для URL."""
+    raw = json.dumps([getattr(obj, field).isoformat(), obj.pk, direction])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Распаковать токен курсора; при любой ошибке — InvalidCursor."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        value, pk, direction = json.loads(
+            base64.urlsafe_b64decode(padded.encode())
+        )
+        if direction not in (NEXT, PREVIOUS):
+            raise ValueError(direction)
+        return datetime.fromisoformat(value), int(pk), direction
+    except (binascii.Error, TypeError, ValueError) as error:
+        raise InvalidCursor(token) from error
+
+
+class CursorPage(Sequence):
+    """Страница курсорной пагинации: без номера страницы и общего числа."""
+
+    is_cursor = True
+
+    def __init__(self, object_list, has_next, has_previous, field='pub_date'):
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.field = field
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self.object_list)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if self._has_next:
+            return encode_cursor(self.object_list[-1], NEXT, self.field)
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self._has_previous:
+            return encode_cursor(self.object_list[0], PREVIOUS, self.field)
+        return None
+
+
+class CursorPaginator:
+    """
+    Keyset-пагинация по (field, id), по умолчанию (pub_date, id) от новых
+    к старым.
+
+    Каждая страница — один запрос с LIMIT per_page + 1 по индексу field,
+    без COUNT(*) и OFFSET, поэтому глубокие страницы стоят как первая.
+    """
+
+    def __init__(self, queryset, per_page, field='pub_date', descending=True):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.field = field
+        self.descending = descending
+
+    def page(self, cursor=None):
+        if not cursor:
+            return self._fetch(self.queryset, NEXT, has_other=False)
+        value, pk, direction = decode_cursor(cursor)
+        # «после» курсора в порядке выдачи: для убывающего порядка — меньше
+        after = (direction == NEXT) == self.descending
+        bound, pk_bound = ('lte', 'gte') if after else ('gte', 'lte')
+        queryset = self.queryset.filter(
+            **{f'{self.field}__{bound}': value}
+        ).exclude(**{self.field: value, f'pk__{pk_bound}': pk})
+        return self._fetch(queryset, direction, has_other=True)
+
+    def _fetch(self, queryset, direction, has_other):
+        forward = direction == NEXT
+        prefix = '-' if forward == self.descending else ''
+        items = list(
+            queryset.order_by(f'{prefix}{self.field}', f'{prefix}pk')
+            [:self.per_page + 1]
+        )
+        has_more = len(items) > self.per_page
+        items = items[:self.per_page]
+        if not forward:
+            items.reverse()
+        return CursorPage(
+            items,
+            has_next=has_more if forward else has_other,
+            has_previous=has_other if forward else has_more,
+            field=self.field,
+        )
+
+
+class CursorPaginationMixin:
+    """
+    Включает курсорную пагинацию в ListView при BLOG_CURSOR_PAGINATION.
+
+    Позиция передаётся GET-параметром cursor; без настройки
+    остаётся обычная постраничная пагинация Django.
+    """
+
+    cursor_kwarg = 'cursor'
+
+    def paginate_queryset(self, queryset, page_size):
+        if not getattr(settings, 'BLOG_CURSOR_PAGINATION', False):
+            return super().paginate_queryset(queryset, page_size)
+        paginator = CursorPaginator(queryset, page_size)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidCursor:
+            raise Http404('Неверный курсор страницы')
+        return paginator, page, page.object_list, page.has_other_pages()
@@ -0,0 +1,98 @@
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.query import ModelIterable
+from django.http import Http404
+
+from .cache import get_refs_version
+from .models import Category, Location, Post
+
+# связи поста, которые подставляются из справочников
+REF_FIELDS = (
+    ('category', 'categories'),
+    ('location', 'locations'),
+)
+
+_tables = None
+
+
+class RefTables:
+    """
+    Таблицы категорий и локаций одной версии справочников.
+
+    Объекты общие для всех запросов процесса — только для чтения.
+    """
+
+    def __init__(self, version):
+        self.version = version
+        # из основной базы, мимо роутера: таблицы живут в процессе до
+        # следующей смены версии, и копия с отстающей реплики осталась
+        # бы устаревшей надолго
+        self.categories = {
+            category.pk: category
+            for category in Category.objects.using(DEFAULT_DB_ALIAS)
+            .order_by('pk')
+        }
+        self.locations = {
+            location.pk: location
+            for location in Location.objects.using(DEFAULT_DB_ALIAS)
+            .order_by('pk')
+        }
+        self.category_slugs = {
+            category.slug: category for category in self.categories.values()
+        }
+        self.published_category_ids = [
+            pk for pk, category in self.categories.items()
+            if category.is_published
+        ]
+
+    def attach(self, post):
+        """Подставить посту категорию и локацию без запросов к БД."""
+        for name, table in REF_FIELDS:
+            field = Post._meta.get_field(name)
+            obj = getattr(self, table).get(getattr(post, field.attname))
+            if obj is not None:
+                field.set_cached_value(post, obj)
+
+
+def get_ref_tables():
+    """
+    Справочники из памяти процесса.
+
+    Перечитываются из БД, когда сменилась версия справочников в кэше:
+    её меняет bump_refs_version в любом процессе (сигналы сохранения
+    категорий и локаций, импорт, заполнение справочников).
+    """
+    global _tables
+    version = get_refs_version()
+    if version is None:
+        # кэш без хранения (DummyCache): версию не узнать
+        return RefTables(version)
+    tables = _tables
+    if tables is None or tables.version != version:
+        tables = RefTables(version)
+        _tables = tables
+    return tables
+
+
+class RefTablesIterable(ModelIterable):
+    """Посты с категорией и локацией из справочников вместо JOIN."""
+
+    def __iter__(self):
+        tables = get_ref_tables()
+        for post in super().__iter__():
+            tables.attach(post)
+            yield post
+
+
+def with_ref_tables(queryset):
+    """Queryset постов, которым связи подставляются из справочников."""
+    queryset = queryset.all()
+    queryset._iterable_class = RefTablesIterable
+    return queryset
+
+
+def get_published_category(slug):
+    """Опубликованная категория по слагу или 404."""
+    category = get_ref_tables().category_slugs.get(slug)
+    if category is None or not category.is_published:
+        raise Http404('Категория не найдена или снята с публикации')
+    return category
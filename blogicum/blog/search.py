@@ -0,0 +1,220 @@
+import re
+import threading
+from functools import lru_cache
+
+import snowballstemmer
+from django.db import connection, connections, router, transaction
+from django.db.models import Q
+
+from .models import Post
+
+SEARCH_TABLE = 'blog_post_search'
+# конфигурация PostgreSQL: русский стеммер, латиница — английский
+SEARCH_CONFIG = 'russian'
+MAX_QUERY_LENGTH = 200
+MAX_QUERY_TERMS = 16
+STEM_CACHE_SIZE = 50_000
+# совпадение в заголовке весит больше, чем в тексте
+TITLE_WEIGHT = 4.0
+TEXT_WEIGHT = 1.0
+
+WORD_RE = re.compile(r'\w+')
+CYRILLIC_RE = re.compile('[а-яё]')
+
+_stemmers = threading.local()
+
+SQLITE_SCHEMA = [
+    # rowid строки индекса — id поста; в индексе лежат основы слов,
+    # поэтому токенизатору остаётся только разбить их по пробелам
+    f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5("
+    f"title, text, tokenize='unicode61 remove_diacritics 0')",
+]
+POSTGRES_SCHEMA = [
+    f'CREATE TABLE {SEARCH_TABLE} ('
+    f'post_id bigint PRIMARY KEY REFERENCES blog_post (id) '
+    f'ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, '
+    f'document tsvector NOT NULL)',
+    f'CREATE INDEX {SEARCH_TABLE}_document_idx '
+    f'ON {SEARCH_TABLE} USING GIN (document)',
+]
+DROP_SCHEMA = [f'DROP TABLE IF EXISTS {SEARCH_TABLE}']
+
+
+def has_search_index(db=connection):
+    """Есть ли у базы полнотекстовый индекс (SQLite FTS5 или PostgreSQL)."""
+    return db.vendor in ('sqlite', 'postgresql')
+
+
+def create_search_index(db):
+    if not has_search_index(db):
+        return
+    schema = SQLITE_SCHEMA if db.vendor == 'sqlite' else POSTGRES_SCHEMA
+    with db.cursor() as cursor:
+        for sql in schema:
+            cursor.execute(sql)
+
+
+def drop_search_index(db):
+    if not has_search_index(db):
+        return
+    with db.cursor() as cursor:
+        for sql in DROP_SCHEMA:
+            cursor.execute(sql)
+
+
+def search_terms(text):
+    """
+    Основы слов текста в нижнем регистре (для индекса SQLite и запроса).
+
+    Кириллица — русским стеммером Snowball, латиница — английским,
+    как в конфигурации russian у PostgreSQL: «кошками» и «кошки»
+    дают одну основу «кошк».
+    """
+    words = WORD_RE.findall((text or '').lower())
+    # числа не стеммируются и не вытесняют слова из кэша
+    return [word if word.isdigit() else stem_word(word) for word in words]
+
+
+# словарь текстов невелик, а стеммер на чистом Python медленный:
+# основы частых слов берутся из кэша (при индексации — в разы быстрее)
+@lru_cache(maxsize=STEM_CACHE_SIZE)
+def stem_word(word):
+    # стеммеры хранят состояние — у каждого потока свои экземпляры
+    stemmers = getattr(_stemmers, 'value', None)
+    if stemmers is None:
+        stemmers = _stemmers.value = {
+            language: snowballstemmer.stemmer(language)
+            for language in ('russian', 'english')
+        }
+    language = 'russian' if CYRILLIC_RE.search(word) else 'english'
+    return stemmers[language].stemWord(word)
+
+
+def write_index(db, rows):
+    """Записать в индекс строки (id поста, заголовок, текст)."""
+    rows = list(rows)
+    if not rows or not has_search_index(db):
+        return
+    with db.cursor() as cursor:
+        if db.vendor == 'sqlite':
+            cursor.executemany(
+                f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s',
+                [(pk,) for pk, _, _ in rows],
+            )
+            cursor.executemany(
+                f'INSERT INTO {SEARCH_TABLE} (rowid, title, text) '
+                f'VALUES (%s, %s, %s)',
+                [
+                    (pk, ' '.join(search_terms(title)),
+                     ' '.join(search_terms(text)))
+                    for pk, title, text in rows
+                ],
+            )
+            return
+        cursor.executemany(
+            f'INSERT INTO {SEARCH_TABLE} (post_id, document) VALUES ('
+            f"%s, setweight(to_tsvector('{SEARCH_CONFIG}', %s), 'A') || "
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', %s), 'B')) "
+            f'ON CONFLICT (post_id) '
+            f'DO UPDATE SET document = EXCLUDED.document',
+            rows,
+        )
+
+
+def index_connection():
+    """Соединение, куда роутер пишет посты, — там же и их индекс."""
+    return connections[router.db_for_write(Post)]
+
+
+def index_post(post):
+    write_index(index_connection(), [(post.pk, post.title, post.text)])
+
+
+def unindex_post(post_id):
+    db = index_connection()
+    if not has_search_index(db):
+        return
+    column = 'rowid' if db.vendor == 'sqlite' else 'post_id'
+    with db.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {SEARCH_TABLE} WHERE {column} = %s', [post_id]
+        )
+
+
+def rebuild_search_index(batch_size=500):
+    """
+    Перестроить индекс по всем постам, пачками по batch_size.
+
+    Выполняется в одной транзакции: пока индекс строится, читатели
+    видят прежний. Возвращает число проиндексированных постов.
+    """
+    indexed = 0
+    db = index_connection()
+    if not has_search_index(db):
+        return indexed
+    with transaction.atomic(using=db.alias):
+        with db.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        last_pk = 0
+        while True:
+            batch = list(
+                Post.objects.using(db.alias).filter(pk__gt=last_pk)
+                .order_by('pk')
+                .values_list('pk', 'title', 'text')[:batch_size]
+            )
+            if not batch:
+                break
+            write_index(db, batch)
+            indexed += len(batch)
+            last_pk = batch[-1][0]
+    return indexed
+
+
+def search_posts(queryset, query):
+    """
+    Отфильтровать queryset постов по запросу, лучшие совпадения — первыми.
+
+    Поиск идёт по индексу: соединение с таблицей SEARCH_TABLE по id
+    поста, релевантность — в аннотации search_rank (больше — лучше).
+    Без индекса (другие СУБД) — поиск подстроки в заголовке и тексте.
+    """
+    query = (query or '').strip()[:MAX_QUERY_LENGTH]
+    post_id = f'{Post._meta.db_table}.id'
+    if connection.vendor == 'sqlite':
+        terms = list(dict.fromkeys(search_terms(query)))[:MAX_QUERY_TERMS]
+        if not terms:
+            return queryset.none()
+        # каждая основа в кавычках: AND, OR, NEAR в запросе — просто слова
+        match = ' '.join(f'"{term}"' for term in terms)
+        queryset = queryset.extra(
+            tables=[SEARCH_TABLE],
+            where=[
+                f'{SEARCH_TABLE}.rowid = {post_id}',
+                f'{SEARCH_TABLE} MATCH %s',
+            ],
+            params=[match],
+            select={'search_rank': f'-bm25({SEARCH_TABLE}, %s, %s)'},
+            select_params=[TITLE_WEIGHT, TEXT_WEIGHT],
+        )
+    elif connection.vendor == 'postgresql':
+        if not WORD_RE.search(query):
+            return queryset.none()
+        tsquery = f"websearch_to_tsquery('{SEARCH_CONFIG}', %s)"
+        rank = f'ts_rank_cd({SEARCH_TABLE}.document, {tsquery})'
+        queryset = queryset.extra(
+            tables=[SEARCH_TABLE],
+            where=[
+                f'{SEARCH_TABLE}.post_id = {post_id}',
+                f'{SEARCH_TABLE}.document @@ {tsquery}',
+            ],
+            params=[query],
+            select={'search_rank': rank},
+            select_params=[query],
+        )
+    else:
+        if not query:
+            return queryset.none()
+        return queryset.filter(
+            Q(title__icontains=query) | Q(text__icontains=query)
+        ).order_by('-pub_date')
+    return queryset.order_by('-search_rank', '-pub_date')
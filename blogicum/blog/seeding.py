@@ -0,0 +1,161 @@
+from django.db.models import Q
+from django.utils.text import slugify
+
+from .cache import bump_refs_version
+from .models import Category, Location
+
+DEFAULT_CITIES = [
+    "Москва",
+    "Санкт-Петербург",
+    "Омск",
+    "Саратов",
+    "Казань",
+    "Новосибирск",
+    "Екатеринбург",
+    "Самара",
+    "Нижний Новгород",
+    "Ростов-на-Дону",
+    "Краснодар",
+    "Уфа",
+]
+
+DEFAULT_CATEGORIES = [
+    "Путешествия",
+    "Туризм",
+    "Развлечения",
+    "Еда",
+    "Спорт",
+    "Технологии",
+    "Учёба",
+    "Музыка",
+]
+
+SEED_BATCH_SIZE = 1000
+# длина слага до суффикса «-N», чтобы слаг с суффиксом влез в поле
+SLUG_BASE_LENGTH = 60
+
+TRANSLIT = str.maketrans({
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "e",
+    "ж": "zh", "з": "z", "и": "i", "й": "i", "к": "k", "л": "l", "м": "m",
+    "н": "n", "о": "o", "п": "p", "р": "r", "с": "s", "т": "t", "у": "u",
+    "ф": "f", "х": "kh", "ц": "ts", "ч": "ch", "ш": "sh", "щ": "shch",
+    "ъ": "", "ы": "y", "ь": "", "э": "e", "ю": "iu", "я": "ia",
+})
+
+
+def make_slug(title):
+    """Латинский слаг из (в том числе русского) названия."""
+    max_length = Category._meta.get_field("slug").max_length
+    slug = slugify(title.lower().translate(TRANSLIT))[:max_length]
+    return slug or "category"
+
+
+def _unique_values(values):
+    stripped = (value.strip() for value in values)
+    return list(dict.fromkeys(value for value in stripped if value))
+
+
+def _existing_values(model, field, values, batch_size):
+    """Значения field, уже есть в таблице (запросы пачками по batch_size)."""
+    existing = set()
+    for start in range(0, len(values), batch_size):
+        existing.update(
+            model.objects.filter(
+                **{f"{field}__in": values[start:start + batch_size]}
+            ).values_list(field, flat=True)
+        )
+    return existing
+
+
+def _taken_slugs(bases, batch_size):
+    """Занятые слаги из bases вместе с вариантами с суффиксом (base-N)."""
+    taken = set()
+    for start in range(0, len(bases), batch_size):
+        condition = Q()
+        for base in bases[start:start + batch_size]:
+            condition |= Q(slug=base) | Q(
+                slug__startswith=f"{base[:SLUG_BASE_LENGTH]}-"
+            )
+        taken.update(
+            Category.objects.filter(condition).values_list("slug", flat=True)
+        )
+    return taken
+
+
+def _count_inserted(model, field, objs, batch_size):
+    """
+    Сколько из objs действительно вставлено bulk_create(ignore_conflicts).
+
+    Вставка ничего не сообщает о пропущенных строках, поэтому строки
+    сверяются по ключу и времени создания: created_at заполняется
+    при вставке, и у строки параллельного процесса он другой.
+    """
+    ours = {(getattr(obj, field), obj.created_at) for obj in objs}
+    keys = [getattr(obj, field) for obj in objs]
+    found = set()
+    for start in range(0, len(keys), batch_size):
+        found.update(
+            model.objects.filter(
+                **{f"{field}__in": keys[start:start + batch_size]}
+            ).values_list(field, "created_at")
+        )
+    return len(ours & found)
+
+
+def seed_locations(names, batch_size=SEED_BATCH_SIZE):
+    """
+    Создать недостающие опубликованные локации.
+
+    Существующие находятся одним запросом на пачку, новые вставляются
+    bulk_create; название уникально, так что локации, вставленные
+    параллельно, пропускаются (ignore_conflicts). Возвращает число
+    вставленных локаций.
+    """
+    names = _unique_values(names)
+    existing = _existing_values(Location, "name", names, batch_size)
+    locations = [
+        Location(name=name, is_published=True)
+        for name in names if name not in existing
+    ]
+    Location.objects.bulk_create(
+        locations, batch_size=batch_size, ignore_conflicts=True
+    )
+    if not locations:
+        return 0
+    # bulk_create не шлёт сигналов: справочники перечитать явно
+    bump_refs_version()
+    return _count_inserted(Location, "name", locations, batch_size)
+
+
+def seed_categories(titles, batch_size=SEED_BATCH_SIZE):
+    """
+    Создать недостающие опубликованные категории со сгенерированным слагом.
+
+    Занятые слаги, включая уже выданные варианты с суффиксом, получают
+    следующий числовой суффикс; конфликты с параллельной вставкой
+    пропускаются (ignore_conflicts). Возвращает число вставленных
+    категорий.
+    """
+    titles = _unique_values(titles)
+    existing = _existing_values(Category, "title", titles, batch_size)
+    missing = [title for title in titles if title not in existing]
+    slugs = {title: make_slug(title) for title in missing}
+    taken = _taken_slugs(list(dict.fromkeys(slugs.values())), batch_size)
+    categories = []
+    for title in missing:
+        slug = base = slugs[title]
+        suffix = 1
+        while slug in taken:
+            suffix += 1
+            slug = f"{base[:SLUG_BASE_LENGTH]}-{suffix}"
+        taken.add(slug)
+        categories.append(Category(
+            title=title, slug=slug, description=title, is_published=True,
+        ))
+    Category.objects.bulk_create(
+        categories, batch_size=batch_size, ignore_conflicts=True
+    )
+    if not categories:
+        return 0
+    bump_refs_version()
+    return _count_inserted(Category, "slug", categories, batch_size)
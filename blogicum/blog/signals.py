@@ -0,0 +1,171 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .cache import (
+    bump_feed_version,
+    bump_post_version,
+    bump_refs_version,
+    forget_next_publication,
+)
+from .images import ready_variants
+from .jobs import enqueue_image_job
+from .models import AuthorStats, Category, Comment, Location, Post
+from .search import index_post, unindex_post
+from .stats import change_author_stats, change_comments_received
+from .storage import acquire_blob, release_blob
+from .utils import change_comment_count
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, raw=False, **kwargs):
+    """Увеличить счётчики комментариев поста и его автора."""
+    if created and not raw:
+        change_comment_count(instance.post_id, 1)
+        change_comments_received(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    """Уменьшить счётчики комментариев поста и его автора."""
+    change_comment_count(instance.post_id, -1)
+    change_comments_received(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_post_card(sender, instance, **kwargs):
+    """Сбросить кэш карточки поста (для комментария — его поста) и ленты."""
+    bump_post_version(instance.post_id if sender is Comment else instance.pk)
+    bump_feed_version()
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def track_next_publication(sender, instance, **kwargs):
+    """Пересчитать момент ближайшей публикации при изменении постов."""
+    forget_next_publication()
+
+
+@receiver(post_save, sender=Post)
+def update_search_index(sender, instance, **kwargs):
+    """Переиндексировать заголовок и текст сохранённого поста."""
+    index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def remove_from_search_index(sender, instance, **kwargs):
+    """Убрать удалённый пост из поискового индекса."""
+    unindex_post(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def queue_image_processing(sender, instance, raw=False, **kwargs):
+    """Поставить новое или сменившееся изображение в очередь обработки."""
+    if not raw and instance.image and not ready_variants(instance):
+        enqueue_image_job(instance)
+
+
+@receiver(pre_save, sender=Post)
+def remember_previous_state(sender, instance, raw=False, **kwargs):
+    """Запомнить поля поста, какими они были в БД до сохранения."""
+    previous = None
+    if not raw and not instance._state.adding:
+        # из БД, а не из экземпляра: файл мог сменить воркер обработки
+        previous = (
+            Post.objects.filter(pk=instance.pk)
+            .values('image', 'author_id', 'is_published')
+            .first()
+        )
+    instance._previous_state = previous
+
+
+@receiver(post_save, sender=Post)
+def count_image_references(sender, instance, raw=False, **kwargs):
+    """Перенести ссылку со старого блоба изображения на новый."""
+    if raw:
+        return
+    previous = getattr(instance, '_previous_state', None) or {}
+    previous = previous.get('image') or ''
+    current = instance.image.name or ''
+    if previous == current:
+        return
+    if current:
+        acquire_blob(current)
+    if previous:
+        release_blob(previous)
+
+
+@receiver(post_save, sender=Post)
+def count_author_posts(sender, instance, created, raw=False, **kwargs):
+    """Учесть новый пост, смену автора или публикации в AuthorStats."""
+    if raw:
+        return
+    published = int(instance.is_published)
+    if created:
+        change_author_stats(
+            instance.author_id, posts=1, published_posts=published
+        )
+        return
+    previous = getattr(instance, '_previous_state', None)
+    if previous is None:
+        return
+    was_published = int(previous['is_published'])
+    if previous['author_id'] != instance.author_id:
+        # смена автора редка: считаем по таблице, а не по comment_count,
+        # который сохранение устаревшего экземпляра могло перезаписать
+        comments = Comment.objects.filter(post_id=instance.pk).count()
+        change_author_stats(
+            previous['author_id'], posts=-1,
+            published_posts=-was_published, comments_received=-comments,
+        )
+        change_author_stats(
+            instance.author_id, posts=1,
+            published_posts=published, comments_received=comments,
+        )
+    elif was_published != published:
+        change_author_stats(
+            instance.author_id, published_posts=published - was_published
+        )
+
+
+@receiver(post_delete, sender=Post)
+def discount_author_post(sender, instance, **kwargs):
+    """Убрать удалённый пост из счётчиков автора."""
+    # комментарии поста к этому моменту уже удалены каскадом и вычтены
+    change_author_stats(
+        instance.author_id,
+        posts=-1,
+        published_posts=-int(instance.is_published),
+    )
+
+
+@receiver(post_delete, sender=Post)
+def release_image(sender, instance, **kwargs):
+    """Освободить блоб изображения удалённого поста."""
+    if instance.image:
+        release_blob(instance.image.name)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def create_author_stats(sender, instance, created, raw=False, **kwargs):
+    """Завести пустую строку AuthorStats для нового пользователя."""
+    if created and not raw:
+        AuthorStats.objects.get_or_create(user_id=instance.pk)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_all_post_cards(sender, instance, update_fields=None, **kwargs):
+    """Сбросить все карточки и ленту: названия или видимость сменились."""
+    # при каждом входе пользователя сохраняется last_login — это не повод
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    bump_refs_version()
+    bump_feed_version()
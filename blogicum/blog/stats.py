@@ -0,0 +1,120 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import AuthorStats, Comment, Post
+
+User = get_user_model()
+
+STATS_FIELDS = ('posts', 'published_posts', 'comments_received')
+ACTUAL_FIELDS = tuple(f'actual_{name}' for name in STATS_FIELDS)
+
+
+def change_author_stats(user_id, **deltas):
+    """
+    Атомарно изменить счётчики автора на deltas (posts=1, ...).
+
+    Только UPDATE: строку заводит сигнал создания пользователя или
+    rebuild_author_stats, а при каскадном удалении пользователя
+    изменения уходят в уже удалённую строку и ничего не воскрешают.
+    """
+    changes = {
+        name: F(name) + delta for name, delta in deltas.items() if delta
+    }
+    if user_id is not None and changes:
+        AuthorStats.objects.filter(pk=user_id).update(**changes)
+
+
+def change_comments_received(post_id, delta):
+    """Изменить число комментариев, полученных автором поста post_id."""
+    AuthorStats.objects.filter(
+        pk=Subquery(Post.objects.filter(pk=post_id).values('author_id')[:1])
+    ).update(comments_received=F('comments_received') + delta)
+
+
+def actual_author_stats():
+    """Выражения счётчиков автора по таблицам постов и комментариев."""
+
+    def count(queryset, field):
+        return Coalesce(
+            Subquery(
+                queryset.filter(**{field: OuterRef('pk')})
+                .order_by()
+                .values(field)
+                .annotate(total=Count('pk'))
+                .values('total')
+            ),
+            Value(0),
+        )
+
+    # с префиксом: у пользователя уже есть связь posts
+    return {
+        'actual_posts': count(Post.objects.all(), 'author'),
+        'actual_published_posts': count(
+            Post.objects.filter(is_published=True), 'author'
+        ),
+        'actual_comments_received': count(
+            Comment.objects.all(), 'post__author'
+        ),
+    }
+
+
+def rebuild_author_stats(batch_size=1000, queryset=None):
+    """
+    Пересчитать AuthorStats по таблицам постов и комментариев.
+
+    Пользователи обрабатываются пачками по batch_size (по возрастанию
+    pk): недостающие строки создаются, расходящиеся — исправляются.
+    Возвращает пару (проверено авторов, исправлено строк).
+    """
+    if queryset is None:
+        queryset = User.objects.all()
+    checked = fixed = 0
+    last_pk = 0
+    while True:
+        batch = list(
+            queryset.filter(pk__gt=last_pk)
+            .order_by('pk')
+            .annotate(**actual_author_stats())
+            .values('pk', *ACTUAL_FIELDS)[:batch_size]
+        )
+        if not batch:
+            break
+        stored = AuthorStats.objects.in_bulk([row['pk'] for row in batch])
+        missing, changed = [], []
+        for row in batch:
+            actual = {name: row[f'actual_{name}'] for name in STATS_FIELDS}
+            stats = stored.get(row['pk'])
+            if stats is None:
+                missing.append(AuthorStats(user_id=row['pk'], **actual))
+            elif any(getattr(stats, n) != v for n, v in actual.items()):
+                for name, value in actual.items():
+                    setattr(stats, name, value)
+                changed.append(stats)
+        AuthorStats.objects.bulk_create(missing, ignore_conflicts=True)
+        AuthorStats.objects.bulk_update(changed, STATS_FIELDS)
+        checked += len(batch)
+        fixed += len(missing) + len(changed)
+        last_pk = batch[-1]['pk']
+    return checked, fixed
+
+
+def get_author_stats(user):
+    """
+    Счётчики автора одним запросом по первичному ключу.
+
+    Если строки ещё нет (пользователь заведён в обход сигналов),
+    она пересчитывается и сохраняется.
+    """
+    stats = AuthorStats.objects.filter(pk=user.pk).first()
+    if stats is None:
+        actual = (
+            User.objects.filter(pk=user.pk)
+            .annotate(**actual_author_stats())
+            .values_list(*ACTUAL_FIELDS)
+            .get()
+        )
+        stats, _ = AuthorStats.objects.get_or_create(
+            user_id=user.pk, defaults=dict(zip(STATS_FIELDS, actual))
+        )
+    return stats
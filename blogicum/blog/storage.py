@@ -0,0 +1,91 @@
+import hashlib
+import os
+import posixpath
+import re
+
+from django.core.files.storage import FileSystemStorage
+from django.db.models import F
+from django.utils import timezone
+from django.utils.deconstruct import deconstructible
+
+HASH_CHUNK_SIZE = 64 * 1024
+BLOB_NAME_RE = re.compile(r'(?:^|/)(?P<digest>[0-9a-f]{64})(?:\.\w+)?$')
+
+
+def file_digest(content):
+    """sha256 содержимого файла; позиция чтения возвращается в начало."""
+    digest = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in content.chunks(HASH_CHUNK_SIZE):
+        digest.update(chunk)
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    return digest.hexdigest()
+
+
+def blob_digest(name):
+    """Хэш из имени блоба или None для файлов со старыми именами."""
+    match = BLOB_NAME_RE.search(name)
+    return match['digest'] if match else None
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Файловое хранилище, где имя файла — хэш его содержимого.
+
+    Загрузка posts_images/photo.jpg сохраняется как
+    posts_images/ab/ab12…ef.jpg; если такой блоб уже есть, файл
+    не записывается повторно. Каждый блоб учитывается в MediaBlob,
+    ссылки на него считают сигналы Post, а удаляет его команда
+    gc_media_blobs.
+    """
+
+    def _save(self, name, content):
+        digest = file_digest(content)
+        directory = posixpath.dirname(name)
+        extension = os.path.splitext(name)[1].lower()
+        name = posixpath.join(directory, digest[:2], digest + extension)
+        if not self.exists(name):
+            name = super()._save(name, content)
+        register_blob(name, content.size)
+        return name
+
+
+def register_blob(name, size):
+    """Учесть блоб без ссылок (его заберёт GC, если ссылка не появится)."""
+    # импорт здесь: модели ссылаются на хранилище в поле Post.image
+    from .models import MediaBlob
+
+    # повторная загрузка того же файла отодвигает его удаление
+    touched = MediaBlob.objects.filter(name=name).update(
+        updated_at=timezone.now()
+    )
+    if not touched:
+        MediaBlob.objects.get_or_create(name=name, defaults={'size': size})
+
+
+def acquire_blob(name, count=1):
+    """Увеличить счётчик ссылок на блоб (для старых файлов — создать)."""
+    from .models import MediaBlob
+
+    updated = MediaBlob.objects.filter(name=name).update(
+        ref_count=F('ref_count') + count, updated_at=timezone.now()
+    )
+    if not updated:
+        MediaBlob.objects.get_or_create(
+            name=name, defaults={'ref_count': count}
+        )
+
+
+def release_blob(name):
+    """Уменьшить счётчик ссылок; блоб без ссылок удалит gc_media_blobs."""
+    from .models import MediaBlob
+
+    MediaBlob.objects.filter(name=name, ref_count__gt=0).update(
+        ref_count=F('ref_count') - 1, updated_at=timezone.now()
+    )
+
+
+post_image_storage = ContentAddressedStorage()
@@ -0,0 +1,192 @@
+import random
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+User = get_user_model()
+
+WORDS = (
+    'утро вечер день ночь город дорога море река лес поле дом окно '
+    'письмо книга обед ужин чай кофе друг сосед брат сестра мать отец '
+    'работа отпуск поезд вокзал станция погода дождь снег солнце ветер '
+    'прогулка встреча разговор история память театр музей выставка '
+    'концерт песня музыка картина кошка собака птица сад огород яблоко '
+    'хлеб рынок магазин улица площадь мост парк школа университет '
+    'лекция экзамен статья газета журнал новость праздник подарок '
+    'гость дорогой новый старый тихий шумный долгий короткий светлый '
+    'тёмный тёплый холодный весёлый грустный пошёл вернулся видел '
+    'читал писал думал говорил слушал ждал встретил купил приготовил '
+    'рассказал вспомнил решил успел опоздал уехал приехал остался'
+).split()
+CITIES = (
+    'Москва', 'Санкт-Петербург', 'Казань', 'Новосибирск', 'Екатеринбург',
+    'Нижний Новгород', 'Самара', 'Омск', 'Ростов-на-Дону', 'Уфа',
+    'Красноярск', 'Пермь', 'Воронеж', 'Волгоград', 'Краснодар',
+)
+NAMES = (
+    'Анна', 'Иван', 'Мария', 'Пётр', 'Ольга', 'Сергей', 'Елена',
+    'Алексей', 'Наталья', 'Дмитрий', 'Татьяна', 'Николай',
+)
+
+# доли для флагов и необязательных полей
+UNPUBLISHED_SHARE = 0.05
+FUTURE_SHARE = 0.03
+NO_LOCATION_SHARE = 0.3
+HISTORY_DAYS = 365
+
+
+class SkewedPicker:
+    """
+    Номера из 1..count по закону Ципфа: номер ранга r выпадает
+    с весом 1 / r ** skew. Ранги перемешаны, чтобы популярные
+    записи не совпадали с первыми по порядку.
+    """
+
+    def __init__(self, rng, count, skew):
+        self.rng = rng
+        self.population = range(1, count + 1)
+        ranks = list(self.population)
+        rng.shuffle(ranks)
+        self.cum_weights = list(
+            accumulate(1 / rank ** skew for rank in ranks)
+        )
+
+    def pick(self, k):
+        return self.rng.choices(
+            self.population, cum_weights=self.cum_weights, k=k
+        )
+
+
+class SyntheticData:
+    """
+    Детерминированный набор данных блога для нагрузки и бенчмарков.
+
+    Записи отдаются в формате dumpdata для transfer.Importer, по
+    генератору на модель; у каждой модели свой генератор случайных
+    чисел от seed, поэтому повторный проход даёт те же записи.
+    Комментарии и авторство распределены неравномерно (skew):
+    немногие посты собирают большую часть комментариев. Даты
+    отсчитываются от момента создания набора.
+    """
+
+    COMMENT_CHUNK = 10_000
+
+    def __init__(
+        self, seed=1, users=50, categories=10, locations=20,
+        posts=1000, comments=5000, skew=1.1, now=None,
+    ):
+        self.seed = seed
+        self.users = users
+        self.categories = categories
+        self.locations = locations
+        self.posts = posts
+        self.comments = comments
+        self.skew = skew
+        self.now = now or timezone.now()
+
+    def records(self, label):
+        rng = random.Random(f'{self.seed}:{label}')
+        generators = {
+            'blog.category': self.category_records,
+            'blog.location': self.location_records,
+            User._meta.label_lower: self.user_records,
+            'blog.post': self.post_records,
+            'blog.comment': self.comment_records,
+        }
+        generator = generators.get(label)
+        return generator(rng) if generator else iter(())
+
+    def words(self, rng, low, high):
+        return ' '.join(rng.choices(WORDS, k=rng.randint(low, high)))
+
+    def text(self, rng, sentences):
+        return ' '.join(
+            self.words(rng, 6, 16).capitalize() + '.'
+            for _ in range(rng.randint(*sentences))
+        )
+
+    def past(self, rng):
+        return self.now - timedelta(seconds=rng.uniform(
+            0, HISTORY_DAYS * 24 * 3600
+        ))
+
+    def record(self, label, pk, **fields):
+        return {'model': label, 'pk': pk, 'fields': fields}
+
+    def category_records(self, rng):
+        for pk in range(1, self.categories + 1):
+            yield self.record(
+                'blog.category', pk,
+                title=self.words(rng, 1, 3).capitalize(),
+                description=self.text(rng, (1, 2)),
+                slug=f'synthetic-{self.seed}-{pk}',
+                is_published=pk == 1 or rng.random() > UNPUBLISHED_SHARE,
+                created_at=self.past(rng),
+            )
+
+    def location_records(self, rng):
+        for pk in range(1, self.locations + 1):
+            city = CITIES[(pk - 1) % len(CITIES)]
+            yield self.record(
+                'blog.location', pk,
+                name=f'{city} {(pk - 1) // len(CITIES) + 1}',
+                is_published=True,
+                created_at=self.past(rng),
+            )
+
+    def user_records(self, rng):
+        for pk in range(1, self.users + 1):
+            yield self.record(
+                User._meta.label_lower, pk,
+                username=f'synthetic-{self.seed}-{pk}',
+                # «!» в начале — пароль, по которому нельзя войти
+                password='!synthetic',
+                first_name=rng.choice(NAMES),
+                email=f'user{pk}@example.com',
+                date_joined=self.past(rng),
+            )
+
+    def post_records(self, rng):
+        authors = SkewedPicker(rng, self.users, self.skew).pick(self.posts)
+        categories = SkewedPicker(
+            rng, self.categories, self.skew
+        ).pick(self.posts)
+        for pk, author, category in zip(
+            range(1, self.posts + 1), authors, categories
+        ):
+            if rng.random() < FUTURE_SHARE:
+                pub_date = self.now + timedelta(days=rng.uniform(1, 30))
+            else:
+                pub_date = self.past(rng)
+            location = None
+            if self.locations and rng.random() > NO_LOCATION_SHARE:
+                location = rng.randint(1, self.locations)
+            yield self.record(
+                'blog.post', pk,
+                title=self.words(rng, 2, 6).capitalize(),
+                text=self.text(rng, (2, 8)),
+                pub_date=pub_date,
+                is_published=rng.random() > UNPUBLISHED_SHARE,
+                author=author,
+                category=category,
+                location=location,
+                created_at=min(pub_date, self.now),
+            )
+
+    def comment_records(self, rng):
+        posts = SkewedPicker(rng, self.posts, self.skew)
+        pk = 0
+        while pk < self.comments:
+            # номера постов — порциями, чтобы не держать их все в памяти
+            size = min(self.COMMENT_CHUNK, self.comments - pk)
+            for post in posts.pick(size):
+                pk += 1
+                yield self.record(
+                    'blog.comment', pk,
+                    post=post,
+                    author=rng.randint(1, self.users),
+                    text=self.words(rng, 3, 20).capitalize(),
+                    created_at=self.past(rng),
+                )
@@ -0,0 +1,18 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from blog.cache import get_or_render_card
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def post_card(context, post):
+    """Карточка поста из includes/post_card.html с кэшированием фрагмента."""
+    def render():
+        card_template = context.template.engine.get_template(
+            'includes/post_card.html'
+        )
+        return card_template.render(context.new({'post': post}))
+
+    return mark_safe(get_or_render_card(post, render))
@@ -0,0 +1,17 @@
+from django import template
+
+from blog.images import variant_srcset, variant_url
+
+register = template.Library()
+
+
+@register.simple_tag
+def image_variant_url(post, name):
+    """URL уменьшенной копии изображения поста: card, detail и т.п."""
+    return variant_url(post, name)
+
+
+@register.simple_tag
+def image_srcset(post, kind=''):
+    """Значение srcset из уменьшенных копий; kind="webp" — копии в WebP."""
+    return variant_srcset(post, kind)
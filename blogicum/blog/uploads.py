@@ -0,0 +1,141 @@
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadhandler import (
+    FileUploadHandler,
+    StopUpload,
+    TemporaryFileUploadHandler,
+)
+from django.template.defaultfilters import filesizeformat
+from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from PIL import Image, UnidentifiedImageError
+
+# сколько первых байт файла копить, чтобы прочитать заголовок изображения
+SNIFF_LIMIT = 256 * 1024
+
+
+def get_image_limits():
+    return (
+        settings.POST_IMAGE_MAX_UPLOAD_SIZE,
+        settings.POST_IMAGE_MAX_SIDE,
+        settings.POST_IMAGE_MAX_PIXELS,
+    )
+
+
+def check_image_size(size):
+    """Текст ошибки, если файл больше допустимого, иначе None."""
+    max_size, _, _ = get_image_limits()
+    if size > max_size:
+        return f'Файл изображения больше {filesizeformat(max_size)}.'
+    return None
+
+
+def check_image_dimensions(width, height):
+    """Текст ошибки, если у изображения слишком большие размеры, иначе None."""
+    _, max_side, max_pixels = get_image_limits()
+    if max(width, height) > max_side or width * height > max_pixels:
+        return (
+            f'Изображение {width}×{height} слишком большое: сторона — '
+            f'не больше {max_side} px, всего — не больше {max_pixels} px.'
+        )
+    return None
+
+
+class LimitedImageUploadHandler(FileUploadHandler):
+    """
+    Проверяет загружаемые изображения на лету, до записи всего файла.
+
+    Стоит первым в цепочке и передаёт куски дальше без изменений.
+    Размер считается по мере поступления данных, размеры в пикселях
+    читаются из заголовка, как только он пришёл целиком. При превышении
+    лимита разбор запроса прекращается (StopUpload), текст ошибки
+    сохраняется в request.upload_rejected.
+    """
+
+    def __init__(self, request=None, field_names=('image',)):
+        super().__init__(request)
+        self.field_names = field_names
+        self.active = False
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.active = field_name in self.field_names
+        self.received = 0
+        self.header = BytesIO()
+        if self.active and self.content_length is not None:
+            self.check(check_image_size(self.content_length))
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.active:
+            return raw_data
+        self.received += len(raw_data)
+        self.check(check_image_size(self.received))
+        if self.header is not None:
+            self.sniff(raw_data)
+        return raw_data
+
+    def sniff(self, raw_data):
+        """Попробовать прочитать размеры из накопленного начала файла."""
+        self.header.write(raw_data[:SNIFF_LIMIT - self.header.tell()])
+        self.header.seek(0)
+        try:
+            # Image.open читает только заголовок, пиксели не декодируются
+            with Image.open(self.header) as image:
+                width, height = image.size
+        except Image.DecompressionBombError as error:
+            self.check(str(error))
+        except (UnidentifiedImageError, OSError, SyntaxError, ValueError):
+            if self.header.seek(0, 2) >= SNIFF_LIMIT:
+                # заголовок не распознан — решит валидация формы
+                self.header = None
+            return
+        self.header = None
+        self.check(check_image_dimensions(width, height))
+
+    def check(self, error):
+        if error is None:
+            return
+        if self.request is not None:
+            self.request.upload_rejected = error
+        raise StopUpload(connection_reset=False)
+
+    def file_complete(self, file_size):
+        # файл собирает следующий обработчик цепочки
+        return None
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class LimitedImageUploadMixin:
+    """
+    Потоковая загрузка изображения поста с ранним отказом.
+
+    Файлы пишутся сразу во временный файл на диске, а не в память;
+    LimitedImageUploadHandler обрывает разбор запроса, как только файл
+    вышел за POST_IMAGE_MAX_UPLOAD_SIZE или размеры из заголовка — за
+    POST_IMAGE_MAX_SIDE/POST_IMAGE_MAX_PIXELS. Ответ — форма с ошибкой
+    и статусом 413. CSRF проверяется после замены обработчиков:
+    иначе middleware разобрал бы тело запроса заранее.
+    """
+
+    upload_field_names = ('image',)
+
+    def dispatch(self, request, *args, **kwargs):
+        request.upload_handlers = [
+            LimitedImageUploadHandler(request, self.upload_field_names),
+            TemporaryFileUploadHandler(request),
+        ]
+        return csrf_protect(super().dispatch)(request, *args, **kwargs)
+
+    def get_form(self, form_class=None):
+        form = super().get_form(form_class)
+        rejected = getattr(self.request, 'upload_rejected', None)
+        if rejected:
+            form.add_error(self.upload_field_names[0], rejected)
+        return form
+
+    def form_invalid(self, form):
+        response = super().form_invalid(form)
+        if getattr(self.request, 'upload_rejected', None):
+            response.status_code = 413
+        return response
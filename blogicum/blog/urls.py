@@ -7,10 +7,12 @@ from .views import (
     EditCommentView,
     PostCreateView,
     PostDeleteView,
+    PostCommentsView,
     PostDetailView,
     PostListView,
     PostUpdateView,
     ProfileView,
+    SearchView,
 )
 
 app_name = 'blog'
@@ -38,6 +40,7 @@ urlpatterns = [
         ProfileView.as_view(),
         name='profile',
     ),
+    path('search/', SearchView.as_view(), name='search'),
     path(
         'category/<slug:category_slug>/',
         CategoryPostsView.as_view(),
@@ -48,6 +51,11 @@ urlpatterns = [
         AddCommentView.as_view(),
         name='add_comment',
     ),
+    path(
+        'posts/<int:post_id>/comments/',
+        PostCommentsView.as_view(),
+        name='post_comments',
+    ),
     path(
         'posts/<int:post_id>/edit_comment/<int:comment_id>/',
         EditCommentView.as_view(),
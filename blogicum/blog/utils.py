@@ -1,7 +1,10 @@
-from django.db.models import Count
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
-from .models import Post
+from .cache import bump_post_version
+from .models import Comment, Post
+from .refs import get_ref_tables, with_ref_tables
 
 
 def get_published_posts():
@@ -11,14 +14,75 @@ def get_published_posts():
     Условия:
     - пост опубликован (is_published=True)
     - дата публикации не в будущем (pub_date <= now)
-    - категория опубликована (category__is_published=True)
+    - категория опубликована (category_id среди опубликованных)
+
+    Число комментариев хранится в поле Post.comment_count,
+    а категории и локации берутся из справочников в памяти
+    (blog.refs), поэтому JOIN с этими таблицами не нужен.
+    Без опубликованных категорий — пустой queryset (none()), а не
+    фильтр с пустым IN, который не выполняется и не объясняется.
     """
-    return (
-        Post.objects.filter(
+    category_ids = get_ref_tables().published_category_ids
+    posts = Post.objects.select_related("author")
+    if not category_ids:
+        return with_ref_tables(posts.none())
+    return with_ref_tables(
+        posts.filter(
             is_published=True,
             pub_date__lte=timezone.now(),
-            category__is_published=True,
+            category_id__in=category_ids,
         )
-        .select_related("author", "category", "location")
-        .annotate(comment_count=Count("comments"))
     )
+
+
+def change_comment_count(post_id, delta):
+    """Атомарно изменить счётчик комментариев поста на delta."""
+    Post.objects.filter(pk=post_id).update(
+        comment_count=F("comment_count") + delta
+    )
+
+
+def actual_comment_count():
+    """Выражение: число комментариев поста по таблице комментариев."""
+    return Coalesce(
+        Subquery(
+            Comment.objects.filter(post=OuterRef("pk"))
+            .order_by()
+            .values("post")
+            .annotate(total=Count("pk"))
+            .values("total")
+        ),
+        Value(0),
+    )
+
+
+def recount_comment_counts(batch_size=1000, queryset=None):
+    """
+    Пересчитать Post.comment_count по таблице комментариев.
+
+    Посты обрабатываются пачками по batch_size (по возрастанию pk),
+    обновляются только расходящиеся счётчики.
+    Возвращает пару (проверено постов, исправлено счётчиков).
+    """
+    if queryset is None:
+        queryset = Post.objects.all()
+    actual_count = actual_comment_count()
+    checked = fixed = 0
+    last_pk = 0
+    while True:
+        batch = list(
+            queryset.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .annotate(actual_count=actual_count)
+            .values_list("pk", "comment_count", "actual_count")[:batch_size]
+        )
+        if not batch:
+            break
+        for pk, stored, actual in batch:
+            if stored != actual:
+                Post.objects.filter(pk=pk).update(comment_count=actual)
+                bump_post_version(pk)
+                fixed += 1
+        checked += len(batch)
+        last_pk = batch[-1][0]
+    return checked, fixed
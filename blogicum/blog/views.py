@@ -1,25 +1,95 @@
+from functools import reduce
+from operator import or_
+
 from django.contrib.auth import get_user_model
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Count
-from django.http import Http404
-from django.shortcuts import get_object_or_404, redirect
+from django.db import transaction
+from django.db.models import Q
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse, reverse_lazy
 from django.utils import timezone
-from django.views.generic import CreateView, DeleteView, DetailView, ListView, UpdateView
-
+from django.utils.decorators import method_decorator
+from django.utils.http import urlencode
+from django.views.decorators.csrf import csrf_exempt
+from django.views.generic import (
+    CreateView, DeleteView, DetailView, ListView, UpdateView, View,
+)
+
+from core.routers import ReplicaReadMixin
+
+from .cache import (
+    AnonymousPageCacheMixin, ConditionalGetMixin, get_post_versions,
+)
 from .forms import CommentForm, PostForm
-from .models import Category, Comment, Post
+from .models import Comment, Post
+from .pagination import CursorPaginationMixin, CursorPaginator, InvalidCursor
+from .refs import get_published_category, get_ref_tables, with_ref_tables
+from .search import MAX_QUERY_LENGTH, search_posts
+from .stats import get_author_stats
+from .uploads import LimitedImageUploadMixin
 from .utils import get_published_posts
 
 User = get_user_model()
 
+COMMENTS_PER_PAGE = 20
+
 
 def get_post_comments(post):
     """Вернуть queryset комментариев к посту (с автором, по времени создания)."""
     return post.comments.select_related("author").order_by("created_at")
 
 
-class PostListView(ListView):
+def get_post_comments_page(post, cursor=None):
+    """Вернуть порцию комментариев к посту по курсору (created_at, id)."""
+    paginator = CursorPaginator(
+        get_post_comments(post),
+        COMMENTS_PER_PAGE,
+        field="created_at",
+        descending=False,
+    )
+    try:
+        return paginator.page(cursor)
+    except InvalidCursor:
+        raise Http404("Неверный курсор комментариев")
+
+
+def get_visible_post(request, post_id):
+    """
+    B) Автор видит свой пост всегда.
+    Остальные видят только если пост опубликован,
+    категория опубликована и дата не в будущем.
+
+    Пост, автор и проверка видимости — один SQL-запрос,
+    категория и локация — из справочников в памяти.
+    """
+    visible = []
+    category_ids = get_ref_tables().published_category_ids
+    if category_ids:
+        visible.append(Q(
+            is_published=True,
+            category_id__in=category_ids,
+            pub_date__lte=timezone.now(),
+        ))
+    if request.user.is_authenticated:
+        visible.append(Q(author=request.user))
+    if not visible:
+        raise Http404("Пост не найден")
+    return get_object_or_404(
+        with_ref_tables(
+            Post.objects.select_related("author").filter(reduce(or_, visible))
+        ),
+        pk=post_id,
+    )
+
+
+class PostListView(
+    ReplicaReadMixin,
+    ConditionalGetMixin,
+    AnonymousPageCacheMixin,
+    CursorPaginationMixin,
+    ListView,
+):
     """Главная страница: список опубликованных постов."""
 
     template_name = "blog/index.html"
@@ -30,7 +100,13 @@ class PostListView(ListView):
         return get_published_posts().order_by("-pub_date")
 
 
-class CategoryPostsView(ListView):
+class CategoryPostsView(
+    ReplicaReadMixin,
+    ConditionalGetMixin,
+    AnonymousPageCacheMixin,
+    CursorPaginationMixin,
+    ListView,
+):
     """Страница категории: опубликованные посты выбранной категории."""
 
     template_name = "blog/category.html"
@@ -38,11 +114,7 @@ class CategoryPostsView(ListView):
 
     def get_queryset(self):
         """A) В категории показываем только опубликованные посты."""
-        self.category = get_object_or_404(
-            Category,
-            slug=self.kwargs["category_slug"],
-            is_published=True,
-        )
+        self.category = get_published_category(self.kwargs["category_slug"])
         return (
             get_published_posts()
             .filter(category=self.category)
@@ -56,42 +128,60 @@ class CategoryPostsView(ListView):
         return context
 
 
-class PostDetailView(DetailView):
+class PostDetailView(ReplicaReadMixin, ConditionalGetMixin, DetailView):
     """Детальная страница поста + комментарии."""
 
     model = Post
     template_name = "blog/detail.html"
     pk_url_kwarg = "post_id"
 
-    def get_object(self, queryset=None):
-        """
-        B) Автор видит свой пост всегда.
-        Остальные видят только если пост опубликован,
-        категория опубликована и дата не в будущем.
-        """
-        post = get_object_or_404(Post, pk=self.kwargs["post_id"])
-
-        if self.request.user.is_authenticated and self.request.user == post.author:
-            return post
-
-        if (
-            post.is_published
-            and post.category.is_published
-            and post.pub_date <= timezone.now()
-        ):
-            return post
+    def get_validator_versions(self):
+        """Страница меняется с постом, комментариями и справочниками."""
+        return get_post_versions(self.kwargs["post_id"])
 
-        raise Http404("Страница не найдена")
+    def get_object(self, queryset=None):
+        """Пост, если он виден текущему пользователю, иначе 404."""
+        return get_visible_post(self.request, self.kwargs["post_id"])
 
     def get_context_data(self, **kwargs):
         """Добавить форму комментария и список комментариев."""
         context = super().get_context_data(**kwargs)
         context["form"] = CommentForm()
-        context["comments"] = get_post_comments(self.object)
+        context["comments"] = get_post_comments_page(
+            self.object, self.request.GET.get("cursor")
+        )
         return context
 
 
-class ProfileView(ListView):
+class PostCommentsView(ReplicaReadMixin, View):
+    """Следующая порция комментариев к посту: HTML-фрагмент или JSON."""
+
+    def get(self, request, post_id):
+        post = get_visible_post(request, post_id)
+        comments = get_post_comments_page(post, request.GET.get("cursor"))
+        if request.GET.get("format") == "json":
+            return JsonResponse({
+                "comments": [
+                    {
+                        "id": comment.pk,
+                        "author": comment.author.username,
+                        "text": comment.text,
+                        "created_at": comment.created_at.isoformat(),
+                    }
+                    for comment in comments
+                ],
+                "next_cursor": comments.next_cursor,
+            })
+        return render(
+            request,
+            "includes/comment_list.html",
+            {"post": post, "comments": comments},
+        )
+
+
+class ProfileView(
+    ReplicaReadMixin, ConditionalGetMixin, CursorPaginationMixin, ListView
+):
     """C) Профиль пользователя: все посты автора (включая непубличные)."""
 
     template_name = "blog/profile.html"
@@ -101,10 +191,9 @@ class ProfileView(ListView):
         username = self.kwargs["username"]
         self.profile_user = get_object_or_404(User, username=username)
 
-        return (
+        return with_ref_tables(
             Post.objects.filter(author=self.profile_user)
-            .select_related("author", "category", "location")
-            .annotate(comment_count=Count("comments"))
+            .select_related("author")
             .order_by("-pub_date")
         )
 
@@ -112,10 +201,33 @@ class ProfileView(ListView):
         """Добавить объект профиля в контекст."""
         context = super().get_context_data(**kwargs)
         context["profile"] = self.profile_user
+        context["author_stats"] = get_author_stats(self.profile_user)
         return context
 
 
-class PostCreateView(LoginRequiredMixin, CreateView):
+class SearchView(ReplicaReadMixin, ConditionalGetMixin, ListView):
+    """Поиск по опубликованным постам: лучшие совпадения — первыми."""
+
+    template_name = "blog/search.html"
+    paginate_by = 10
+
+    def get_queryset(self):
+        """A) Ищем только среди опубликованных постов."""
+        self.query = self.request.GET.get("q", "").strip()[:MAX_QUERY_LENGTH]
+        return search_posts(get_published_posts(), self.query)
+
+    def get_context_data(self, **kwargs):
+        """Добавить запрос в контекст и в ссылки пагинации."""
+        context = super().get_context_data(**kwargs)
+        context["query"] = self.query
+        if self.query:
+            context["page_query"] = urlencode({"q": self.query}) + "&"
+        return context
+
+
+class PostCreateView(
+    LimitedImageUploadMixin, LoginRequiredMixin, CreateView
+):
     """Создание поста."""
 
     model = Post
@@ -123,14 +235,28 @@ class PostCreateView(LoginRequiredMixin, CreateView):
     template_name = "blog/create.html"
     
     def form_valid(self, form):
-        """Привязать автора и сохранить."""
+        """
+        Привязать автора и сохранить.
+
+        Изображение только сохраняется как есть: поворот, удаление EXIF
+        и уменьшенные копии делает воркер process_image_jobs.
+        """
         form.instance.author = self.request.user
-        self.object = form.save()
+        with transaction.atomic():
+            self.object = form.save()
         return redirect("blog:profile", username=self.object.author.username)
 
 
-class PostUpdateView(LoginRequiredMixin, UpdateView):
-    """Редактирование поста (в т.ч. is_published)."""
+@method_decorator(csrf_exempt, name="dispatch")
+class PostUpdateView(
+    LimitedImageUploadMixin, LoginRequiredMixin, UpdateView
+):
+    """
+    Редактирование поста (в т.ч. is_published).
+
+    CSRF проверяет LimitedImageUploadMixin после замены обработчиков
+    загрузки, поэтому собственный dispatch тоже помечен csrf_exempt.
+    """
 
     model = Post
     form_class = PostForm
@@ -146,7 +272,8 @@ class PostUpdateView(LoginRequiredMixin, UpdateView):
 
     def form_valid(self, form):
         """Сохранить изменения. is_published меняется из формы."""
-        self.object = form.save()
+        with transaction.atomic():
+            self.object = form.save()
         return redirect("blog:post_detail", post_id=self.object.pk)
 
 
@@ -175,7 +302,9 @@ class AddCommentView(LoginRequiredMixin, CreateView):
         post = get_object_or_404(Post, pk=self.kwargs["post_id"])
         form.instance.post = post
         form.instance.author = self.request.user
-        self.object = form.save()
+        # комментарий и счётчик Post.comment_count меняются одной транзакцией
+        with transaction.atomic():
+            self.object = form.save()
         return redirect("blog:post_detail", post_id=post.pk)
 
 
@@ -207,6 +336,11 @@ class DeleteCommentView(LoginRequiredMixin, DeleteView):
     template_name = "blog/comment.html"
     pk_url_kwarg = "comment_id"
 
+    @transaction.atomic
+    def delete(self, request, *args, **kwargs):
+        """Удалить комментарий вместе с уменьшением счётчика поста."""
+        return super().delete(request, *args, **kwargs)
+
     def get_success_url(self):
         """После удаления вернуться на страницу поста."""
         return reverse("blog:post_detail", kwargs={"post_id": self.kwargs["post_id"]})
@@ -9,8 +9,15 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
+from core.static import StaticFilesASGI
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
 
 application = get_asgi_application()
+
+# статика и медиа отдаются без Django, если перед приложением нет nginx
+if settings.SERVE_STATIC_FILES:
+    application = StaticFilesASGI(application)
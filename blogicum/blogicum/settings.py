@@ -1,5 +1,12 @@
 from pathlib import Path
 
+from core.caches import cache_from_env
+from core.db import (
+    database_from_env,
+    replica_from_env,
+    sqlite_pragmas_from_env,
+)
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = 'blogicum-secret-key-for-study-only'
@@ -26,6 +33,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.RequestBudgetMiddleware',
+    'core.routers.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -56,11 +65,28 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'blogicum.wsgi.application'
 
+# база задаётся переменными окружения (DB_ENGINE=sqlite|postgres и др.,
+# см. core.db.database_from_env); без них — SQLite в db.sqlite3
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    'default': database_from_env(BASE_DIR),
+}
+# реплика для чтения страниц блога (SQLITE_REPLICA_PATH или
+# POSTGRES_REPLICA_HOST); без неё всё читается из основной базы
+DATABASE_REPLICA_ALIAS = 'replica'
+_replica = replica_from_env(DATABASES['default'])
+if _replica is not None:
+    DATABASES[DATABASE_REPLICA_ALIAS] = _replica
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+# сколько секунд после записи пользователь читает из основной базы
+REPLICA_PIN_SECONDS = 5
+# pragma для каждого нового соединения с SQLite (WAL и т.п.)
+SQLITE_PRAGMAS = sqlite_pragmas_from_env()
+
+# кэш (CACHE_BACKEND=locmem|memcached|redis|file, см.
+# core.caches.cache_from_env); без переменных — память процесса, для
+# нескольких процессов сервера нужен общий: memcached или redis
+CACHES = {
+    'default': cache_from_env(BASE_DIR),
 }
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -89,13 +115,67 @@ USE_L10N = True
 USE_TZ = True
 
 STATIC_URL = '/static/'
-STATICFILES_DIRS = [BASE_DIR / 'static']
+STATICFILES_DIRS = [BASE_DIR / 'static_dev']
+STATIC_ROOT = BASE_DIR / 'collected_static'
+# хэш содержимого в именах и сжатые .gz/.br копии (collectstatic)
+STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+# статику и медиа отдаёт core.static в wsgi/asgi; False — если это
+# делает веб-сервер перед приложением
+SERVE_STATIC_FILES = True
+# Cache-Control для файлов без хэша в имени, в секундах
+STATIC_MAX_AGE = 60 * 60
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# лимиты изображений постов: проверяются ещё во время загрузки
+POST_IMAGE_MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+POST_IMAGE_MAX_SIDE = 8000
+POST_IMAGE_MAX_PIXELS = 40_000_000
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# курсорная пагинация лент (без COUNT(*) и OFFSET) вместо постраничной
+BLOG_CURSOR_PAGINATION = False
+
+# бюджеты запросов по имени URL: число запросов к БД и время в мс
+# (db_ms, template_ms, total_ms); 'log' — предупреждение в лог,
+# 'fail' — исключение (для тестов), 'off' — без замеров
+REQUEST_BUDGET_MODE = 'log'
+REQUEST_BUDGETS = {
+    'blog:index': {'queries': 5, 'total_ms': 500},
+    'blog:category_posts': {'queries': 6, 'total_ms': 500},
+    'blog:profile': {'queries': 6, 'total_ms': 500},
+    'blog:post_detail': {'queries': 5, 'total_ms': 500},
+    'blog:post_comments': {'queries': 5, 'total_ms': 300},
+    'pages:about': {'queries': 2, 'total_ms': 200},
+    'pages:rules': {'queries': 2, 'total_ms': 200},
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'request_stats': {
+            'format': '%(asctime)s %(levelname)s %(message)s %(request_stats)s',
+        },
+    },
+    'handlers': {
+        'request_stats': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'request_stats',
+        },
+    },
+    'loggers': {
+        # INFO — запись на каждый запрос, WARNING — только превышения
+        'blogicum.requests': {
+            'handlers': ['request_stats'],
+            'level': 'INFO' if DEBUG else 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
 # кастомная страница ошибки CSRF
 CSRF_FAILURE_VIEW = 'pages.views.csrf_failure'
 
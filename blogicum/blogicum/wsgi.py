@@ -9,8 +9,15 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
+from core.static import StaticFilesWSGI
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
 
 application = get_wsgi_application()
+
+# статика и медиа отдаются без Django, если перед приложением нет nginx
+if settings.SERVE_STATIC_FILES:
+    application = StaticFilesWSGI(application)
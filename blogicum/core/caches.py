@@ -0,0 +1,54 @@
+import os
+
+from .db import env_int
+
+
+def cache_from_env(base_dir, env=os.environ):
+    """
+    Настройка CACHES['default'] из переменных окружения.
+
+    Версии кэша (справочники, лента, посты) меняет процесс, который
+    записал данные, а читают все процессы сервера: при нескольких
+    процессах кэш должен быть общим, иначе они отдают устаревшее.
+    CACHE_BACKEND=locmem (по умолчанию) — память процесса: быстро,
+    но только для одного процесса (разработка, тесты).
+    CACHE_BACKEND=memcached: серверы CACHE_LOCATION через запятую;
+    CACHE_BACKEND=redis: адрес CACHE_LOCATION (redis://...) — для
+    нескольких процессов. CACHE_BACKEND=file: каталог CACHE_PATH,
+    не больше CACHE_MAX_ENTRIES записей — общий без отдельного
+    сервера, но медленный: каждое чтение версий и страниц идёт
+    на диск, а каждая запись просматривает весь каталог.
+    CACHE_TIMEOUT — время жизни записи в секундах.
+    """
+    backend = env.get('CACHE_BACKEND', 'locmem')
+    timeout = env_int(env, 'CACHE_TIMEOUT', 300)
+    if backend == 'file':
+        return {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': env.get('CACHE_PATH') or str(base_dir / 'cache'),
+            'TIMEOUT': timeout,
+            'OPTIONS': {
+                'MAX_ENTRIES': env_int(env, 'CACHE_MAX_ENTRIES', 10000),
+            },
+        }
+    if backend == 'memcached':
+        return {
+            'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+            'LOCATION': env.get(
+                'CACHE_LOCATION', '127.0.0.1:11211'
+            ).split(','),
+            'TIMEOUT': timeout,
+        }
+    if backend == 'redis':
+        # встроенного бэкенда Redis в Django 3.2 нет — нужен django-redis
+        return {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': env.get('CACHE_LOCATION', 'redis://127.0.0.1:6379/1'),
+            'TIMEOUT': timeout,
+        }
+    if backend == 'locmem':
+        return {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'TIMEOUT': timeout,
+        }
+    raise ValueError(f'Неизвестный CACHE_BACKEND: {backend}')
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs=None, **kwargs):
+    """Для нескольких процессов сервера кэш версий должен быть общим."""
+    backend = settings.CACHES['default']['BACKEND']
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [Warning(
+        'Кэш по умолчанию не общий для процессов сервера: версии '
+        'справочников, ленты и постов, сменённые в одном процессе, '
+        'не увидят другие.',
+        hint='Задайте CACHE_BACKEND=memcached или redis и CACHE_LOCATION.',
+        id='core.W001',
+    )]
@@ -0,0 +1,113 @@
+import os
+
+# pragma SQLite по умолчанию: WAL пускает читателей параллельно с
+# писателем, synchronous=NORMAL в WAL не теряет целостность при сбое
+# процесса, mmap читает страницы без копирования; ожидание блокировки
+# задаёт OPTIONS['timeout'] (SQLITE_TIMEOUT)
+DEFAULT_SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'memory',
+    'cache_size': -16000,
+}
+PRAGMA_CHOICES = {
+    'journal_mode': ('delete', 'truncate', 'persist', 'memory', 'wal', 'off'),
+    'synchronous': ('off', 'normal', 'full', 'extra'),
+}
+
+
+def env_int(env, name, default):
+    value = env.get(name)
+    return default if value in (None, '') else int(value)
+
+
+def env_bool(env, name, default=False):
+    value = env.get(name)
+    if value in (None, ''):
+        return default
+    return value.lower() in ('1', 'true', 'yes', 'on')
+
+
+def database_from_env(base_dir, env=os.environ):
+    """
+    Настройка DATABASES['default'] из переменных окружения.
+
+    DB_ENGINE=sqlite (по умолчанию): файл SQLITE_PATH, ожидание
+    блокировки SQLITE_TIMEOUT секунд; тестовая база — в памяти или
+    в файле SQLITE_TEST_PATH (его pytest --reuse-db не пересоздаёт
+    между запусками). DB_ENGINE=postgres: POSTGRES_DB,
+    POSTGRES_USER, POSTGRES_PASSWORD, POSTGRES_HOST, POSTGRES_PORT;
+    POSTGRES_PGBOUNCER=1 — подключение через пул pgbouncer в режиме
+    транзакций (без серверных курсоров). DB_CONN_MAX_AGE — сколько
+    секунд держать соединение между запросами.
+    """
+    engine = env.get('DB_ENGINE', 'sqlite')
+    if engine == 'postgres':
+        return {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': env.get('POSTGRES_DB', 'blogicum'),
+            'USER': env.get('POSTGRES_USER', 'blogicum'),
+            'PASSWORD': env.get('POSTGRES_PASSWORD', ''),
+            'HOST': env.get('POSTGRES_HOST', 'localhost'),
+            'PORT': env.get('POSTGRES_PORT', '5432'),
+            'CONN_MAX_AGE': env_int(env, 'DB_CONN_MAX_AGE', 60),
+            'DISABLE_SERVER_SIDE_CURSORS': env_bool(
+                env, 'POSTGRES_PGBOUNCER'
+            ),
+            'OPTIONS': {
+                'connect_timeout': env_int(env, 'POSTGRES_CONNECT_TIMEOUT', 5),
+            },
+        }
+    if engine != 'sqlite':
+        raise ValueError(f'Неизвестный DB_ENGINE: {engine}')
+    return {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': env.get('SQLITE_PATH') or base_dir / 'db.sqlite3',
+        'CONN_MAX_AGE': env_int(env, 'DB_CONN_MAX_AGE', 60),
+        'OPTIONS': {
+            'timeout': env_int(env, 'SQLITE_TIMEOUT', 20),
+        },
+        'TEST': {'NAME': env.get('SQLITE_TEST_PATH') or None},
+    }
+
+
+def sqlite_pragmas_from_env(env=os.environ):
+    """
+    Набор pragma для SQLITE_PRAGMAS.
+
+    SQLITE_JOURNAL_MODE и SQLITE_SYNCHRONOUS заменяют значения
+    по умолчанию (например, для сравнения в бенчмарке).
+    """
+    pragmas = dict(DEFAULT_SQLITE_PRAGMAS)
+    for name, choices in PRAGMA_CHOICES.items():
+        value = env.get(f'SQLITE_{name.upper()}', '').lower()
+        if not value:
+            continue
+        if value not in choices:
+            raise ValueError(f'SQLITE_{name.upper()}: {value} не из {choices}')
+        pragmas[name] = value
+    return pragmas
+
+
+def replica_from_env(default, env=os.environ):
+    """
+    Настройка реплики только для чтения или None, если она не задана.
+
+    Для SQLite — файл SQLITE_REPLICA_PATH (копия основной базы),
+    для PostgreSQL — POSTGRES_REPLICA_HOST и POSTGRES_REPLICA_PORT.
+    В тестах реплика — та же база, что и основная (TEST.MIRROR).
+    """
+    replica = dict(default, TEST={'MIRROR': 'default'})
+    if default['ENGINE'] == 'django.db.backends.sqlite3':
+        path = env.get('SQLITE_REPLICA_PATH')
+        if not path:
+            return None
+        replica['NAME'] = path
+        return replica
+    host = env.get('POSTGRES_REPLICA_HOST')
+    if not host:
+        return None
+    replica['HOST'] = host
+    replica['PORT'] = env.get('POSTGRES_REPLICA_PORT', default['PORT'])
+    return replica
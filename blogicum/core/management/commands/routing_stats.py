@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from core.routers import (
+    get_replica_alias,
+    get_routing_stats,
+    reset_routing_stats,
+)
+
+
+class Command(BaseCommand):
+    help = 'Показать, сколько запросов к БД ушло на реплику и на основную.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Обнулить счётчики после вывода.',
+        )
+
+    def handle(self, *args, **options):
+        stats = get_routing_stats()
+        reads = (
+            stats['replica_reads'] + stats['primary_reads']
+            + stats['pinned_reads']
+        )
+        ratio = stats['replica_reads'] / reads if reads else 0
+        self.stdout.write(
+            f'replica={get_replica_alias() or "-"} '
+            + ' '.join(f'{name}={value}' for name, value in stats.items())
+            + f' replica_ratio={ratio:.2%}'
+        )
+        if options['reset']:
+            reset_routing_stats()
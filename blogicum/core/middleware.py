@@ -0,0 +1,123 @@
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('blogicum.requests')
+
+METRICS = ('queries', 'db_ms', 'template_ms', 'total_ms')
+
+
+class RequestBudgetExceeded(Exception):
+    """Запрос превысил бюджет из REQUEST_BUDGETS (режим 'fail')."""
+
+
+class RequestStats:
+    """Счётчики одного запроса: число запросов к БД и время в БД."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.queries += 1
+
+
+class RequestBudgetMiddleware:
+    """
+    Замеряет число запросов, время в БД, рендеринга шаблона и общее время.
+
+    Результат уходит в заголовок Server-Timing и в лог blogicum.requests.
+    Бюджеты задаются по имени URL в REQUEST_BUDGETS; при превышении
+    в режиме REQUEST_BUDGET_MODE = 'log' пишется предупреждение,
+    в режиме 'fail' выбрасывается RequestBudgetExceeded (для тестов),
+    если ответ успешный (2xx или 3xx).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = getattr(settings, 'REQUEST_BUDGET_MODE', 'log')
+        if mode == 'off':
+            return self.get_response(request)
+        stats = RequestStats()
+        request._budget_stats = stats
+        request._template_time = 0.0
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats))
+            response = self.get_response(request)
+        metrics = {
+            'queries': stats.queries,
+            'db_ms': stats.db_time * 1000,
+            'template_ms': request._template_time * 1000,
+            'total_ms': (time.perf_counter() - start) * 1000,
+        }
+        response['Server-Timing'] = ', '.join((
+            f'db;dur={metrics["db_ms"]:.1f};desc="{stats.queries} queries"',
+            f'tpl;dur={metrics["template_ms"]:.1f}',
+            f'total;dur={metrics["total_ms"]:.1f}',
+        ))
+        self.report(request, response, metrics, mode)
+        return response
+
+    def process_template_response(self, request, response):
+        """Засечь время рендеринга шаблона без учёта запросов к БД в нём."""
+        stats = getattr(request, '_budget_stats', None)
+        if stats is None:
+            return response
+        start = time.perf_counter()
+        db_time_before = stats.db_time
+
+        def stop_timer(rendered):
+            request._template_time += (
+                time.perf_counter() - start - (stats.db_time - db_time_before)
+            )
+
+        response.add_post_render_callback(stop_timer)
+        return response
+
+    def report(self, request, response, metrics, mode):
+        match = request.resolver_match
+        url_name = match.view_name if match else None
+        budget = getattr(settings, 'REQUEST_BUDGETS', {}).get(url_name, {})
+        exceeded = {
+            metric: (round(metrics[metric], 1), budget[metric])
+            for metric in METRICS
+            if metric in budget and metrics[metric] > budget[metric]
+        }
+        record = {
+            'url_name': url_name,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            **{metric: round(metrics[metric], 1) for metric in METRICS},
+        }
+        if not exceeded:
+            logger.info(
+                'request %s', url_name, extra={'request_stats': record}
+            )
+            return
+        logger.warning(
+            'request %s exceeded budget: %s', url_name, exceeded,
+            extra={'request_stats': record},
+        )
+        # ответы с ошибкой (404, 403, отладочная 500 и т.п.) бюджетом
+        # не ограничиваются — только записываются в лог
+        if mode == 'fail' and response.status_code < 400:
+            raise RequestBudgetExceeded(
+                f'{url_name} ({request.path}) превысил бюджет: '
+                + ', '.join(
+                    f'{metric}={value} > {limit}'
+                    for metric, (value, limit) in exceeded.items()
+                )
+            )
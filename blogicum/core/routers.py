@@ -0,0 +1,152 @@
+from collections import Counter
+from contextvars import ContextVar
+
+from django.conf import settings
+
+from .stats import BufferedCounters
+
+PIN_COOKIE = 'db_primary_pin'
+STATS_KEY = 'db:routing-stats:{name}'
+STATS_NAMES = ('replica_reads', 'primary_reads', 'pinned_reads', 'writes')
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+# запись моделей этих приложений меняет то, что пользователь читает
+CONTENT_APPS = ('blog',)
+
+_routing = ContextVar('db_routing', default=None)
+_routing_stats = BufferedCounters(STATS_KEY, STATS_NAMES)
+
+
+class RoutingState:
+    """Маршрутизация одного запроса: можно ли читать с реплики."""
+
+    def __init__(self, pinned=False, safe=True):
+        self.pinned = pinned
+        self.safe = safe
+        self.read_replica = False
+        self.wrote = False
+        self.stats = Counter()
+
+
+def get_replica_alias():
+    alias = getattr(settings, 'DATABASE_REPLICA_ALIAS', 'replica')
+    return alias if alias in settings.DATABASES else None
+
+
+def use_replica_for_reads():
+    """Отправить чтения текущего запроса на реплику (если не закреплён)."""
+    state = _routing.get()
+    if state is not None:
+        state.read_replica = True
+
+
+def use_primary_for_reads():
+    """Дальнейшие чтения текущего запроса — из основной базы."""
+    state = _routing.get()
+    if state is not None:
+        state.read_replica = False
+
+
+def reads_from_replica():
+    """Идут ли сейчас чтения текущего запроса на реплику."""
+    state = _routing.get()
+    return (
+        state is not None and state.read_replica
+        and not (state.pinned or state.wrote)
+        and get_replica_alias() is not None
+    )
+
+
+class ReplicaRouter:
+    """
+    Чтения страниц блога — на реплику, всё остальное — на основную базу.
+
+    На реплику уходят только чтения запросов, помеченных
+    use_replica_for_reads (ReplicaReadMixin), и только если в
+    DATABASES есть DATABASE_REPLICA_ALIAS. После записи пользователь
+    на REPLICA_PIN_SECONDS закрепляется за основной базой, чтобы
+    видеть свои изменения, даже если реплика отстаёт. Закрепляет
+    только запись содержимого: любая запись в POST-запросе и запись
+    моделей CONTENT_APPS в GET (но не сохранение сессии и т.п.).
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _routing.get()
+        if state is None or not state.read_replica:
+            if state is not None:
+                state.stats['primary_reads'] += 1
+            return None
+        replica = get_replica_alias()
+        if state.pinned or state.wrote or replica is None:
+            state.stats['pinned_reads' if replica else 'primary_reads'] += 1
+            return None
+        state.stats['replica_reads'] += 1
+        return replica
+
+    def db_for_write(self, model, **hints):
+        state = _routing.get()
+        if state is not None:
+            if not state.safe or model._meta.app_label in CONTENT_APPS:
+                state.wrote = True
+            state.stats['writes'] += 1
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # реплика — копия основной базы, связи между ними допустимы
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != get_replica_alias()
+
+
+class ReplicaRoutingMiddleware:
+    """Заводит состояние маршрутизации на запрос и ставит закрепление."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = RoutingState(
+            pinned=PIN_COOKIE in request.COOKIES,
+            safe=request.method in SAFE_METHODS,
+        )
+        token = _routing.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing.reset(token)
+        if state.wrote:
+            response.set_cookie(
+                PIN_COOKIE, '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        record_routing_stats(state.stats)
+        return response
+
+
+class ReplicaReadMixin:
+    """Чтения GET/HEAD-запросов представления — с реплики."""
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method in ('GET', 'HEAD'):
+            use_replica_for_reads()
+        return super().dispatch(request, *args, **kwargs)
+
+
+def record_routing_stats(stats):
+    """
+    Прибавить счётчики запроса к общим.
+
+    В кэш они уходят не на каждый запрос, а пачкой раз в несколько
+    секунд (BufferedCounters).
+    """
+    _routing_stats.update(stats)
+
+
+def get_routing_stats():
+    return _routing_stats.get()
+
+
+def reset_routing_stats():
+    _routing_stats.reset()
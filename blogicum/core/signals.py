@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from .db import DEFAULT_SQLITE_PRAGMAS
+
+
+def apply_sqlite_pragmas(connection, pragmas):
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+@receiver(connection_created)
+def configure_sqlite_connection(sender, connection, **kwargs):
+    """Выставить SQLITE_PRAGMAS каждому новому соединению с SQLite."""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', DEFAULT_SQLITE_PRAGMAS)
+    if connection.is_in_memory_db():
+        # у базы в памяти нет файла: журнал и mmap к ней не применимы
+        pragmas = {
+            name: value for name, value in pragmas.items()
+            if name not in ('journal_mode', 'mmap_size')
+        }
+    apply_sqlite_pragmas(connection, pragmas)
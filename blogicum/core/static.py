@@ -0,0 +1,290 @@
+import mimetypes
+import os
+import posixpath
+import re
+from email.utils import formatdate, parsedate_to_datetime
+from urllib.parse import unquote
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+CHUNK_SIZE = 64 * 1024
+FOREVER = 'public, max-age=31536000, immutable'
+# имена, в которых есть хэш содержимого: style.3f2a9c0d1b7e.css (манифест),
+# posts_images/ab/<sha256>.jpg и variants/<хэш>_card.webp (хранилище по хэшу)
+IMMUTABLE_NAME_RE = re.compile(
+    r'\.[0-9a-f]{12}\.\w+$|(?:^|/)[0-9a-f]{16,64}(?:_\w+)?\.\w+$'
+)
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class StaticResponse:
+    """Что отдать: статус, заголовки и (для 200/206) кусок файла."""
+
+    def __init__(self, status, headers, path=None, start=0, length=0):
+        self.status = status
+        self.headers = headers
+        self.path = path
+        self.start = start
+        self.length = length
+
+    def iter_chunks(self, file):
+        file.seek(self.start)
+        remaining = self.length
+        while remaining > 0:
+            chunk = file.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+class StaticFiles:
+    """
+    Раздача статики и медиа в обход Django.
+
+    Хэшированные имена кэшируются навсегда (immutable), остальные —
+    на max_age секунд. Поддерживаются If-None-Match/If-Modified-Since,
+    заранее сжатые .br/.gz (см. core.storage) и Range для докачки
+    и просмотра больших изображений.
+    """
+
+    def __init__(self, max_age=None):
+        if max_age is None:
+            max_age = settings.STATIC_MAX_AGE
+        self.max_age = max_age
+        self.roots = []
+        for url, root in (
+            (settings.STATIC_URL, settings.STATIC_ROOT),
+            (settings.MEDIA_URL, settings.MEDIA_ROOT),
+        ):
+            if url and root and url.startswith('/'):
+                self.roots.append((url, os.path.realpath(root)))
+
+    def find(self, path):
+        """Файл на диске для пути запроса или None."""
+        for url, root in self.roots:
+            if not path.startswith(url):
+                continue
+            name = posixpath.normpath(unquote(path[len(url):]))
+            if name.startswith(('..', '/')) or name == '.':
+                return None
+            filename = os.path.join(root, *name.split('/'))
+            if os.path.isfile(filename):
+                return name, filename
+            return None
+        return None
+
+    def handles(self, path):
+        return any(path.startswith(url) for url, _ in self.roots)
+
+    def respond(self, method, path, headers):
+        """
+        Ответ на запрос к файлу; headers — заголовки запроса
+        в нижнем регистре. None — запрос обрабатывает Django.
+        """
+        if not self.handles(path):
+            return None
+        if method not in ('GET', 'HEAD'):
+            return StaticResponse(405, [('Allow', 'GET, HEAD')])
+        found = self.find(path)
+        if found is None:
+            # пусть ответит Django (страница 404, медиа в режиме DEBUG)
+            return None
+        name, filename = found
+        content_type, _ = mimetypes.guess_type(filename)
+        encoding, filename = self.negotiate(
+            filename, headers.get('accept-encoding', '')
+        )
+        stat = os.stat(filename)
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        response_headers = [
+            ('Content-Type', content_type or 'application/octet-stream'),
+            ('Cache-Control', self.cache_control(name)),
+            ('ETag', etag),
+            ('Last-Modified', formatdate(stat.st_mtime, usegmt=True)),
+            ('Vary', 'Accept-Encoding'),
+        ]
+        if encoding:
+            response_headers.append(('Content-Encoding', encoding))
+        else:
+            response_headers.append(('Accept-Ranges', 'bytes'))
+        if not self.modified(headers, etag, stat.st_mtime):
+            return StaticResponse(304, response_headers)
+        start, length = 0, stat.st_size
+        status = 200
+        requested = headers.get('range')
+        if requested and not encoding and self.range_applies(headers, etag):
+            byte_range = self.parse_range(requested, stat.st_size)
+            if byte_range is None:
+                return StaticResponse(416, response_headers + [
+                    ('Content-Range', f'bytes */{stat.st_size}'),
+                ])
+            start, length = byte_range
+            status = 206
+            response_headers.append((
+                'Content-Range',
+                f'bytes {start}-{start + length - 1}/{stat.st_size}',
+            ))
+        response_headers.append(('Content-Length', str(length)))
+        if method == 'HEAD':
+            length = 0
+        return StaticResponse(
+            status, response_headers, filename, start, length
+        )
+
+    def cache_control(self, name):
+        if IMMUTABLE_NAME_RE.search(name):
+            return FOREVER
+        return f'public, max-age={self.max_age}'
+
+    def negotiate(self, filename, accept_encoding):
+        accepted = {
+            part.split(';')[0].strip()
+            for part in accept_encoding.lower().split(',')
+        }
+        for encoding, suffix in ENCODINGS:
+            if encoding in accepted and os.path.isfile(filename + suffix):
+                return encoding, filename + suffix
+        return None, filename
+
+    @staticmethod
+    def modified(headers, etag, mtime):
+        if_none_match = headers.get('if-none-match')
+        if if_none_match is not None:
+            tags = {tag.strip() for tag in if_none_match.split(',')}
+            return etag not in tags and '*' not in tags
+        if_modified_since = headers.get('if-modified-since')
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return True
+            return int(mtime) > since
+        return True
+
+    @staticmethod
+    def range_applies(headers, etag):
+        # If-Range с другим ETag — файл сменился, отдаём его целиком
+        if_range = headers.get('if-range')
+        return if_range is None or if_range == etag
+
+    @staticmethod
+    def parse_range(value, size):
+        """(начало, длина) одного диапазона или None, если он вне файла."""
+        match = RANGE_RE.match(value.replace(' ', ''))
+        if match is None or match.groups() == ('', ''):
+            return None
+        first, last = match.groups()
+        if not first:
+            length = min(int(last), size)
+            return (size - length, length) if length else None
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if start > end:
+            return None
+        return start, end - start + 1
+
+
+class StaticFilesWSGI:
+    """WSGI-обёртка: файлы из STATIC_ROOT и MEDIA_ROOT отдаёт сама."""
+
+    def __init__(self, application, max_age=None):
+        self.application = application
+        self.files = StaticFiles(max_age)
+
+    def __call__(self, environ, start_response):
+        headers = {
+            key[5:].replace('_', '-').lower(): value
+            for key, value in environ.items()
+            if key.startswith('HTTP_')
+        }
+        response = self.files.respond(
+            environ['REQUEST_METHOD'], environ.get('PATH_INFO', ''), headers
+        )
+        if response is None:
+            return self.application(environ, start_response)
+        start_response(
+            f'{response.status} {STATUS_PHRASES[response.status]}',
+            response.headers,
+        )
+        if not response.length:
+            return []
+        file = open(response.path, 'rb')
+        file_wrapper = environ.get('wsgi.file_wrapper')
+        if file_wrapper is not None and response.status == 200:
+            return file_wrapper(file, CHUNK_SIZE)
+        return ClosingIterator(response.iter_chunks(file), file)
+
+
+class ClosingIterator:
+    def __init__(self, iterator, file):
+        self.iterator = iterator
+        self.file = file
+
+    def __iter__(self):
+        return self.iterator
+
+    def close(self):
+        self.file.close()
+
+
+class StaticFilesASGI:
+    """ASGI-обёртка: то же для HTTP-запросов, остальное — в приложение."""
+
+    def __init__(self, application, max_age=None):
+        self.application = application
+        self.files = StaticFiles(max_age)
+
+    async def __call__(self, scope, receive, send):
+        response = None
+        if scope['type'] == 'http':
+            headers = {
+                key.decode('latin-1').lower(): value.decode('latin-1')
+                for key, value in scope['headers']
+            }
+            response = self.files.respond(
+                scope['method'], scope['path'], headers
+            )
+        if response is None:
+            return await self.application(scope, receive, send)
+        await send({
+            'type': 'http.response.start',
+            'status': response.status,
+            'headers': [
+                (key.lower().encode('latin-1'), value.encode('latin-1'))
+                for key, value in response.headers
+            ],
+        })
+        if not response.length:
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+        file = await sync_to_async(open, thread_sensitive=False)(
+            response.path, 'rb'
+        )
+        try:
+            chunks = response.iter_chunks(file)
+            read_chunk = sync_to_async(
+                lambda: next(chunks, None), thread_sensitive=False
+            )
+            chunk = await read_chunk()
+            while chunk is not None:
+                following = await read_chunk()
+                await send({
+                    'type': 'http.response.body',
+                    'body': chunk,
+                    'more_body': following is not None,
+                })
+                chunk = following
+        finally:
+            file.close()
+
+
+STATUS_PHRASES = {
+    200: 'OK',
+    206: 'Partial Content',
+    304: 'Not Modified',
+    405: 'Method Not Allowed',
+    416: 'Range Not Satisfiable',
+}
@@ -0,0 +1,67 @@
+import threading
+import time
+from collections import Counter
+
+from django.core.cache import cache
+
+# как часто процесс складывает накопленные счётчики в общий кэш
+STATS_FLUSH_SECONDS = 10
+
+
+class BufferedCounters:
+    """
+    Счётчики, общие для процессов, без записи в кэш на каждое событие.
+
+    События копятся в памяти процесса и не чаще раза в flush_interval
+    секунд складываются в кэш — по одному incr на счётчик: запись
+    в файловый кэш или по сети не стоит ни карточке, ни запросу.
+    Чтение сначала сбрасывает накопленное текущим процессом; счётчики
+    других процессов видны с задержкой до flush_interval, а при
+    остановке процесса несброшенное теряется.
+    """
+
+    def __init__(self, key, names, flush_interval=STATS_FLUSH_SECONDS):
+        self.key = key
+        self.names = names
+        self.flush_interval = flush_interval
+        self._pending = Counter()
+        self._lock = threading.Lock()
+        self._flushed_at = time.monotonic()
+
+    def update(self, counts):
+        """Прибавить счётчики ({имя: значение}) в памяти процесса."""
+        with self._lock:
+            self._pending.update(counts)
+            due = time.monotonic() - self._flushed_at >= self.flush_interval
+        if due:
+            self.flush()
+
+    def add(self, name, value=1):
+        self.update({name: value})
+
+    def flush(self):
+        """Сложить накопленное в кэш."""
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._flushed_at = time.monotonic()
+        for name, value in pending.items():
+            if not value:
+                continue
+            key = self.key.format(name=name)
+            try:
+                cache.incr(key, value)
+            except ValueError:
+                cache.add(key, 0, timeout=None)
+                cache.incr(key, value)
+
+    def get(self):
+        self.flush()
+        keys = {name: self.key.format(name=name) for name in self.names}
+        values = cache.get_many(keys.values())
+        return {name: values.get(key, 0) for name, key in keys.items()}
+
+    def reset(self):
+        with self._lock:
+            self._pending.clear()
+            self._flushed_at = time.monotonic()
+        cache.delete_many([self.key.format(name=name) for name in self.names])
@@ -0,0 +1,87 @@
+import gzip
+import logging
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:  # brotli необязателен: без него только gzip
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_EXTENSIONS = {
+    '.css', '.js', '.map', '.svg', '.ico', '.txt', '.json', '.xml', '.html',
+}
+# сжатая копия сохраняется, только если она заметно меньше оригинала
+MIN_COMPRESSION_RATIO = 0.95
+
+
+def compress_file(path):
+    """
+    Записать рядом с файлом path.gz и (если есть brotli) path.br.
+
+    Возвращает список созданных файлов.
+    """
+    with open(path, 'rb') as source:
+        data = source.read()
+    encoders = [('.gz', lambda raw: gzip.compress(raw, 9, mtime=0))]
+    if brotli is not None:
+        encoders.append(('.br', lambda raw: brotli.compress(raw)))
+    created = []
+    for suffix, encode in encoders:
+        compressed = encode(data)
+        if len(compressed) >= len(data) * MIN_COMPRESSION_RATIO:
+            continue
+        with open(path + suffix, 'wb') as target:
+            target.write(compressed)
+        created.append(path + suffix)
+    return created
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Статика с хэшем содержимого в имени и заранее сжатыми копиями.
+
+    collectstatic пишет style.css, style.<hash>.css и манифест, а после
+    этого — .gz и .br для текстовых файлов: сервер (core.static или
+    nginx gzip_static) отдаёт их без сжатия на лету. Хэшированные
+    имена можно кэшировать навсегда.
+    """
+
+    manifest_strict = False
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # имена, о которых уже предупредили: {% static %} зовёт
+        # stored_name при каждом рендере
+        self._unstored_names = set()
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # collectstatic ещё не запускался (разработка, тесты)
+            if name not in self._unstored_names:
+                self._unstored_names.add(name)
+                logger.warning('Статический файл %s не собран', name)
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        processed_names = set()
+        for name, hashed_name, processed in super().post_process(
+                paths, dry_run=dry_run, **options
+        ):
+            yield name, hashed_name, processed
+            if not isinstance(processed, Exception):
+                processed_names.add(name)
+        if dry_run:
+            return
+        # промежуточные имена CSS удаляются, сжимаем только итоговые
+        final_names = processed_names | {
+            self.stored_name(name) for name in processed_names
+        }
+        for name in sorted(final_names):
+            if os.path.splitext(name)[1].lower() in COMPRESSIBLE_EXTENSIONS:
+                compress_file(self.path(name))
@@ -1,6 +1,5 @@
 import os
 import re
-import time
 from http import HTTPStatus
 from inspect import getsource
 from pathlib import Path
@@ -18,7 +17,10 @@ from typing import (
 
 import pytest
 from django.apps import apps
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
 from django.db.models import Model, Field
 from django.forms import BaseForm
 from django.http import HttpResponse
@@ -35,12 +37,93 @@ UrlRepr = NamedTuple("UrlRepr", [("url", str), ("repr", str)])
 TitledUrlRepr = TypeVar("TitledUrlRepr", bound=Tuple[UrlRepr, str])
 
 
+@pytest.fixture(scope="session", autouse=True)
+def fast_test_settings(tmp_path_factory):
+    """
+    Быстрый хешер паролей и свой MEDIA_ROOT во временном каталоге
+    на процесс: загруженные тестами файлы не попадают в media проекта
+    и не мешают параллельным процессам pytest-xdist. Кэш — в памяти
+    процесса: cache.clear() одного процесса не сбрасывает кэш другого.
+    """
+    with override_settings(
+        PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+        MEDIA_ROOT=tmp_path_factory.mktemp("media"),
+        CACHES={"default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }},
+    ):
+        yield
+
+
+@pytest.fixture(scope="session")
+def django_db_modify_db_settings():
+    """
+    Под pytest-xdist у каждого процесса своя тестовая база: к файлу
+    SQLite (SQLITE_TEST_PATH) и к имени базы PostgreSQL добавляется
+    номер процесса. Базы SQLite в памяти и так у процессов свои.
+    """
+    worker = os.environ.get("PYTEST_XDIST_WORKER")
+    if not worker:
+        return
+    for db_settings in settings.DATABASES.values():
+        test_settings = db_settings.setdefault("TEST", {})
+        if test_settings.get("MIRROR"):
+            continue
+        name = test_settings.get("NAME")
+        if db_settings["ENGINE"] == "django.db.backends.sqlite3":
+            if name:
+                path = Path(name)
+                test_settings["NAME"] = str(
+                    path.with_name(f"{path.stem}-{worker}{path.suffix}")
+                )
+        else:
+            name = name or f"test_{db_settings['NAME']}"
+            test_settings["NAME"] = f"{name}_{worker}"
+
+
+def db_snapshot(django_db_blocker, build):
+    """
+    Генератор для фикстуры модуля: данные build() создаются один раз
+    в открытой транзакции, а транзакция каждого теста pytest-django —
+    SAVEPOINT внутри неё, так что тест откатывается к этому снимку,
+    а не к пустой базе. После модуля откатывается и снимок.
+
+    Не годится для модулей с django_db(transaction=True).
+    """
+    with django_db_blocker.unblock():
+        atomic = transaction.atomic()
+        atomic.__enter__()
+        try:
+            data = build()
+        except BaseException as error:
+            atomic.__exit__(type(error), error, error.__traceback__)
+            raise
+    try:
+        yield data
+    finally:
+        with django_db_blocker.unblock():
+            transaction.set_rollback(True)
+            atomic.__exit__(None, None, None)
+
+
 @pytest.fixture(autouse=True)
 def enable_debug_false():
     with override_settings(DEBUG=False):
         yield
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from blog.cache import reset_card_cache_stats
+    from core.routers import reset_routing_stats
+
+    cache.clear()
+    # и счётчики, накопленные процессом, но ещё не сброшенные в кэш
+    reset_card_cache_stats()
+    reset_routing_stats()
+    yield
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -345,25 +428,3 @@ def get_field_key(field_type: type, field: Field) -> Tuple[str, Optional[str]]:
         return (field_type.__name__, field.related_model.__name__)
     else:
         return (field_type.__name__, None)
-
-
-@pytest.fixture(scope="session", autouse=True)
-def cleanup(request):
-    start_time = time.time()
-
-    yield
-
-    from blogicum import settings
-
-    image_dir = Path(settings.__file__).parent.parent / settings.MEDIA_ROOT
-
-    for root, dirs, files in os.walk(image_dir):
-        for filename in files:
-            if (
-                    filename.endswith(".jpg")
-                    or filename.endswith(".gif")
-                    or filename.endswith(".png")
-            ):
-                file_path = os.path.join(root, filename)
-                if os.path.getmtime(file_path) >= start_time:
-                    os.remove(file_path)
@@ -0,0 +1,63 @@
+import pytest
+from django.core.management import call_command
+
+from blog.models import AuthorStats
+
+
+def stats_of(user):
+    stats = AuthorStats.objects.get(pk=user.pk)
+    return stats.posts, stats.published_posts, stats.comments_received
+
+
+@pytest.mark.django_db
+def test_stats_follow_post_and_comment_writes(
+        mixer, user, another_user, published_category
+):
+    assert stats_of(user) == (0, 0, 0)
+    post = mixer.blend(
+        "blog.Post", author=user, is_published=True,
+        category=published_category, location=None,
+    )
+    mixer.blend("blog.Post", author=user, is_published=False, location=None)
+    comments = mixer.cycle(2).blend(
+        "blog.Comment", post=post, author=another_user
+    )
+    assert stats_of(user) == (2, 1, 2)
+    assert stats_of(another_user) == (0, 0, 0)
+
+    post.refresh_from_db()
+    post.is_published = False
+    post.save()
+    assert stats_of(user) == (2, 0, 2)
+
+    post.author = another_user
+    post.save()
+    assert stats_of(user) == (1, 0, 0)
+    assert stats_of(another_user) == (1, 0, 2)
+
+    comments[0].delete()
+    assert stats_of(another_user) == (1, 0, 1)
+    post.delete()
+    assert stats_of(another_user) == (0, 0, 0)
+
+
+@pytest.mark.django_db
+def test_rebuild_restores_missing_and_wrong_rows(mixer, user, another_user):
+    mixer.cycle(3).blend("blog.Post", author=user, is_published=True)
+    AuthorStats.objects.filter(pk=user.pk).update(posts=0)
+    AuthorStats.objects.filter(pk=another_user.pk).delete()
+
+    call_command("rebuild_author_stats", verbosity=0)
+    assert stats_of(user) == (3, 3, 0)
+    assert stats_of(another_user) == (0, 0, 0)
+
+
+@pytest.mark.django_db
+def test_profile_shows_stats(client, mixer, user):
+    mixer.blend("blog.Post", author=user, is_published=True)
+    AuthorStats.objects.filter(pk=user.pk).delete()
+    content = client.get(f"/profile/{user.username}/").content.decode()
+    assert "Публикаций: 1" in content
+    assert AuthorStats.objects.filter(pk=user.pk).exists(), (
+        "Недостающая строка статистики должна пересчитываться при показе."
+    )
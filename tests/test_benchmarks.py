@@ -0,0 +1,56 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import Comment, Post
+from blog.synthetic import SyntheticData
+
+DATASET = dict(users=5, categories=2, locations=3, posts=30, comments=200)
+
+
+def test_synthetic_data_is_deterministic_and_skewed():
+    first = SyntheticData(seed=7, **DATASET)
+    second = SyntheticData(seed=7, now=first.now, **DATASET)
+    for label in ("blog.post", "blog.comment"):
+        assert list(first.records(label)) == list(second.records(label))
+    posts = [record["fields"]["post"]
+             for record in first.records("blog.comment")]
+    busiest = max(posts.count(post) for post in set(posts))
+    assert busiest > 3 * len(posts) / DATASET["posts"], (
+        "Комментарии должны распределяться по постам неравномерно."
+    )
+
+
+@pytest.mark.django_db
+def test_generate_and_bench_views(tmp_path):
+    call_command(
+        "generate_blog_data", seed=3, verbosity=0,
+        **{key: value for key, value in DATASET.items()},
+    )
+    assert Post.objects.count() == DATASET["posts"]
+    assert Comment.objects.count() == DATASET["comments"]
+
+    output = tmp_path / "bench.json"
+    call_command(
+        "bench_views", requests=3, warmup=1, memory_samples=1,
+        output=str(output), stdout=StringIO(),
+    )
+    report = json.loads(output.read_text(encoding="utf-8"))
+    assert set(report["scenarios"]) >= {
+        "index", "category", "profile", "post_detail", "add_comment"
+    }
+    for result in report["scenarios"].values():
+        assert result["p50_ms"] > 0 and result["queries"] >= 0
+    assert Comment.objects.count() == DATASET["comments"], (
+        "Комментарии из бенчмарка должны откатываться."
+    )
+
+    report = StringIO()
+    call_command(
+        "bench_views", requests=2, warmup=0, memory_samples=0,
+        compare=str(output),
+        output=str(tmp_path / "second.json"), stdout=report,
+    )
+    assert "%" in report.getvalue()
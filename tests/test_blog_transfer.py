@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import AuthorStats, Category, Comment, Post
+from blog.search import search_posts
+from blog.transfer import IdMap
+
+
+def test_id_map_handles_unordered_keys():
+    id_map = IdMap()
+    for old, new in ((1, 10), (5, 11), (3, 12), (7, 13)):
+        id_map.add(old, new)
+    assert [id_map.get(old) for old in (1, 3, 5, 7, 2)] == [
+        10, 12, 11, 13, None
+    ]
+    assert len(id_map) == 4
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("dump", ["export", "dumpdata"])
+def test_export_import_round_trip(
+        tmp_path, mixer, user, another_user, published_category, dump
+):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        location=None, title="Путешествие на север",
+    )
+    mixer.cycle(2).blend("blog.Comment", post=post, author=another_user)
+    created_at = post.created_at
+    path = tmp_path / "blog.jsonl.gz"
+    if dump == "export":
+        call_command("export_blog_data", str(path))
+    else:
+        path = tmp_path / "blog.jsonl"
+        call_command(
+            "dumpdata", "blog.category", "blog.location", "blog.post",
+            "blog.comment", "auth.user", format="jsonl", output=str(path),
+        )
+    Post.objects.all().delete()
+
+    call_command("import_blog_data", str(path), verbosity=0)
+    assert Category.objects.count() == 1, (
+        "Категории, которые уже есть в базе, не должны дублироваться."
+    )
+    imported = Post.objects.get()
+    assert imported.pk > post.pk, (
+        "Ключи удалённых постов не должны выдаваться повторно."
+    )
+    # dumpdata округляет время до миллисекунд, export_blog_data — нет
+    precision = timedelta(milliseconds=0 if dump == "export" else 1)
+    assert abs(imported.created_at - created_at) <= precision
+    assert imported.author == user
+    assert imported.comment_count == 2
+    assert Comment.objects.filter(author=another_user).count() == 2
+    assert AuthorStats.objects.get(pk=user.pk).comments_received == 2
+    assert list(search_posts(Post.objects.all(), "путешествия")) == [imported]
+
+
+@pytest.mark.django_db
+def test_import_skips_records_with_missing_required_links(tmp_path):
+    path = tmp_path / "blog.jsonl"
+    path.write_text(
+        '{"model": "blog.post", "pk": 1, "fields": {"title": "Т", '
+        '"text": "Т", "pub_date": "2022-12-18T23:03:52Z", "author": 5}}\n',
+        encoding="utf-8",
+    )
+    call_command("import_blog_data", str(path), verbosity=0)
+    assert not Post.objects.exists()
@@ -0,0 +1,57 @@
+import pytest
+from django.core.cache import cache
+
+from blog import cache as blog_cache
+from blog.cache import STATS_KEY, get_card_cache_stats
+
+
+@pytest.mark.django_db
+def test_post_card_cache_invalidation(
+        user_client, mixer, user, post_with_published_location
+):
+    # авторизованным отдаётся не кэш страницы, а рендер с кэшем карточек
+    client = user_client
+    post = post_with_published_location
+
+    client.get("/")
+    content = client.get("/").content.decode("utf-8")
+    assert get_card_cache_stats() == {"hits": 1, "misses": 1}, (
+        "Повторный показ ленты должен брать карточку поста из кэша."
+    )
+    assert "Комментарии (0)" in content
+
+    mixer.blend("blog.Comment", post=post, author=user)
+    content = client.get("/").content.decode("utf-8")
+    assert "Комментарии (1)" in content, (
+        "Новый комментарий должен сбрасывать кэш карточки поста."
+    )
+
+    post.category.title = "Переименованная категория"
+    post.category.save()
+    content = client.get("/").content.decode("utf-8")
+    assert "Переименованная категория" in content, (
+        "Изменение категории должно сбрасывать кэш карточек."
+    )
+
+
+@pytest.mark.django_db
+def test_card_stats_are_not_written_per_card(
+        user_client, many_posts_with_published_locations, monkeypatch
+):
+    monkeypatch.setattr(blog_cache._card_stats, "flush_interval", 3600)
+    writes = []
+    incr = cache.incr
+
+    def counting_incr(key, *args, **kwargs):
+        writes.append(key)
+        return incr(key, *args, **kwargs)
+
+    monkeypatch.setattr(cache, "incr", counting_incr)
+    user_client.get("/")
+    user_client.get("/")
+    stat_keys = {STATS_KEY.format(name=name) for name in ("hits", "misses")}
+    assert not stat_keys & set(writes), (
+        "Счётчики кэша карточек не должны писаться в кэш на каждую карточку."
+    )
+    stats = get_card_cache_stats()
+    assert stats["hits"] == stats["misses"] > 1
@@ -0,0 +1,20 @@
+import pytest
+from django.core.management import call_command
+
+from blog.checks import check_feed_query_plans
+from blog.models import Category
+
+
+@pytest.mark.django_db
+def test_feed_query_plan_check_on_empty_db():
+    assert not Category.objects.exists()
+    call_command("check", databases=["default"])
+
+
+@pytest.mark.django_db
+def test_feed_query_plan_check_on_populated_db(
+        many_posts_with_published_locations
+):
+    assert Category.objects.filter(is_published=True).exists()
+    assert check_feed_query_plans(databases=["default"]) == []
+    call_command("check", databases=["default"])
@@ -0,0 +1,57 @@
+import pytest
+from django.core import serializers
+from django.core.management import call_command
+
+from blog.models import Comment, Post
+
+
+def comment_count(post):
+    return Post.objects.values_list("comment_count", flat=True).get(
+        pk=post.pk
+    )
+
+
+@pytest.mark.django_db
+def test_comment_create_and_delete_update_counter(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.post(f"/posts/{post.pk}/comment/", {"text": "Первый"})
+    user_client.post(f"/posts/{post.pk}/comment/", {"text": "Второй"})
+    assert comment_count(post) == 2
+
+    comment = Comment.objects.filter(post=post).first()
+    user_client.post(f"/posts/{post.pk}/delete_comment/{comment.pk}/")
+    assert not Comment.objects.filter(pk=comment.pk).exists()
+    assert comment_count(post) == 1
+
+
+@pytest.mark.django_db
+def test_recount_comments_fixes_drifted_counter(
+        mixer, user, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.blend("blog.Comment", post=post, author=user)
+    Post.objects.filter(pk=post.pk).update(comment_count=5)
+    call_command("recount_comments")
+    assert comment_count(post) == 1
+
+
+@pytest.mark.django_db
+def test_loaddata_keeps_counter_from_fixture(
+        tmp_path, mixer, user, post_with_published_location
+):
+    post = post_with_published_location
+    comment = mixer.blend("blog.Comment", post=post, author=user)
+    post.refresh_from_db()
+    assert post.comment_count == 1
+    fixture = tmp_path / "blog.json"
+    fixture.write_text(serializers.serialize("json", [post, comment]))
+    Post.objects.filter(pk=post.pk).delete()
+
+    call_command("loaddata", fixture, verbosity=0)
+    assert Comment.objects.filter(post=post).count() == 1
+    assert comment_count(post) == 1, (
+        "Сохранение комментария при loaddata (raw) не должно"
+        " увеличивать счётчик, уже загруженный из фикстуры."
+    )
@@ -0,0 +1,51 @@
+import pytest
+
+from blog.views import COMMENTS_PER_PAGE
+
+
+@pytest.fixture
+def many_comments(mixer, user, post_with_published_location):
+    return mixer.cycle(COMMENTS_PER_PAGE + 5).blend(
+        "blog.Comment", post=post_with_published_location, author=user,
+    )
+
+
+@pytest.mark.django_db
+def test_comments_are_paginated(
+        client, post_with_published_location, many_comments
+):
+    post = post_with_published_location
+    response = client.get(f"/posts/{post.id}/")
+    first_batch = response.context["comments"]
+    assert len(first_batch) == COMMENTS_PER_PAGE, (
+        "Убедитесь, что на странице поста выводится только первая порция"
+        " комментариев."
+    )
+    assert first_batch.has_next()
+
+    cursor = first_batch.next_cursor
+    fragment = client.get(f"/posts/{post.id}/comments/?cursor={cursor}")
+    assert fragment.status_code == 200
+    assert "<html" not in fragment.content.decode("utf-8")
+    assert len(fragment.context["comments"]) == 5
+
+    data = client.get(
+        f"/posts/{post.id}/comments/?cursor={cursor}&format=json"
+    ).json()
+    shown = [c.id for c in first_batch] + [c["id"] for c in data["comments"]]
+    assert shown == [c.id for c in many_comments], (
+        "Порции комментариев должны идти по времени создания без пропусков"
+        " и повторов."
+    )
+    assert data["next_cursor"] is None
+
+
+@pytest.mark.django_db
+def test_comments_endpoint_respects_post_visibility(
+        client, post_with_published_location
+):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    assert client.get(f"/posts/{post.id}/comments/").status_code == 404
+    assert client.get(f"/posts/{post.id}/comments/?cursor=bad").status_code == 404
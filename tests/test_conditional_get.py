@@ -0,0 +1,63 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("client_name", ["client", "user_client"])
+def test_feed_returns_not_modified_until_data_changes(
+        request, client_name, mixer, user, post_with_published_location,
+        django_assert_num_queries,
+):
+    client = request.getfixturevalue(client_name)
+    response = client.get("/")
+    etag = response["ETag"]
+    assert etag and response.has_header("Last-Modified"), (
+        "Убедитесь, что лента отдаёт заголовки ETag и Last-Modified."
+    )
+    # для авторизованного — только загрузка сессии и пользователя
+    queries = 2 if client_name == "user_client" else 0
+    with django_assert_num_queries(queries):
+        response = client.get("/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    mixer.blend("blog.Comment", post=post_with_published_location, author=user)
+    response = client.get("/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert response["ETag"] != etag
+
+
+@pytest.mark.django_db
+def test_validators_depend_on_viewer(
+        client, user_client, post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.pk}/"
+    anonymous = client.get(url)
+    assert anonymous["Cache-Control"] == "no-cache"
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=anonymous["ETag"])
+    assert response.status_code == HTTPStatus.OK
+    assert set(response["Cache-Control"].split(", ")) == {
+        "no-cache", "private"
+    }
+    assert user_client.get(
+        url, HTTP_IF_NONE_MATCH=response["ETag"]
+    ).status_code == HTTPStatus.NOT_MODIFIED
+
+
+@pytest.mark.django_db
+def test_detail_validator_changes_with_post(
+        client, post_with_published_location
+):
+    post = post_with_published_location
+    url = f"/posts/{post.pk}/"
+    response = client.get(url)
+    last_modified = response["Last-Modified"]
+    assert client.get(
+        url, HTTP_IF_MODIFIED_SINCE=last_modified
+    ).status_code == HTTPStatus.NOT_MODIFIED
+
+    post.title = "Новый заголовок"
+    post.save()
+    response = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert response.status_code == HTTPStatus.OK
+    assert "Новый заголовок" in response.content.decode("utf-8")
@@ -0,0 +1,64 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from conftest import N_PER_PAGE
+
+
+@pytest.fixture
+def posts_with_equal_dates(mixer, user, published_category):
+    now = timezone.now()
+    # по три поста на одну дату, чтобы проверить разрешение ничьих по id
+    dates = (
+        now - timedelta(hours=i // 3) for i in range(N_PER_PAGE * 2 + 5)
+    )
+    return mixer.cycle(N_PER_PAGE * 2 + 5).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        pub_date=dates,
+    )
+
+
+@pytest.mark.django_db
+def test_cursor_pages_cover_feed(
+        settings, client, posts_with_equal_dates
+):
+    settings.BLOG_CURSOR_PAGINATION = True
+    expected = sorted(
+        posts_with_equal_dates, key=lambda p: (p.pub_date, p.pk),
+        reverse=True,
+    )
+
+    seen, pages, url = [], [], "/"
+    while url:
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        assert response.status_code == 200
+        assert not any(
+            "COUNT(" in q["sql"].upper() for q in queries.captured_queries
+        ), "Курсорная пагинация не должна выполнять COUNT(*)."
+        page = response.context["page_obj"]
+        pages.append(page)
+        seen.extend(page)
+        url = f"/?cursor={page.next_cursor}" if page.has_next() else None
+
+    assert [p.pk for p in seen] == [p.pk for p in expected], (
+        "Убедитесь, что курсорные страницы выдают каждую публикацию ровно"
+        " один раз в порядке «от новых к старым»."
+    )
+    assert not pages[0].has_previous()
+
+    back = client.get(f"/?cursor={pages[-1].previous_cursor}")
+    assert [p.pk for p in back.context["page_obj"]] == [
+        p.pk for p in pages[-2]
+    ], "Ссылка «назад» должна вести на предыдущую страницу."
+
+
+@pytest.mark.django_db
+def test_invalid_cursor_is_404(settings, client):
+    settings.BLOG_CURSOR_PAGINATION = True
+    assert client.get("/?cursor=not-a-cursor").status_code == 404
@@ -0,0 +1,76 @@
+from pathlib import Path
+
+import pytest
+from django.db import connection
+
+from core.caches import cache_from_env
+from core.checks import check_shared_cache
+from core.db import database_from_env, sqlite_pragmas_from_env
+
+
+def test_database_from_env_profiles():
+    sqlite = database_from_env(Path("/srv"), env={})
+    assert sqlite["ENGINE"] == "django.db.backends.sqlite3"
+    assert sqlite["NAME"] == Path("/srv/db.sqlite3")
+    assert sqlite["CONN_MAX_AGE"] > 0
+    assert sqlite["OPTIONS"]["timeout"] == 20
+    assert sqlite["TEST"]["NAME"] is None
+    assert database_from_env(
+        Path("/srv"), env={"SQLITE_TEST_PATH": "/tmp/test.sqlite3"}
+    )["TEST"]["NAME"] == "/tmp/test.sqlite3"
+
+    postgres = database_from_env(Path("/srv"), env={
+        "DB_ENGINE": "postgres",
+        "POSTGRES_HOST": "db",
+        "POSTGRES_PGBOUNCER": "1",
+        "DB_CONN_MAX_AGE": "0",
+    })
+    assert postgres["ENGINE"] == "django.db.backends.postgresql"
+    assert postgres["HOST"] == "db"
+    assert postgres["CONN_MAX_AGE"] == 0
+    assert postgres["DISABLE_SERVER_SIDE_CURSORS"] is True
+
+    with pytest.raises(ValueError):
+        database_from_env(Path("/srv"), env={"DB_ENGINE": "oracle"})
+    with pytest.raises(ValueError):
+        sqlite_pragmas_from_env({"SQLITE_JOURNAL_MODE": "wal; DROP"})
+
+
+def test_cache_from_env_profiles():
+    assert cache_from_env(Path("/srv"), env={})["BACKEND"].endswith(
+        "LocMemCache"
+    )
+    file_cache = cache_from_env(Path("/srv"), env={"CACHE_BACKEND": "file"})
+    assert file_cache["BACKEND"].endswith("FileBasedCache")
+    assert file_cache["LOCATION"] == "/srv/cache"
+    assert file_cache["OPTIONS"]["MAX_ENTRIES"] == 10000
+
+    memcached = cache_from_env(Path("/srv"), env={
+        "CACHE_BACKEND": "memcached",
+        "CACHE_LOCATION": "mc1:11211,mc2:11211",
+        "CACHE_TIMEOUT": "60",
+    })
+    assert memcached["LOCATION"] == ["mc1:11211", "mc2:11211"]
+    assert memcached["TIMEOUT"] == 60
+
+    with pytest.raises(ValueError):
+        cache_from_env(Path("/srv"), env={"CACHE_BACKEND": "nosql"})
+
+
+def test_deploy_check_warns_about_process_local_cache(settings):
+    settings.CACHES = {"default": cache_from_env(Path("/srv"), env={})}
+    assert [issue.id for issue in check_shared_cache()] == ["core.W001"]
+    settings.CACHES = {"default": cache_from_env(
+        Path("/srv"), env={"CACHE_BACKEND": "memcached"}
+    )}
+    assert check_shared_cache() == []
+
+
+@pytest.mark.django_db
+def test_sqlite_connection_gets_pragmas():
+    if connection.vendor != "sqlite":
+        pytest.skip("pragma применяются только к SQLite")
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA synchronous")
+        # 1 — NORMAL
+        assert cursor.fetchone()[0] == 1
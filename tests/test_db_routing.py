@@ -0,0 +1,152 @@
+import pytest
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import override_settings
+
+from blog.cache import (
+    bump_post_version,
+    get_card_cache_key,
+    get_or_render_card,
+)
+from blog.models import Post
+from core import routers
+from core.routers import (
+    PIN_COOKIE,
+    ReplicaRouter,
+    ReplicaRoutingMiddleware,
+    get_routing_stats,
+    reset_routing_stats,
+    use_replica_for_reads,
+)
+
+
+def test_reads_go_to_replica_until_user_writes(rf):
+    router = ReplicaRouter()
+    decisions = []
+
+    def view(request):
+        use_replica_for_reads()
+        decisions.append(router.db_for_read(Post))
+        if request.method == "POST":
+            router.db_for_write(Post)
+            decisions.append(router.db_for_read(Post))
+        return HttpResponse()
+
+    middleware = ReplicaRoutingMiddleware(view)
+    # репликой объявлена сама основная база: важен выбор алиаса, а не данные
+    with override_settings(DATABASE_REPLICA_ALIAS="default"):
+        response = middleware(rf.get("/"))
+        assert decisions == ["default"]
+        assert PIN_COOKIE not in response.cookies
+
+        decisions.clear()
+        response = middleware(rf.post("/"))
+        assert decisions == ["default", None], (
+            "После записи в запросе чтения должны идти в основную базу."
+        )
+        assert PIN_COOKIE in response.cookies
+
+        decisions.clear()
+        request = rf.get("/")
+        request.COOKIES[PIN_COOKIE] = "1"
+        middleware(request)
+        assert decisions == [None]
+
+    # без реплики в DATABASES и вне запроса — всегда основная база
+    assert router.db_for_read(Post) is None
+
+
+@pytest.mark.django_db
+def test_comment_pins_author_to_primary(
+        user_client, post_with_published_location
+):
+    response = user_client.post(
+        f"/posts/{post_with_published_location.pk}/comment/",
+        {"text": "Комментарий"},
+    )
+    assert response.cookies[PIN_COOKIE]["max-age"] == (
+        settings.REPLICA_PIN_SECONDS
+    )
+    response = user_client.get("/")
+    assert PIN_COOKIE not in response.cookies
+
+
+def test_only_content_writes_pin_get_requests(rf):
+    router = ReplicaRouter()
+
+    def view(request):
+        use_replica_for_reads()
+        router.db_for_write(Session if request.GET.get("session") else Post)
+        return HttpResponse()
+
+    middleware = ReplicaRoutingMiddleware(view)
+    with override_settings(DATABASE_REPLICA_ALIAS="default"):
+        response = middleware(rf.get("/", {"session": "1"}))
+        assert PIN_COOKIE not in response.cookies, (
+            "Сохранение сессии в GET-запросе не должно закреплять"
+            " пользователя за основной базой."
+        )
+        assert PIN_COOKIE in middleware(rf.get("/")).cookies
+        assert PIN_COOKIE in middleware(
+            rf.post("/", {"session": "1"})
+        ).cookies
+
+
+@pytest.mark.django_db
+@override_settings(DATABASE_REPLICA_ALIAS="default")
+def test_fresh_versions_are_filled_from_primary(
+        client, post_with_published_location
+):
+    post = post_with_published_location
+    client.get("/")
+    reset_routing_stats()
+    client.get(f"/posts/{post.pk}/")
+    assert get_routing_stats()["replica_reads"] == 0, (
+        "Сразу после смены версий страница, которая осядет в кэше,"
+        " должна читаться из основной базы."
+    )
+    with override_settings(REPLICA_PIN_SECONDS=0):
+        client.get(f"/posts/{post.pk}/")
+    assert get_routing_stats()["replica_reads"] > 0
+
+
+@pytest.mark.django_db
+@override_settings(DATABASE_REPLICA_ALIAS="default")
+def test_card_from_lagging_replica_is_not_cached(
+        rf, post_with_published_location
+):
+    post = post_with_published_location
+
+    def view(request):
+        use_replica_for_reads()
+        get_or_render_card(post, lambda: "карточка")
+        return HttpResponse()
+
+    middleware = ReplicaRoutingMiddleware(view)
+    bump_post_version(post.pk)
+    middleware(rf.get("/"))
+    assert cache.get(get_card_cache_key(post)) is None
+    with override_settings(REPLICA_PIN_SECONDS=0):
+        middleware(rf.get("/"))
+    assert cache.get(get_card_cache_key(post)) == "карточка"
+
+
+@pytest.mark.django_db
+def test_routing_stats_are_not_written_per_request(client, monkeypatch):
+    monkeypatch.setattr(routers._routing_stats, "flush_interval", 3600)
+    writes = []
+    incr = cache.incr
+
+    def counting_incr(key, *args, **kwargs):
+        writes.append(key)
+        return incr(key, *args, **kwargs)
+
+    monkeypatch.setattr(cache, "incr", counting_incr)
+    for _ in range(3):
+        client.get("/")
+    assert not any(key.startswith("db:routing-stats") for key in writes), (
+        "Счётчики маршрутизации не должны писаться в кэш на каждый запрос."
+    )
+    assert get_routing_stats()["primary_reads"] > 0
@@ -0,0 +1,59 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from blog.refs import get_ref_tables
+
+# сессия и пользователь для авторизованных + пост + комментарии;
+# категория и локация — из справочников, загруженных заранее
+ANONYMOUS_QUERIES = 2
+AUTHORISED_QUERIES = 4
+
+
+@pytest.fixture
+def commented_post(mixer, user, another_user, post_with_published_location):
+    mixer.cycle(5).blend(
+        "blog.Comment",
+        post=post_with_published_location,
+        author=mixer.sequence(user, another_user),
+    )
+    return post_with_published_location
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    ("client_fixture", "expected_queries"),
+    [
+        ("unlogged_client", ANONYMOUS_QUERIES),
+        ("user_client", AUTHORISED_QUERIES),
+        ("another_user_client", AUTHORISED_QUERIES),
+    ],
+    ids=["anonymous", "author", "non-author"],
+)
+def test_post_detail_query_count(
+        request, django_assert_num_queries, commented_post,
+        client_fixture, expected_queries
+):
+    client = request.getfixturevalue(client_fixture)
+    get_ref_tables()
+    with django_assert_num_queries(expected_queries):
+        response = client.get(f"/posts/{commented_post.id}/")
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_hidden_post_detail_query_count(
+        django_assert_num_queries, user_client, another_user_client,
+        post_with_published_location
+):
+    post = post_with_published_location
+    post.pub_date = timezone.now() + timedelta(days=1)
+    post.save()
+    get_ref_tables()
+    with django_assert_num_queries(AUTHORISED_QUERIES):
+        assert user_client.get(f"/posts/{post.id}/").status_code == 200
+    # сессия, пользователь и один запрос поста с проверкой видимости
+    with django_assert_num_queries(3):
+        response = another_user_client.get(f"/posts/{post.id}/")
+    assert response.status_code == 404
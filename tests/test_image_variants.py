@@ -0,0 +1,203 @@
+from io import BytesIO
+
+import pytest
+from bs4 import BeautifulSoup
+from django.core.files.images import ImageFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.utils import timezone
+from PIL import Image
+
+from blog import jobs
+from blog.models import ImageJob, MediaBlob
+
+EXIF_ORIENTATION = 0x0112
+
+
+def make_image_file(size=(2000, 1000), name="big.jpg", orientation=None):
+    buffer = BytesIO()
+    image = Image.new("RGB", size, color=(10, 120, 200))
+    exif = Image.Exif()
+    if orientation is not None:
+        exif[EXIF_ORIENTATION] = orientation
+    image.save(buffer, "JPEG", exif=exif)
+    return ImageFile(buffer, name=name)
+
+
+@pytest.mark.django_db
+def test_post_image_variants(
+        user_client, mixer, user, published_category, published_location
+):
+    post = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        location=published_location,
+        image=make_image_file(),
+    )
+    job = ImageJob.objects.get(post=post)
+    assert job.status == ImageJob.PENDING
+    assert post.image_variants == {}, (
+        "Убедитесь, что уменьшенные копии не строятся при сохранении поста."
+    )
+    call_command("process_image_jobs")
+    job.refresh_from_db()
+    assert job.status == ImageJob.DONE
+    post.refresh_from_db()
+    variants = post.image_variants
+    assert variants["source"] == post.image.name
+    with default_storage.open(variants["card"][0]) as card:
+        assert Image.open(card).size == (640, 320)
+    with default_storage.open(variants["detail_webp"][0]) as detail:
+        assert Image.open(detail).format == "WEBP"
+
+    soup = BeautifulSoup(
+        user_client.get("/").content.decode("utf-8"), features="html.parser"
+    )
+    img = soup.find("img", srcset=True)
+    assert img is not None and "640w" in img["srcset"], (
+        "Убедитесь, что карточка поста ссылается на уменьшенную копию"
+        " изображения через srcset."
+    )
+    assert post.image.url not in img["src"]
+    assert soup.find("source", type="image/webp") is not None
+
+
+@pytest.mark.django_db
+def test_image_job_fixes_orientation_and_strips_exif(
+        mixer, user, published_category
+):
+    post = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        image=make_image_file(size=(400, 200), orientation=6),
+    )
+    uploaded_name = post.image.name
+    call_command("process_image_jobs")
+    post.refresh_from_db()
+    assert post.image.name != uploaded_name
+    assert MediaBlob.objects.get(name=uploaded_name).ref_count == 0
+    call_command("gc_media_blobs", grace=0)
+    assert not default_storage.exists(uploaded_name)
+    with default_storage.open(post.image.name) as original:
+        image = Image.open(original)
+        assert image.size == (200, 400)
+        assert not image.getexif()
+    with default_storage.open(post.image_variants["card"][0]) as card:
+        assert Image.open(card).size == (200, 400)
+
+
+@pytest.mark.django_db
+def test_broken_image_job_fails_after_retries(
+        user_client, mixer, user, published_category
+):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        image=make_image_file(),
+    )
+    with default_storage.open(post.image.name, "wb") as broken:
+        broken.write(b"not an image")
+    for _ in range(3):
+        call_command("process_image_jobs")
+        # срок следующей попытки наступил
+        ImageJob.objects.update(next_attempt_at=timezone.now())
+    job = ImageJob.objects.get(post=post)
+    assert job.status == ImageJob.FAILED
+    assert job.attempts == 3 and job.error
+    response = user_client.get(f"/posts/{post.pk}/")
+    assert post.image.url in response.content.decode("utf-8"), (
+        "Убедитесь, что без уменьшенных копий показывается оригинал."
+    )
+
+
+
+@pytest.mark.django_db
+def test_failed_job_is_not_retried_in_same_pass(
+        mixer, user, published_category
+):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        image=make_image_file(),
+    )
+    with default_storage.open(post.image.name, "wb") as broken:
+        broken.write(b"not an image")
+    assert jobs.process_pending_jobs() == 1
+    job = ImageJob.objects.get(post=post)
+    assert job.status == ImageJob.PENDING
+    assert job.attempts == 1
+    assert job.next_attempt_at > timezone.now()
+    assert jobs.process_pending_jobs() == 0
+
+    ImageJob.objects.update(next_attempt_at=timezone.now())
+    jobs.process_pending_jobs()
+    job.refresh_from_db()
+    assert job.attempts == 2
+    assert job.next_attempt_at - job.finished_at > jobs.RETRY_DELAY
+
+
+@pytest.mark.django_db
+def test_unexpected_error_does_not_leave_job_running(
+        mixer, user, published_category, monkeypatch, caplog
+):
+    def crash(post):
+        raise RuntimeError("сбой хранилища")
+
+    monkeypatch.setattr(jobs, "process_post_image", crash)
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        image=make_image_file(),
+    )
+    call_command("process_image_jobs")
+    job = ImageJob.objects.get(post=post)
+    assert job.status == ImageJob.PENDING
+    assert job.attempts == 1
+    assert job.error == "RuntimeError: сбой хранилища"
+    assert any(
+        record.levelname == "ERROR" for record in caplog.records
+    )
+
+
+@pytest.mark.django_db
+def test_stale_job_fails_after_last_attempt(mixer, user, published_category):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        image=make_image_file(),
+    )
+    ImageJob.objects.filter(post=post).update(
+        status=ImageJob.RUNNING,
+        attempts=jobs.MAX_ATTEMPTS,
+        started_at=timezone.now() - jobs.STALE_AFTER * 2,
+    )
+    assert jobs.requeue_stale_jobs() == 0
+    assert ImageJob.objects.get(post=post).status == ImageJob.FAILED
+
+
+@pytest.mark.django_db
+def test_same_image_is_stored_once_and_collected(
+        mixer, user, published_category
+):
+    def blend_post():
+        return mixer.blend(
+            "blog.Post", author=user, category=published_category,
+            image=make_image_file(size=(50, 50)),
+        )
+
+    first, second = blend_post(), blend_post()
+    assert first.image.name == second.image.name, (
+        "Убедитесь, что одинаковые изображения хранятся одним файлом."
+    )
+    name = first.image.name
+    assert MediaBlob.objects.get(name=name).ref_count == 2
+
+    first.delete()
+    call_command("gc_media_blobs", grace=0)
+    assert default_storage.exists(name)
+
+    second.image = make_image_file(size=(60, 60))
+    second.save()
+    assert MediaBlob.objects.get(name=name).ref_count == 0
+    call_command("gc_media_blobs", grace=0)
+    assert not default_storage.exists(name)
+    assert not MediaBlob.objects.filter(name=name).exists()
+    assert default_storage.exists(second.image.name)
@@ -0,0 +1,84 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+
+from blog.cache import (
+    check_scheduled_publications,
+    get_feed_version,
+    get_next_publication,
+)
+from blog.views import PostListView
+
+
+@pytest.mark.django_db
+def test_anonymous_feed_page_cache(
+        client, mixer, user, post_with_published_location
+):
+    post = post_with_published_location
+    first = client.get("/")
+    assert first.context is not None
+
+    cached = client.get("/")
+    assert cached.context is None, (
+        "Повторный анонимный запрос ленты должен отдаваться из кэша."
+    )
+    assert cached.content == first.content
+
+    mixer.blend("blog.Comment", post=post, author=user)
+    fresh = client.get("/")
+    assert fresh.context is not None, (
+        "Новый комментарий должен сбрасывать кэш страницы ленты."
+    )
+    assert "Комментарии (1)" in fresh.content.decode("utf-8")
+
+
+@pytest.mark.django_db
+def test_cached_page_keeps_view_headers(
+        client, monkeypatch, post_with_published_location
+):
+    render_to_response = PostListView.render_to_response
+
+    def render_with_headers(self, context, **kwargs):
+        response = render_to_response(self, context, **kwargs)
+        response["Content-Language"] = "ru"
+        patch_vary_headers(response, ["Accept-Language"])
+        return response
+
+    monkeypatch.setattr(
+        PostListView, "render_to_response", render_with_headers
+    )
+    first = client.get("/")
+    cached = client.get("/")
+    assert cached.context is None
+    for header in ("Content-Type", "Content-Language", "Vary"):
+        assert cached[header] == first[header], (
+            f"Ответ из кэша страниц потерял заголовок {header}."
+        )
+    assert "Accept-Language" in cached["Vary"]
+
+
+@pytest.mark.django_db
+def test_feed_version_changes_at_next_publication(
+        client, mixer, user, published_category
+):
+    now = timezone.now()
+    post = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        pub_date=now + timedelta(seconds=90),
+    )
+    assert get_next_publication() == post.pub_date
+    assert not check_scheduled_publications(now)
+
+    version = get_feed_version()
+    assert not check_scheduled_publications(now + timedelta(seconds=60))
+    assert get_feed_version() == version, (
+        "До момента публикации версия ленты не должна меняться."
+    )
+    assert check_scheduled_publications(now + timedelta(seconds=91)), (
+        "В момент отложенной публикации версия ленты должна смениться."
+    )
+    assert get_feed_version() != version
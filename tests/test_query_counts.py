@@ -0,0 +1,236 @@
+"""
+Число SQL-запросов страниц блога не должно зависеть от числа объектов.
+
+Каждая страница рендерится дважды: с одним объектом (постом,
+комментарием, категорией) и с пятьюдесятью, у каждого — свои автор,
+категория и локация. Если шаблон или представление обращается к связи
+без select_related, запросов станет больше, и тест покажет разницу
+в SQL (числа и строки в запросах заменены на N и S).
+
+Авторы, категории и локации для новых постов и комментариев создаются
+один раз на модуль (conftest.db_snapshot), тесты только связывают с ними
+свои объекты.
+"""
+import difflib
+import re
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from mixer.backend.django import mixer as _mixer
+
+from conftest import db_snapshot
+
+SMALL, LARGE = 1, 50
+# объекты сценария и пост страницы Blog.post
+POOL_SIZE = LARGE + 1
+
+NUMBER_RE = re.compile(r"\b\d+(\.\d+)?\b")
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+IN_LIST_RE = re.compile(r"IN \((?:[NS%s], )*[NS%s]\)")
+
+
+def normalize(sql):
+    sql = STRING_RE.sub("S", sql)
+    sql = NUMBER_RE.sub("N", sql)
+    return IN_LIST_RE.sub("IN (...)", sql)
+
+
+def capture_queries(client, url):
+    # холодный кэш: иначе карточки и страницы не обращаются к БД
+    cache.clear()
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, (
+        f"Страница {url} должна открываться, а ответила "
+        f"{response.status_code}."
+    )
+    return [normalize(query["sql"]) for query in context.captured_queries]
+
+
+def assert_constant_queries(small, large, url):
+    if len(small) == len(large):
+        return
+    diff = "\n".join(difflib.unified_diff(
+        small, large,
+        f"{url}: объектов {SMALL}", f"{url}: объектов {LARGE}",
+        lineterm="",
+    ))
+    pytest.fail(
+        f"Число запросов {url} зависит от числа объектов: "
+        f"{len(small)} при {SMALL} и {len(large)} при {LARGE}.\n{diff}",
+        pytrace=False,
+    )
+
+
+class Pool:
+    """Авторы, категории и локации — по одному на новый объект."""
+
+    def __init__(self, mixer):
+        self.authors = mixer.cycle(POOL_SIZE).blend("auth.User")
+        self.categories = mixer.cycle(POOL_SIZE).blend(
+            "blog.Category", is_published=True
+        )
+        self.locations = mixer.cycle(POOL_SIZE).blend(
+            "blog.Location", is_published=True
+        )
+
+
+@pytest.fixture(scope="module")
+def pool(django_db_setup, django_db_blocker):
+    yield from db_snapshot(django_db_blocker, lambda: Pool(_mixer))
+
+
+class Blog:
+    """Данные для сценариев: автор страниц и фабрики объектов."""
+
+    def __init__(self, mixer, user, pool):
+        self.mixer = mixer
+        self.user = user
+        self.authors = iter(pool.authors)
+        self.categories = iter(pool.categories)
+        self.locations = iter(pool.locations)
+        self.commenters = iter(pool.authors)
+        self.category = self.new_category()
+        self.post = self.new_post(author=user, category=self.category)
+
+    def new_category(self):
+        return self.mixer.blend("blog.Category", is_published=True)
+
+    def new_location(self):
+        return self.mixer.blend("blog.Location", is_published=True)
+
+    def new_post(self, **fields):
+        defaults = {
+            "author": self.authors,
+            "category": self.categories,
+            "location": self.locations,
+        }
+        for name, objects in defaults.items():
+            if name not in fields:
+                fields[name] = next(objects)
+        return self.mixer.blend(
+            "blog.Post",
+            title="Заметка о путешествии",
+            is_published=True,
+            pub_date=timezone.now() - timedelta(days=1),
+            image=None,
+            **fields,
+        )
+
+    def new_comment(self):
+        return self.mixer.blend(
+            "blog.Comment", post=self.post, author=next(self.commenters),
+        )
+
+
+# имя сценария: (клиент, адрес по данным, как добавить объект)
+SCENARIOS = {
+    "index": (
+        "client",
+        lambda blog: reverse("blog:index"),
+        lambda blog: blog.new_post(),
+    ),
+    "index_user": (
+        "user_client",
+        lambda blog: reverse("blog:index"),
+        lambda blog: blog.new_post(),
+    ),
+    "category_posts": (
+        "client",
+        lambda blog: reverse(
+            "blog:category_posts", args=[blog.category.slug]
+        ),
+        lambda blog: blog.new_post(category=blog.category),
+    ),
+    "profile": (
+        "client",
+        lambda blog: reverse("blog:profile", args=[blog.user.username]),
+        lambda blog: blog.new_post(author=blog.user),
+    ),
+    "search": (
+        "client",
+        lambda blog: reverse("blog:search") + "?q=путешествие",
+        lambda blog: blog.new_post(),
+    ),
+    "post_detail": (
+        "client",
+        lambda blog: reverse("blog:post_detail", args=[blog.post.pk]),
+        lambda blog: blog.new_comment(),
+    ),
+    "post_detail_user": (
+        "user_client",
+        lambda blog: reverse("blog:post_detail", args=[blog.post.pk]),
+        lambda blog: blog.new_comment(),
+    ),
+    "post_comments": (
+        "client",
+        lambda blog: reverse("blog:post_comments", args=[blog.post.pk]),
+        lambda blog: blog.new_comment(),
+    ),
+    "post_comments_json": (
+        "client",
+        lambda blog: reverse("blog:post_comments", args=[blog.post.pk])
+        + "?format=json",
+        lambda blog: blog.new_comment(),
+    ),
+    "create_post": (
+        "user_client",
+        lambda blog: reverse("blog:create_post"),
+        lambda blog: (blog.new_category(), blog.new_location()),
+    ),
+    "post_edit": (
+        "user_client",
+        lambda blog: reverse("blog:post_edit", args=[blog.post.pk]),
+        lambda blog: (blog.new_category(), blog.new_location()),
+    ),
+    "post_delete": (
+        "user_client",
+        lambda blog: reverse("blog:post_delete", args=[blog.post.pk]),
+        lambda blog: blog.new_comment(),
+    ),
+    "about": (
+        "client",
+        lambda blog: reverse("pages:about"),
+        lambda blog: blog.new_post(),
+    ),
+    "rules": (
+        "client",
+        lambda blog: reverse("pages:rules"),
+        lambda blog: blog.new_post(),
+    ),
+}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("name", SCENARIOS)
+def test_query_count_does_not_grow(request, mixer, user, pool, name):
+    client_name, get_url, add_object = SCENARIOS[name]
+    client = request.getfixturevalue(client_name)
+    blog = Blog(mixer, user, pool)
+    url = get_url(blog)
+
+    add_object(blog)
+    small = capture_queries(client, url)
+    for _ in range(LARGE - SMALL):
+        add_object(blog)
+    large = capture_queries(client, url)
+    assert_constant_queries(small, large, url)
+
+
+def test_diff_shows_extra_queries():
+    small = [normalize('SELECT * FROM "blog_post" WHERE "id" IN (1, 2)')]
+    large = small + [
+        normalize(f'SELECT * FROM "auth_user" WHERE "id" = {pk}')
+        for pk in (1, 2)
+    ]
+    with pytest.raises(pytest.fail.Exception) as failure:
+        assert_constant_queries(small, large, "/")
+    message = str(failure.value)
+    assert "1 при 1 и 3 при 50" in message
+    assert message.count('+SELECT * FROM "auth_user" WHERE "id" = N') == 2
+    assert 'IN (...)' in message
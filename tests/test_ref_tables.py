@@ -0,0 +1,94 @@
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from blog.cache import bump_refs_version
+from blog.models import Category, Location
+from blog.refs import get_ref_tables
+from blog.seeding import seed_categories
+from core.routers import RoutingState, _routing
+
+REF_TABLES = (Category._meta.db_table, Location._meta.db_table)
+
+
+@pytest.mark.django_db
+def test_pages_do_not_query_reference_tables(
+        client, another_user_client, user, post_with_published_location
+):
+    post = post_with_published_location
+    urls = (
+        "/",
+        f"/category/{post.category.slug}/",
+        f"/posts/{post.id}/",
+        f"/profile/{user.username}/",
+    )
+    get_ref_tables()
+    for page_client in (client, another_user_client):
+        for url in urls:
+            with CaptureQueriesContext(connection) as context:
+                response = page_client.get(url)
+            assert response.status_code == 200
+            content = response.content.decode("utf-8")
+            assert post.category.title in content
+            assert post.location.name in content
+            for query in context.captured_queries:
+                assert not any(
+                    table in query["sql"] for table in REF_TABLES
+                ), (
+                    f"Страница {url} не должна читать категории и локации "
+                    f"из БД, когда справочники уже загружены:\n{query['sql']}"
+                )
+
+
+@pytest.mark.django_db
+def test_category_changes_are_seen_at_once(
+        client, post_with_published_location
+):
+    post = post_with_published_location
+    category_url = f"/category/{post.category.slug}/"
+    assert client.get(category_url).status_code == 200
+    assert client.get(f"/posts/{post.id}/").status_code == 200
+
+    category = Category.objects.get(pk=post.category_id)
+    category.is_published = False
+    category.save()
+    assert client.get(category_url).status_code == 404
+    assert client.get(f"/posts/{post.id}/").status_code == 404
+    assert client.get("/").context["page_obj"].paginator.count == 0
+
+
+@pytest.mark.django_db
+def test_tables_reload_when_version_changes(published_category):
+    tables = get_ref_tables()
+    assert get_ref_tables() is tables
+    # запись из другого процесса: сигнал сработал там, не здесь
+    Category.objects.filter(pk=published_category.pk).update(title="Горы")
+    assert get_ref_tables() is tables
+    bump_refs_version()
+    reloaded = get_ref_tables()
+    assert reloaded is not tables
+    assert reloaded.categories[published_category.pk].title == "Горы"
+
+
+@pytest.mark.django_db
+def test_seeded_categories_are_visible():
+    get_ref_tables()
+    seed_categories(["Путешествия"])
+    slugs = [category.slug for category in Category.objects.all()]
+    assert set(get_ref_tables().category_slugs) == set(slugs)
+
+
+@pytest.mark.django_db
+@override_settings(DATABASE_REPLICA_ALIAS="default")
+def test_tables_are_loaded_from_primary(published_category):
+    state = RoutingState()
+    state.read_replica = True
+    token = _routing.set(state)
+    try:
+        tables = get_ref_tables()
+    finally:
+        _routing.reset(token)
+    assert published_category.pk in tables.categories
+    # мимо роутера: ни одного чтения, отправленного на реплику
+    assert state.stats["replica_reads"] == 0
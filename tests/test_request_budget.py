@@ -0,0 +1,60 @@
+import logging
+
+import pytest
+from django.test import override_settings
+
+from blog.refs import get_ref_tables
+from core.middleware import RequestBudgetExceeded
+
+
+@pytest.mark.django_db
+@override_settings(REQUEST_BUDGET_MODE="fail")
+def test_feed_pages_fit_query_budget(
+        user_client, many_posts_with_published_locations, published_category
+):
+    post = many_posts_with_published_locations[0]
+    # бюджеты — для процесса, который уже загрузил справочники
+    get_ref_tables()
+    for url in (
+        "/",
+        "/?page=2",
+        f"/category/{published_category.slug}/",
+        f"/posts/{post.id}/",
+        f"/posts/{post.id}/comments/",
+    ):
+        response = user_client.get(url)
+        assert response.status_code == 200
+        assert "db;dur=" in response["Server-Timing"]
+
+
+@pytest.mark.django_db
+@override_settings(
+    REQUEST_BUDGET_MODE="fail",
+    REQUEST_BUDGETS={"blog:index": {"queries": 1}},
+)
+def test_budget_overrun_fails_in_fail_mode(
+        user_client, post_with_published_location
+):
+    with pytest.raises(RequestBudgetExceeded):
+        user_client.get("/")
+
+
+@pytest.mark.django_db
+@override_settings(
+    REQUEST_BUDGET_MODE="fail",
+    REQUEST_BUDGETS={"blog:post_detail": {"queries": 0}},
+)
+def test_error_responses_are_only_logged(client, caplog):
+    # логгер запросов не передаёт записи корневому — слушаем его самого
+    caplog.set_level("WARNING", logger="blogicum.requests")
+    logging.getLogger("blogicum.requests").addHandler(caplog.handler)
+    try:
+        response = client.get("/posts/999999/")
+    finally:
+        logging.getLogger("blogicum.requests").removeHandler(caplog.handler)
+    assert response.status_code == 404
+    assert "db;dur=" in response["Server-Timing"]
+    assert any(
+        "exceeded budget" in record.getMessage()
+        for record in caplog.records
+    )
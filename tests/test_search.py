@@ -0,0 +1,132 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.utils import timezone
+from django.utils.connection import ConnectionDoesNotExist
+
+from blog.search import SEARCH_TABLE, index_post, search_terms, unindex_post
+
+
+@pytest.fixture
+def make_post(mixer, user, published_category):
+    def make(title, text="", **kwargs):
+        kwargs.setdefault("is_published", True)
+        kwargs.setdefault("category", published_category)
+        kwargs.setdefault("pub_date", timezone.now() - timedelta(days=1))
+        return mixer.blend(
+            "blog.Post", title=title, text=text, author=user, location=None,
+            **kwargs,
+        )
+    return make
+
+
+def search(client, query, **params):
+    response = client.get("/search/", {"q": query, **params})
+    return response, [post.title for post in response.context["page_obj"]]
+
+
+def test_search_terms_are_stemmed():
+    assert search_terms("Кошки") == search_terms("кошками")
+    assert search_terms("Ёлки") == search_terms("елка")
+
+
+@pytest.mark.django_db
+def test_search_finds_word_forms_and_ranks_title_first(client, make_post):
+    make_post("Про собак", "Ещё немного о кошке и её привычках")
+    make_post("Кошки в городе", "Городские кошки живут дольше")
+    make_post("Погода", "Сегодня солнечно")
+
+    response, titles = search(client, "кошками")
+    assert response.status_code == 200
+    assert titles == ["Кошки в городе", "Про собак"], (
+        "Убедитесь, что поиск учитывает словоформы и ставит выше "
+        "совпадения в заголовке."
+    )
+    assert search(client, "AND OR кошка NEAR")[1] == [], (
+        "Операторы FTS в запросе должны считаться обычными словами."
+    )
+
+
+@pytest.mark.django_db
+def test_search_respects_visibility(client, make_post, mixer):
+    make_post("Опубликованный рецепт")
+    make_post("Черновик рецепта", is_published=False)
+    make_post(
+        "Будущий рецепт", pub_date=timezone.now() + timedelta(days=1)
+    )
+    make_post(
+        "Рецепт в скрытой категории",
+        category=mixer.blend("blog.Category", is_published=False),
+    )
+    assert search(client, "рецепт")[1] == ["Опубликованный рецепт"]
+
+
+@pytest.mark.django_db
+def test_index_follows_post_changes(client, make_post):
+    post = make_post("Старый заголовок")
+    post.title = "Новый заголовок"
+    post.save()
+    assert search(client, "старый")[1] == []
+    assert search(client, "новые")[1] == ["Новый заголовок"]
+
+    post.delete()
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT COUNT(*) FROM {SEARCH_TABLE}")
+        assert cursor.fetchone()[0] == 0
+
+
+@pytest.mark.django_db
+def test_search_pagination_keeps_query(client, make_post):
+    for number in range(12):
+        make_post(f"Заметка {number}")
+    response, titles = search(client, "заметки")
+    assert len(titles) == 10
+    assert "?q=%D0%B7%D0%B0%D0%BC%D0%B5%D1%82%D0%BA%D0%B8&amp;page=2" in (
+        response.content.decode()
+    )
+    assert len(search(client, "заметки", page=2)[1]) == 2
+
+
+@pytest.mark.django_db
+def test_rebuild_and_admin_search(admin_client, make_post):
+    make_post("Путешествие на север")
+    make_post("Рыбалка")
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+    call_command("rebuild_search_index", verbosity=0)
+
+    response = admin_client.get("/admin/blog/post/", {"q": "путешествия"})
+    posts = list(response.context["cl"].result_list)
+    assert [post.title for post in posts] == ["Путешествие на север"]
+
+
+@pytest.mark.django_db
+def test_admin_search_orders_by_rank(admin_client, make_post):
+    make_post(
+        "Путешествие на север", pub_date=timezone.now() - timedelta(days=5)
+    )
+    make_post("Рыбалка", text="Заметки о путешествии")
+    response = admin_client.get("/admin/blog/post/", {"q": "путешествия"})
+    posts = list(response.context["cl"].result_list)
+    assert [post.title for post in posts] == [
+        "Путешествие на север", "Рыбалка"
+    ], "Поиск в админке должен сортировать по релевантности."
+    response = admin_client.get("/admin/blog/post/")
+    assert response.status_code == 200
+
+
+class WriteElsewhereRouter:
+    def db_for_write(self, model, **hints):
+        return "elsewhere"
+
+
+@pytest.mark.django_db
+def test_index_writes_follow_router(make_post):
+    post = make_post("Путешествие на север")
+    with override_settings(DATABASE_ROUTERS=[WriteElsewhereRouter()]):
+        for write in (lambda: index_post(post), lambda: unindex_post(post.pk)):
+            with pytest.raises(ConnectionDoesNotExist):
+                write()
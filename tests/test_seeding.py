@@ -0,0 +1,56 @@
+import pytest
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+
+from blog import seeding
+from blog.models import Category, Location
+from blog.seeding import (
+    DEFAULT_CATEGORIES,
+    DEFAULT_CITIES,
+    seed_categories,
+    seed_locations,
+)
+
+
+@pytest.mark.django_db
+def test_reseeding_creates_nothing():
+    call_command("seed_reference_data")
+    assert Location.objects.count() == len(DEFAULT_CITIES)
+    assert Category.objects.count() == len(DEFAULT_CATEGORIES)
+    assert seed_locations(DEFAULT_CITIES) == 0
+    assert seed_categories(DEFAULT_CATEGORIES) == 0
+    assert Location.objects.count() == len(DEFAULT_CITIES)
+    assert Category.objects.count() == len(DEFAULT_CATEGORIES)
+
+
+@pytest.mark.django_db
+def test_location_names_are_unique(mixer):
+    mixer.blend("blog.Location", name="Омск")
+    with pytest.raises(IntegrityError), transaction.atomic():
+        Location.objects.create(name="Омск")
+
+
+@pytest.mark.django_db
+def test_seed_counts_only_inserted_rows(mixer, monkeypatch):
+    existing_values = seeding._existing_values
+    calls = []
+
+    def racing_existing_values(model, field, values, batch_size):
+        # первая проверка не видит строку, вставленную параллельно
+        calls.append(field)
+        if len(calls) == 1:
+            return set()
+        return existing_values(model, field, values, batch_size)
+
+    mixer.blend("blog.Location", name="Омск")
+    monkeypatch.setattr(seeding, "_existing_values", racing_existing_values)
+    assert seed_locations(["Омск", "Тверь"]) == 1
+    assert Location.objects.filter(name="Омск").count() == 1
+
+
+@pytest.mark.django_db
+def test_slug_suffixes_skip_taken_variants(mixer):
+    mixer.blend("blog.Category", title="Sport", slug="sport")
+    mixer.blend("blog.Category", title="Sport 2", slug="sport-2")
+    assert seed_categories(["Спорт"]) == 1
+    assert Category.objects.get(title="Спорт").slug == "sport-3"
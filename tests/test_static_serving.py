@@ -0,0 +1,107 @@
+from http import HTTPStatus
+from io import BytesIO
+
+import pytest
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.core.wsgi import get_wsgi_application
+from django.test import override_settings
+
+from core.static import StaticFilesWSGI
+from core.storage import CompressedManifestStaticFilesStorage
+
+
+def call(app, path, method="GET", **headers):
+    environ = {
+        "REQUEST_METHOD": method,
+        "PATH_INFO": path,
+        "SERVER_NAME": "testserver",
+        "SERVER_PORT": "80",
+        "wsgi.url_scheme": "http",
+        "wsgi.input": BytesIO(),
+    }
+    environ.update(
+        {f"HTTP_{key.upper()}": value for key, value in headers.items()}
+    )
+    response = {}
+
+    def start_response(status, response_headers):
+        response["status"] = int(status.split()[0])
+        response["headers"] = dict(response_headers)
+
+    body = app(environ, start_response)
+    try:
+        response["body"] = b"".join(body)
+    finally:
+        if hasattr(body, "close"):
+            body.close()
+    return response
+
+
+@pytest.fixture(scope="module")
+def collected_static(tmp_path_factory):
+    # collectstatic со сжатием — секунды: один раз на модуль
+    root = tmp_path_factory.mktemp("collected")
+    with override_settings(
+        STATIC_ROOT=root / "static", MEDIA_ROOT=root / "media"
+    ):
+        call_command("collectstatic", "--noinput", verbosity=0)
+        yield root
+
+
+def test_collectstatic_hashes_and_precompresses(collected_static):
+    css = staticfiles_storage.url("css/bootstrap.min.css")
+    assert css != "/static/css/bootstrap.min.css", (
+        "Убедитесь, что в именах собранной статики есть хэш содержимого."
+    )
+    app = StaticFilesWSGI(get_wsgi_application())
+    response = call(app, css, accept_encoding="gzip, deflate")
+    assert response["status"] == HTTPStatus.OK
+    assert response["headers"]["Content-Encoding"] == "gzip"
+    assert "immutable" in response["headers"]["Cache-Control"]
+
+    repeated = call(
+        app, css, accept_encoding="gzip",
+        if_none_match=response["headers"]["ETag"],
+    )
+    assert repeated["status"] == HTTPStatus.NOT_MODIFIED
+    assert repeated["body"] == b""
+
+
+def test_media_range_requests(collected_static):
+    image = collected_static / "media" / "posts_images" / "photo.jpg"
+    image.parent.mkdir(parents=True)
+    image.write_bytes(bytes(range(256)) * 4)
+    app = StaticFilesWSGI(get_wsgi_application())
+
+    response = call(app, "/media/posts_images/photo.jpg", range="bytes=10-19")
+    assert response["status"] == HTTPStatus.PARTIAL_CONTENT
+    assert response["body"] == bytes(range(10, 20))
+    assert response["headers"]["Content-Range"] == "bytes 10-19/1024"
+    assert "immutable" not in response["headers"]["Cache-Control"]
+
+    response = call(app, "/media/posts_images/photo.jpg", range="bytes=-4")
+    assert response["body"] == bytes(range(252, 256))
+    response = call(app, "/media/posts_images/photo.jpg", range="bytes=2000-")
+    assert response["status"] == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+    response = call(app, "/media/posts_images/photo.jpg", method="HEAD")
+    assert response["headers"]["Content-Length"] == "1024"
+    assert response["body"] == b""
+
+
+@pytest.mark.django_db
+def test_unknown_and_unsafe_paths_go_to_django(collected_static):
+    app = StaticFilesWSGI(get_wsgi_application())
+    for path in ("/media/missing.jpg", "/media/../../etc/passwd"):
+        assert call(app, path)["status"] == HTTPStatus.NOT_FOUND
+
+
+def test_missing_static_file_is_reported_once(tmp_path, caplog):
+    storage = CompressedManifestStaticFilesStorage(location=tmp_path)
+    for _ in range(3):
+        assert storage.stored_name("css/missing.css") == "css/missing.css"
+    warnings = [
+        record for record in caplog.records
+        if record.name == "core.storage" and record.levelname == "WARNING"
+    ]
+    assert len(warnings) == 1
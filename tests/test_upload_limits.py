@@ -0,0 +1,79 @@
+import os
+from http import HTTPStatus
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, override_settings
+from django.utils import timezone
+from PIL import Image
+
+from blog.models import Post
+
+
+def make_upload(size, image_format="PNG", noise=False):
+    image = Image.new("RGB", size, color=(200, 30, 30))
+    if noise:
+        image = Image.frombytes("RGB", size, os.urandom(size[0] * size[1] * 3))
+    buffer = BytesIO()
+    image.save(buffer, image_format)
+    return SimpleUploadedFile(
+        f"upload.{image_format.lower()}",
+        buffer.getvalue(),
+        content_type=f"image/{image_format.lower()}",
+    )
+
+
+def post_data(category, image):
+    return {
+        "title": "Заголовок",
+        "text": "Текст",
+        "pub_date": timezone.now().strftime("%Y-%m-%d %H:%M"),
+        "category": category.pk,
+        "image": image,
+    }
+
+
+@pytest.mark.django_db
+def test_oversized_dimensions_rejected_while_uploading(
+        user_client, published_category
+):
+    response = user_client.post(
+        "/posts/create/", post_data(published_category, make_upload((9000, 8)))
+    )
+    assert response.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE, (
+        "Убедитесь, что изображение со слишком большими размерами"
+        " отклоняется с кодом 413."
+    )
+    assert "9000×8" in response.content.decode("utf-8")
+    assert not Post.objects.exists()
+
+
+@pytest.mark.django_db
+@override_settings(POST_IMAGE_MAX_UPLOAD_SIZE=4096)
+def test_oversized_file_rejected_while_uploading(
+        user_client, published_category
+):
+    response = user_client.post(
+        "/posts/create/",
+        post_data(published_category, make_upload((100, 100), noise=True)),
+    )
+    assert response.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+    assert not Post.objects.exists()
+
+    response = user_client.post(
+        "/posts/create/", post_data(published_category, make_upload((20, 20)))
+    )
+    assert response.status_code == HTTPStatus.FOUND
+    assert Post.objects.get().image
+
+
+@pytest.mark.django_db
+def test_upload_views_still_check_csrf(user, published_category):
+    client = Client(enforce_csrf_checks=True)
+    client.force_login(user)
+    response = client.post(
+        "/posts/create/", post_data(published_category, make_upload((20, 20)))
+    )
+    assert response.status_code == HTTPStatus.FORBIDDEN
+    assert not Post.objects.exists()